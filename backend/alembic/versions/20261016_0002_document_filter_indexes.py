@@ -0,0 +1,34 @@
+"""Document listing filter indexes
+
+Revision ID: 20261016_0002
+Revises: 20260213_0001
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261016_0002"
+down_revision: Union[str, None] = "20260213_0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_documents_insurer", "documents", ["insurer"], unique=False)
+    op.create_index(
+        "ix_documents_country_status_policy_created",
+        "documents",
+        ["country", "status", "policy_type", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_country_status_policy_created", table_name="documents")
+    op.drop_index("ix_documents_insurer", table_name="documents")
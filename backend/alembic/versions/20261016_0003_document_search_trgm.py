@@ -0,0 +1,48 @@
+"""Trigram indexes for document search (PostgreSQL only)
+
+Revision ID: 20261016_0003
+Revises: 20261016_0002
+Create Date: 2026-10-16 00:00:00.000000
+
+The ?search= filter is ``ILIKE '%term%'`` over insurer, source_url and
+classification, which a b-tree cannot serve. On PostgreSQL a pg_trgm GIN
+index per column lets the planner answer each ILIKE from the index and
+BitmapOr the three together. MySQL and SQLite have no equivalent for
+unanchored substring matches, so this revision is a no-op there.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261016_0003"
+down_revision: Union[str, None] = "20261016_0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ("insurer", "source_url", "classification")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_documents_{column}_trgm",
+            "documents",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f"ix_documents_{column}_trgm", table_name="documents")
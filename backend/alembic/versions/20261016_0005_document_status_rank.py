@@ -0,0 +1,41 @@
+"""Generated status_rank column for the default document order
+
+Revision ID: 20261016_0005
+Revises: 20261016_0004
+Create Date: 2026-10-16 00:00:00.000000
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261016_0005"
+down_revision: Union[str, None] = "20261016_0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUS_RANK_SQL = "CASE status WHEN 'pending' THEN 0 WHEN 'needs-review' THEN 1 ELSE 2 END"
+
+
+def upgrade() -> None:
+    # SQLite can only ALTER in a VIRTUAL generated column; it is still indexable
+    persisted = op.get_bind().dialect.name != "sqlite"
+    op.add_column(
+        "documents",
+        sa.Column("status_rank", sa.SmallInteger(), sa.Computed(STATUS_RANK_SQL, persisted=persisted)),
+    )
+    op.create_index(
+        "ix_documents_rank_created",
+        "documents",
+        ["status_rank", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_rank_created", table_name="documents")
+    op.drop_column("documents", "status_rank")
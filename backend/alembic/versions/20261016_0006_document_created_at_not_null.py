@@ -0,0 +1,43 @@
+"""Make documents.created_at NOT NULL
+
+Revision ID: 20261016_0006
+Revises: 20261016_0005
+Create Date: 2026-10-16 00:00:00.000000
+
+Keyset pagination orders and seeks on (status_rank, created_at, id); a NULL
+created_at can neither be encoded in a cursor nor matched by the row-value
+comparison. Existing NULLs are backfilled from updated_at, else now.
+
+SQLite cannot change a column's nullability in place, and the batch-mode
+table copy fails on the generated status_rank column, so there only the
+backfill runs; the model default keeps new rows non-NULL.
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261016_0006"
+down_revision: Union[str, None] = "20261016_0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE documents SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) "
+        "WHERE created_at IS NULL"
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.alter_column("documents", "created_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        return
+    op.alter_column("documents", "created_at", existing_type=sa.DateTime(), nullable=True)
@@ -1,6 +1,7 @@
 """Authentication and authorization."""
 import logging
 import re
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
@@ -156,6 +157,41 @@ def get_current_user(
     return user
 
 
+@dataclass(frozen=True)
+class TokenUser:
+    """Identity carried in a verified access token's claims."""
+
+    username: str
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+
+
+def get_token_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TokenUser:
+    """
+    Get the caller's identity from the JWT claims alone.
+
+    Used by read-only endpoints that only need an authenticated caller, so
+    they skip the users table lookup done by get_current_user. A deleted
+    user's token stays valid for these reads until it expires.
+    """
+    payload = decode_token(credentials.credentials)
+
+    username: Optional[str] = payload.get("sub")
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+
+    return TokenUser(
+        username=username,
+        user_id=payload.get("user_id"),
+        role=payload.get("role"),
+    )
+
+
 def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
@@ -1,7 +1,7 @@
 """Redis-backed cache utilities with graceful fallback behavior."""
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from redis import Redis
 from redis.exceptions import RedisError
@@ -162,3 +162,22 @@ def invalidate_cache_prefix(prefix: str) -> int:
         return 0
 
     return deleted
+
+
+def invalidate_cache_prefixes(prefixes: Iterable[str]) -> int:
+    """Delete all cache keys matching any of the prefixes with a single UNLINK."""
+    if not is_cache_available():
+        return 0
+
+    cache_keys: set[str] = set()
+
+    try:
+        for prefix in prefixes:
+            pattern = f"{_namespaced_key(prefix)}*"
+            cache_keys.update(_redis_client.scan_iter(match=pattern, count=1000))
+        if not cache_keys:
+            return 0
+        return int(_redis_client.unlink(*cache_keys))
+    except RedisError as exc:
+        logger.debug("Cache invalidate prefixes error for prefixes=%s: %s", prefixes, exc)
+        return 0
@@ -134,6 +134,9 @@ CRAWL_PDF_CONCURRENCY = int(os.getenv("CRAWL_PDF_CONCURRENCY", "5"))
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "8192"))
+# Manual uploads are read from a local spool file, so use bigger reads: fewer
+# await round-trips and hashlib's (SHA-NI accelerated) update gets full blocks
+UPLOAD_CHUNK_SIZE = max(CHUNK_SIZE, int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024))))
 MAX_DOWNLOAD_TIME = int(os.getenv("MAX_DOWNLOAD_TIME", "300"))  # 5 minutes max per file
 
 # ============================================================================
@@ -378,7 +381,7 @@ __all__ = [
     
     # Files
     'MAX_FILE_SIZE_MB', 'MAX_FILE_SIZE_BYTES', 
-    'CHUNK_SIZE', 'MAX_DOWNLOAD_TIME',
+    'CHUNK_SIZE', 'UPLOAD_CHUNK_SIZE', 'MAX_DOWNLOAD_TIME',
     'RAW_STORAGE_DIR', 'STORAGE_DIR',
     
     # Rate limiting
@@ -193,6 +193,7 @@ def init_db() -> None:
     if use_migrations:
         logger.info("Migration mode enabled - run 'alembic upgrade head' manually")
         logger.warning("Tables will NOT be auto-created. Use Alembic migrations.")
+        verify_schema()
         return
 
     # Step 2: create tables directly (development mode)
@@ -210,6 +211,39 @@ def init_db() -> None:
         logger.critical(f"Failed to initialize database: {e}", exc_info=True)
         raise
 
+    verify_schema()
+
+
+def verify_schema() -> None:
+    """
+    Fail startup when an existing table is missing columns the models use.
+
+    create_all() only creates missing tables, so a database from an older
+    release keeps its old columns until 'alembic upgrade head' is run.
+    Without this check the first query touching a new column would 500.
+    """
+    from sqlalchemy import inspect
+    from app.models import Base
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(
+            f"{table.name}.{column.name}" for column in table.columns if column.name not in columns
+        )
+
+    if missing:
+        message = (
+            f"Database schema is out of date (missing columns: {', '.join(missing)}). "
+            "Run 'alembic upgrade head' in backend/ before starting the app."
+        )
+        logger.critical(message)
+        raise RuntimeError(message)
+
 
 # ============================================================================
 # HEALTH CHECK
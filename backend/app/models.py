@@ -4,12 +4,14 @@ ORM models for PolicyCheck v5 - Production ingestion platform.
 from datetime import datetime, timezone
 from sqlalchemy import (
     Column, Integer, String, Float, Text, DateTime,
-    ForeignKey, JSON, Index, Boolean,
+    ForeignKey, JSON, Index, Boolean, text, Computed, SmallInteger,
 )
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
 
+STATUS_RANK_SQL = "CASE status WHEN 'pending' THEN 0 WHEN 'needs-review' THEN 1 ELSE 2 END"
+
 
 def _utcnow():
     """Get current UTC time."""
@@ -91,6 +93,23 @@ class Document(Base):
         # Compound indexes for common queries
         Index("ix_documents_country_policy_type", "country", "policy_type"),
         Index("ix_documents_crawl_status", "crawl_session_id", "status"),
+        Index("ix_documents_insurer", "insurer"),
+        # Listing filters (country/status/policy_type) plus the newest-first order
+        Index(
+            "ix_documents_country_status_policy_created",
+            "country", "status", "policy_type",
+            text("created_at DESC"), text("id DESC"),
+        ),
+        # Default list order (pending first, newest first) straight off the index
+        Index(
+            "ix_documents_rank_created",
+            "status_rank", text("created_at DESC"), text("id DESC"),
+        ),
+        # Covers the filter-options GROUP BY so it never touches the table
+        Index(
+            "ix_documents_facets",
+            "country", "insurer", "policy_type", "status", "classification",
+        ),
     )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -117,9 +136,11 @@ class Document(Base):
     
     # Status
     status = Column(String(20), nullable=False, default="pending")  # pending, validated, rejected
+    # Review-queue position for the default list order: pending, needs-review, everything else
+    status_rank = Column(SmallInteger, Computed(STATUS_RANK_SQL, persisted=True))
     
-    # Timestamps
-    created_at = Column(DateTime, default=_utcnow)
+    # Timestamps (created_at is part of the list keyset, so never NULL)
+    created_at = Column(DateTime, nullable=False, default=_utcnow)
     updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow)
     
     # Foreign keys
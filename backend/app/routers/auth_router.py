@@ -113,7 +113,9 @@ def login(
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(
+        data={"sub": user.username, "user_id": user.id, "role": user.role}
+    )
     csrf_token = create_csrf_token(subject=user.username)
     log_security_event(
         event_type="LOGIN_SUCCESS",
@@ -2,19 +2,25 @@
 Production-hardened document management API endpoints.
 Includes: filtering, auto-classification uploads, and approval workflows.
 """
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
 import logging
-import uuid
-import shutil
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile, status
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_, tuple_
 
 from app.cache import (
     get_cached_json,
@@ -22,16 +28,94 @@ from app.cache import (
     make_cache_key,
     set_cached_json,
 )
-from app.config import CACHE_DEFAULT_TTL_SECONDS, RAW_STORAGE_DIR
+from app.config import (
+    CACHE_DEFAULT_TTL_SECONDS,
+    MAX_FILE_SIZE_BYTES,
+    MAX_FILE_SIZE_MB,
+    RAW_STORAGE_DIR,
+    UPLOAD_CHUNK_SIZE,
+)
 from app.database import get_db
 from app.models import AuditLog, Document, User
 from app.services import document_service
-from app.services.crawl_service import classify_document, extract_pdf_text_sample, sanitize_filename
-from app.auth import get_current_user, get_current_user_optional
+from app.services.crawl_service import (
+    MANUAL_UPLOAD_SOURCE_URL,
+    classify_document,
+    extract_pdf_text_sample,
+    sanitize_filename,
+)
+from app.auth import TokenUser, get_current_user, get_current_user_optional, get_token_user
 
 router = APIRouter(prefix="/api/documents", tags=["documents"])
 logger = logging.getLogger(__name__)
 DOCUMENTS_CACHE_TTL_SECONDS = min(max(CACHE_DEFAULT_TTL_SECONDS, 15), 180)
+UPLOAD_BATCH_MAX_WORKERS = 8
+CLASSIFICATION_CACHE_TTL_SECONDS = 24 * 60 * 60
+PDF_MAGIC = b"%PDF"
+# Larger ?limit= values are clamped rather than rejected; the review page asks for 500
+MAX_DOCUMENTS_PAGE_SIZE = 500
+
+
+class PDFFileResponse(FileResponse):
+    """
+    FileResponse with 1 MiB reads instead of Starlette's 64 KiB.
+
+    Each read is a thread hop plus a syscall at near-constant cost, so a
+    typical 1-10 MB PDF goes out in 1-10 chunks instead of 16-160.
+    """
+    chunk_size = 1024 * 1024
+
+
+def _parse_byte_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` Range header into an inclusive (start, end).
+
+    Returns None when the whole file should be sent: no header, a unit
+    other than bytes, a malformed spec, or several ranges (RFC 9110 lets
+    a server ignore Range). Raises 416 for a well-formed range that lies
+    entirely past the end of the file.
+    """
+    if not range_header:
+        return None
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else file_size - 1
+            if last and end < start:
+                return None
+        elif last:
+            # Suffix range: the final N bytes
+            start, end = max(file_size - int(last), 0), file_size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start < 0 or start >= file_size:
+        raise HTTPException(
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            "Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+    return start, min(end, file_size - 1)
+
+
+def _iter_file_range(path: Path, start: int, end: int):
+    """Yield bytes start..end (inclusive) of a file in PDFFileResponse-sized reads."""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(PDFFileResponse.chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
 
 
 # ============================================================================
@@ -61,13 +145,51 @@ class DocumentResponse(BaseModel):
         from_attributes = True
 
 
+class PrefetchedPage(BaseModel):
+    """The page after the requested one, returned with ?prefetch=true."""
+    documents: List[DocumentResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
 class PaginatedDocumentResponse(BaseModel):
     """Paginated response for document listings."""
     documents: List[DocumentResponse]
-    total: int
+    total: Optional[int] = None  # None when the caller passed include_total=false
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None
+    prefetched_next: Optional[PrefetchedPage] = None
+
+
+class BatchUploadFailure(BaseModel):
+    filename: str
+    error: str
+
+
+class BatchUploadResponse(BaseModel):
+    """Per-file outcome of a batch upload."""
+    successful: List[DocumentResponse]
+    failed: List[BatchUploadFailure]
+    total_processed: int
+
+
+def _etag_json_response(request: Request, payload: Any) -> Response:
+    """
+    JSON response tagged with a hash of its body.
+
+    Answers 304 with no body when the client's If-None-Match already holds
+    that tag, so a browser revalidating an unchanged dropdown or summary
+    skips the download.
+    """
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 def _write_audit(
@@ -98,35 +220,205 @@ def _write_audit(
 
 @router.get("/filters/options")
 def get_filter_options(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
     """
     Get distinct values for filter dropdowns (Country, Insurer, Status, etc).
     """
-    try:
-        # Helper to get distinct non-null values
-        def get_distinct(column):
-            return [r[0] for r in db.query(column).distinct().order_by(column).all() if r[0]]
+    cache_key = make_cache_key("documents", "filter-options")
+    cached_payload = get_cached_json(cache_key)
+    if cached_payload is not None:
+        return _etag_json_response(request, cached_payload)
 
-        return {
-            "countries": get_distinct(Document.country),
-            "insurers": get_distinct(Document.insurer),
-            "policy_types": get_distinct(Document.policy_type),
-            "statuses": get_distinct(Document.status),
-            "classifications": get_distinct(Document.classification)
-        }
+    facets = {
+        "countries": Document.country,
+        "insurers": Document.insurer,
+        "policy_types": Document.policy_type,
+        "statuses": Document.status,
+        "classifications": Document.classification,
+    }
+    try:
+        # One GROUP BY pass (an index-only scan of ix_documents_facets)
+        # instead of a DISTINCT scan per dropdown
+        values = {key: set() for key in facets}
+        for row in db.query(*facets.values()).group_by(*facets.values()):
+            for key, value in zip(facets, row):
+                if value:
+                    values[key].add(value)
     except Exception as e:
         logger.error(f"Error fetching filter options: {e}")
         return {
             "countries": [], "insurers": [], "policy_types": [], "statuses": [], "classifications": []
         }
 
+    # Case-insensitive, like the database collation the dropdowns used to follow
+    result = {
+        key: sorted(found, key=lambda value: (value.casefold(), value))
+        for key, found in values.items()
+    }
+    set_cached_json(cache_key, result, DOCUMENTS_CACHE_TTL_SECONDS)
+    return _etag_json_response(request, result)
+
 
 # ============================================================================
 # UPLOAD ENDPOINT
 # ============================================================================
 
+async def _save_upload(file: UploadFile) -> Tuple[str, Path, int, str]:
+    """Validate an uploaded PDF and stream it into Manual_Uploads, hashing as it goes."""
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(400, "Only PDF files are accepted")
+
+    # Check the magic number before anything touches the storage directory
+    if await file.read(len(PDF_MAGIC)) != PDF_MAGIC:
+        raise HTTPException(400, "File is not a valid PDF")
+    await file.seek(0)
+
+    safe_filename = sanitize_filename(file.filename)
+    save_dir = RAW_STORAGE_DIR / "Manual_Uploads"
+    save_dir.mkdir(parents=True, exist_ok=True)
+
+    save_path = save_dir / safe_filename
+    counter = 1
+    while save_path.exists():
+        save_path = save_dir / f"{safe_filename.replace('.pdf', '')}_{counter}.pdf"
+        counter += 1
+
+    # Stream to disk chunk by chunk, rejecting oversized uploads as soon as
+    # they cross the limit instead of after the whole body has been written
+    file_size = 0
+    sha256_hash = hashlib.sha256()
+    try:
+        with save_path.open("wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE_BYTES:
+                    raise HTTPException(
+                        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        f"File exceeds the {MAX_FILE_SIZE_MB} MB upload limit",
+                    )
+                buffer.write(chunk)
+                sha256_hash.update(chunk)
+    except BaseException:
+        save_path.unlink(missing_ok=True)
+        raise
+
+    return safe_filename, save_path, file_size, sha256_hash.hexdigest()
+
+
+def _classify_upload(
+    safe_filename: str, save_path: Path, file_size: int, policy_type: str
+) -> Dict[str, Any]:
+    """Extract a text sample from a saved upload and classify it."""
+    pdf_text = extract_pdf_text_sample(save_path)
+    return classify_document(
+        url=f"manual-upload://{safe_filename}",
+        filename=safe_filename,
+        policy_type=policy_type,
+        file_size=file_size,
+        pdf_text_sample=pdf_text
+    )
+
+
+def _classification_inputs(safe_filename: str, policy_type: str) -> Dict[str, str]:
+    """Upload inputs besides the content that classify_document depends on."""
+    return {"filename": safe_filename, "policy_type": policy_type}
+
+
+def _classification_cache_key(file_hash: str, inputs: Dict[str, str]) -> str:
+    inputs_digest = hashlib.sha256(
+        json.dumps(inputs, sort_keys=True).encode()
+    ).hexdigest()[:16]
+    return make_cache_key("classification", file_hash, inputs_digest)
+
+
+def _cached_classification(
+    db: Session, file_hash: str, inputs: Dict[str, str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Reuse the classification of an earlier upload with identical content.
+
+    Byte-identical uploads would otherwise run text extraction and
+    classification again for the same result. The classifier also reads the
+    filename and the policy_type hint, so a result is only reused when those
+    match too. The Redis entry is checked first and outlives deleted
+    documents; manual uploads in the documents table are the fallback.
+    Reviewer decisions are not carried over: a copy of a validated/rejected
+    document goes back to review.
+    """
+    cached = get_cached_json(_classification_cache_key(file_hash, inputs))
+    if cached is not None:
+        return cached
+
+    candidates = db.query(
+        Document.policy_type,
+        Document.classification,
+        Document.confidence,
+        Document.status,
+        Document.metadata_json,
+        Document.warnings,
+    ).filter(
+        Document.file_hash == file_hash,
+        Document.source_url == MANUAL_UPLOAD_SOURCE_URL,
+    ).all()
+    prior = next(
+        (
+            row for row in candidates
+            if (row.metadata_json or {}).get("upload_inputs") == inputs
+        ),
+        None,
+    )
+    if prior is None:
+        return None
+    return {
+        "detected_policy_type": prior.policy_type,
+        "classification": prior.classification,
+        "confidence": prior.confidence,
+        "status": "needs-review" if prior.status in ("validated", "rejected") else prior.status,
+        "metadata": prior.metadata_json,
+        "warnings": prior.warnings,
+    }
+
+
+def _remember_classification(
+    file_hash: str, inputs: Dict[str, str], classification_result: Dict[str, Any]
+) -> None:
+    set_cached_json(
+        _classification_cache_key(file_hash, inputs),
+        classification_result,
+        CLASSIFICATION_CACHE_TTL_SECONDS,
+    )
+
+
+def _build_upload_document(
+    save_path: Path,
+    file_size: int,
+    file_hash: str,
+    country: str,
+    inputs: Dict[str, str],
+    classification_result: Dict[str, Any],
+) -> Document:
+    # Record what the classifier was given so identical re-uploads can reuse it
+    metadata = {**(classification_result["metadata"] or {}), "upload_inputs": inputs}
+    return Document(
+        source_url=MANUAL_UPLOAD_SOURCE_URL,
+        insurer="Manual Upload",
+        local_file_path=str(save_path),
+        file_size=file_size,
+        file_hash=file_hash,
+        country=country,
+        policy_type=classification_result["detected_policy_type"],
+        document_type=classification_result["classification"],
+        classification=classification_result["classification"],
+        confidence=classification_result["confidence"],
+        status=classification_result["status"],
+        metadata_json=metadata,
+        warnings=classification_result["warnings"]
+    )
+
+
 @router.post("/upload", status_code=status.HTTP_201_CREATED, response_model=DocumentResponse)
 async def upload_document(
     file: UploadFile = File(...),
@@ -137,48 +429,18 @@ async def upload_document(
 ):
     """Manual document upload with AUTO-CLASSIFICATION."""
     try:
-        if not file.filename.lower().endswith(".pdf"):
-            raise HTTPException(400, "Only PDF files are accepted")
-        
-        safe_filename = sanitize_filename(file.filename)
-        save_dir = RAW_STORAGE_DIR / "Manual_Uploads"
-        save_dir.mkdir(parents=True, exist_ok=True)
-        
-        save_path = save_dir / safe_filename
-        counter = 1
-        while save_path.exists():
-            save_path = save_dir / f"{safe_filename.replace('.pdf', '')}_{counter}.pdf"
-            counter += 1
-            
-        file_size = 0
-        with save_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            file_size = save_path.stat().st_size
-            
-        pdf_text = extract_pdf_text_sample(save_path)
-        
-        classification_result = classify_document(
-            url=f"manual-upload://{safe_filename}",
-            filename=safe_filename,
-            policy_type=policy_type,
-            file_size=file_size,
-            pdf_text_sample=pdf_text
-        )
-        
-        doc = Document(
-            source_url="manual_upload",
-            insurer="Manual Upload",
-            local_file_path=str(save_path),
-            file_size=file_size,
-            file_hash="manual_" + str(uuid.uuid4()),
-            country=country,
-            policy_type=classification_result["detected_policy_type"],
-            document_type=classification_result["classification"],
-            classification=classification_result["classification"],
-            confidence=classification_result["confidence"],
-            status=classification_result["status"],
-            metadata_json=classification_result["metadata"],
-            warnings=classification_result["warnings"]
+        safe_filename, save_path, file_size, file_hash = await _save_upload(file)
+        inputs = _classification_inputs(safe_filename, policy_type)
+        classification_result = _cached_classification(db, file_hash, inputs)
+        if classification_result is None:
+            # Text extraction + classification take seconds on large PDFs; run
+            # them on the threadpool so this async handler doesn't stall the loop
+            classification_result = await run_in_threadpool(
+                _classify_upload, safe_filename, save_path, file_size, policy_type
+            )
+            _remember_classification(file_hash, inputs, classification_result)
+        doc = _build_upload_document(
+            save_path, file_size, file_hash, country, inputs, classification_result
         )
         
         db.add(doc)
@@ -196,31 +458,157 @@ async def upload_document(
 
         return doc
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload failed: {e}", exc_info=True)
         raise HTTPException(500, f"Upload failed: {str(e)}")
 
 
+@router.post("/upload-batch", status_code=status.HTTP_201_CREATED, response_model=BatchUploadResponse)
+async def upload_documents_batch(
+    files: List[UploadFile] = File(...),
+    policy_type: str = Form("General"),
+    country: str = Form("NZ"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Upload several PDFs in one request.
+
+    Files are saved one by one, then text extraction and classification run
+    concurrently on a worker pool for any content not seen before. Each file
+    succeeds or fails on its own.
+    """
+    failed: List[BatchUploadFailure] = []
+    saved = []
+    for file in files:
+        try:
+            saved.append(await _save_upload(file))
+        except HTTPException as e:
+            failed.append(BatchUploadFailure(filename=file.filename or "", error=str(e.detail)))
+
+    inputs = [_classification_inputs(safe_filename, policy_type) for safe_filename, *_ in saved]
+    results: List[Any] = [
+        _cached_classification(db, file_hash, file_inputs)
+        for (*_, file_hash), file_inputs in zip(saved, inputs)
+    ]
+    to_classify = [i for i, result in enumerate(results) if result is None]
+
+    # OPTIMIZATION: classification is CPU/IO work per file, so overlap it across
+    # a worker pool; the session is only touched back on this thread
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(UPLOAD_BATCH_MAX_WORKERS, len(to_classify))),
+        thread_name_prefix="upload-batch-classify",
+    ) as pool:
+        classified_results = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _classify_upload, *saved[i][:3], policy_type)
+                for i in to_classify
+            ),
+            return_exceptions=True,
+        )
+    for i, result in zip(to_classify, classified_results):
+        results[i] = result
+        if not isinstance(result, BaseException):
+            _remember_classification(saved[i][3], inputs[i], result)
+
+    docs: List[Document] = []
+    classified = []
+    for (safe_filename, save_path, file_size, file_hash), file_inputs, result in zip(
+        saved, inputs, results
+    ):
+        if isinstance(result, BaseException):
+            logger.error(f"Batch upload classification failed for {safe_filename}: {result}")
+            save_path.unlink(missing_ok=True)
+            failed.append(BatchUploadFailure(filename=safe_filename, error=str(result)))
+            continue
+        docs.append(_build_upload_document(
+            save_path, file_size, file_hash, country, file_inputs, result
+        ))
+        classified.append((safe_filename, file_size, result))
+
+    if docs:
+        try:
+            db.add_all(docs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for doc in docs:
+                Path(doc.local_file_path).unlink(missing_ok=True)
+            logger.error(f"Batch upload failed: {e}", exc_info=True)
+            raise HTTPException(500, f"Upload failed: {str(e)}")
+
+        for doc, (safe_filename, file_size, result) in zip(docs, classified):
+            _write_audit(db, current_user, "document_upload", {
+                "filename": safe_filename,
+                "size": file_size,
+                "classification": result["classification"],
+                "batch": True,
+            }, doc.id)
+
+        invalidate_cache_prefix("documents")
+        invalidate_cache_prefix("stats")
+
+    return {
+        "successful": docs,
+        "failed": failed,
+        "total_processed": len(files),
+    }
+
+
 # ============================================================================
 # READ / LIST ENDPOINTS
 # ============================================================================
 
+def _encode_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the row after which the next page starts."""
+    payload = json.dumps(
+        [doc["status_rank"], doc["created_at"].isoformat(), doc["id"]], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, created_at, doc_id = json.loads(raw)
+        return int(rank), datetime.fromisoformat(created_at), int(doc_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(400, "Invalid pagination cursor")
+
+
 @router.get("", response_model=PaginatedDocumentResponse)
 def get_documents(
-    skip: int = 0,
-    limit: int = 50,
-    page: Optional[int] = Query(None, description="Page number (1-indexed)"),
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1),
+    page: Optional[int] = Query(None, ge=1, description="Page number (1-indexed)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(True, description="False skips counting matches; total is then null"),
+    prefetch: bool = Query(False, description="Also return the following page as prefetched_next"),
     country: Optional[str] = None,
     status: Optional[str] = None,
     policy_type: Optional[str] = None,
     insurer: Optional[str] = None,
     search: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
-    """Get documents with filtering and search - returns paginated response."""
+    """
+    Get documents with filtering and search - returns paginated response.
+
+    Pass the returned next_cursor back as ``cursor`` to fetch the following
+    page with an index range seek. skip/page still work but make the
+    database walk and discard every skipped row. With ``prefetch`` the
+    same query reads two pages' worth of rows and the second page comes
+    back as prefetched_next, saving the client a round trip.
+    """
+    # Prefetch reads two pages in one query; keep the pair within the cap
+    limit = min(limit, MAX_DOCUMENTS_PAGE_SIZE // 2 if prefetch else MAX_DOCUMENTS_PAGE_SIZE)
     # Handle page-based pagination (convert to offset)
-    if page is not None and page > 0:
+    if page is not None:
         skip = (page - 1) * limit
     
     query = db.query(Document)
@@ -234,40 +622,90 @@ def get_documents(
     if insurer:
         query = query.filter(Document.insurer == insurer)
     if search:
-        search_term = f"%{search}%"
         query = query.filter(
-            (Document.insurer.ilike(search_term)) | 
-            (Document.source_url.ilike(search_term)) |
-            (Document.classification.ilike(search_term))
+            document_service.document_search_filter(search, db.get_bind().dialect.name)
         )
 
-    # Get total count before pagination
-    total = query.count()
+    # Pending-first only matters when statuses are mixed; with ?status= the
+    # rank is constant and leaving it out keeps the composite index usable
+    order_by = [Document.created_at.desc(), Document.id.desc()]
+    if not status:
+        order_by.insert(0, Document.status_rank)
+
+    total = None
+    count_in_window = include_total and not cursor
+    if cursor:
+        rank, created_at, doc_id = _decode_cursor(cursor)
+        # A window would only count rows past the cursor
+        if include_total:
+            total = query.count()
+        after = tuple_(Document.created_at, Document.id) < tuple_(created_at, doc_id)
+        if not status:
+            after = or_(
+                Document.status_rank > rank,
+                and_(Document.status_rank == rank, after),
+            )
+        query = query.filter(after)
+        skip = 0
+    elif skip:
+        response.headers["Deprecation"] = "true"
     
-    query = query.order_by(
-        (Document.status == 'pending').desc(),
-        (Document.status == 'needs-review').desc(), 
-        Document.created_at.desc()
-    )
+    # Plain rows of just the response columns: no ORM objects or identity map
+    columns = [getattr(Document, name) for name in DocumentResponse.model_fields]
+    columns.append(Document.status_rank)
+    page_query = query.order_by(*order_by)
 
-    docs = query.offset(skip).limit(limit).all()
+    # One extra row tells us whether another page follows
+    fetch = limit * 2 if prefetch else limit
+    if count_in_window:
+        # COUNT(*) OVER () rides along on each row instead of a second query
+        rows = (
+            page_query.with_entities(*columns, func.count().over().label("total_count"))
+            .offset(skip).limit(fetch + 1).all()
+        )
+        if rows:
+            total = rows[0].total_count
+        else:
+            # Past the end there is no row to carry the count
+            total = query.count() if skip else 0
+    else:
+        rows = page_query.with_entities(*columns).offset(skip).limit(fetch + 1).all()
+    docs = [row._asdict() for row in rows]
+    has_more = len(docs) > limit
+    next_docs = docs[limit:fetch]
+    docs = docs[:limit]
     
-    return {
+    result = {
         "documents": docs,
         "total": total,
         "limit": limit,
         "offset": skip,
-        "has_more": (skip + len(docs)) < total
+        "has_more": has_more,
+        "next_cursor": _encode_cursor(docs[-1]) if has_more and docs else None,
     }
+    if prefetch:
+        next_has_more = len(rows) > fetch
+        result["prefetched_next"] = {
+            "documents": next_docs,
+            "has_more": next_has_more,
+            "next_cursor": _encode_cursor(next_docs[-1]) if next_has_more else None,
+        }
+    return result
 
 
 @router.get("/stats/summary")
 def get_document_stats_endpoint(
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_token_user),
 ):
-    stats = document_service.get_document_stats(db)
-    return stats
+    cache_key = make_cache_key("stats", "summary")
+    stats = get_cached_json(cache_key)
+    if stats is None:
+        stats = document_service.get_document_stats(db)
+        if "error" not in stats:
+            set_cached_json(cache_key, stats, DOCUMENTS_CACHE_TTL_SECONDS)
+    return _etag_json_response(request, stats)
 
 
 @router.get("/download-all/zip")
@@ -325,11 +763,48 @@ def download_all_zip(
     )
 
 
+@router.get("/export/csv")
+def export_documents_csv(
+    crawl_session_id: Optional[int] = Query(None),
+    country: Optional[str] = Query(None),
+    policy_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    insurer: Optional[str] = Query(None),
+    classification: Optional[str] = Query(None),
+    search: Optional[str] = Query(None),
+    min_confidence: Optional[float] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Export filtered documents as CSV (streaming)."""
+    from datetime import date
+    csv_stream = document_service.generate_csv_stream(
+        db.get_bind(),
+        crawl_session_id=crawl_session_id,
+        country=country,
+        policy_type=policy_type,
+        status=status,
+        insurer=insurer,
+        classification=classification,
+        search=search,
+        min_confidence=min_confidence,
+    )
+    filename = f"policycheck_export_{date.today().isoformat()}.csv"
+
+    return StreamingResponse(
+        csv_stream,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
+
 @router.get("/{document_id}", response_model=DocumentResponse)
 def get_document(
     document_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenUser = Depends(get_token_user)
 ):
     doc = db.query(Document).filter(Document.id == document_id).first()
     if not doc:
@@ -467,7 +942,7 @@ def preview_document(
     if not file_path:
         raise HTTPException(404, "PDF file not found on disk.")
 
-    return FileResponse(
+    return PDFFileResponse(
         path=file_path,
         filename=file_path.name,
         media_type="application/pdf",
@@ -478,6 +953,7 @@ def preview_document(
 @router.get("/{document_id}/download")
 def download_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     token: Optional[str] = Query(None), 
     current_user: Optional[User] = Depends(get_current_user_optional)
@@ -504,11 +980,38 @@ def download_document(
             "PDF file not found on disk. The file may have been removed. "
             "Try re-running the crawl to re-download this document."
         )
-        
-    return FileResponse(
+
+    stat_result = file_path.stat()
+    file_response = PDFFileResponse(
         path=file_path,
         filename=file_path.name,
-        media_type="application/pdf"
+        media_type="application/pdf",
+        stat_result=stat_result,
+        headers={"Accept-Ranges": "bytes"},
+    )
+    byte_range = _parse_byte_range(request.headers.get("range"), stat_result.st_size)
+    if_range = request.headers.get("if-range")
+    if if_range and if_range not in (
+        file_response.headers["etag"], file_response.headers["last-modified"]
+    ):
+        # The client's partial copy is of a different file: start over
+        byte_range = None
+    if not byte_range:
+        return file_response
+
+    # Resumed or multi-part fetch: stream just the requested slice
+    start, end = byte_range
+    headers = {
+        name: file_response.headers[name]
+        for name in ("content-disposition", "etag", "last-modified", "accept-ranges")
+    }
+    headers["Content-Range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(file_path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/pdf",
+        headers=headers,
     )
 
 
@@ -534,11 +1037,13 @@ def delete_document(
                 logger.warning(f"Failed to delete file for doc {document_id}: {e}")
 
     # Write audit log
-    _write_audit(db, current_user, "document_deleted", document_id,
-                 {"insurer": doc.insurer, "classification": doc.classification})
+    _write_audit(db, current_user, "document_deleted",
+                 {"insurer": doc.insurer, "classification": doc.classification}, document_id)
 
     # Delete from database
     db.delete(doc)
     db.commit()
+    invalidate_cache_prefix("documents")
+    invalidate_cache_prefix("stats")
 
     return {"status": "ok", "message": f"Document #{document_id} deleted"}
\ No newline at end of file
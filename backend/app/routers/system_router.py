@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
+from app.cache import invalidate_cache_prefix
 from app.database import get_db
 from app.models import User, Document
 from app.services import document_service
@@ -88,6 +89,8 @@ def purge_orphan_documents(
     for orphan in orphans:
         db.delete(orphan)
     db.commit()
+    invalidate_cache_prefix("documents")
+    invalidate_cache_prefix("stats")
     
     logger.info(f"Purged {len(orphans)} orphan documents, {len(valid)} valid remain")
     
@@ -24,27 +24,30 @@ HANDLES:
 import os
 import re
 import time
+import functools
 import hashlib
 import logging
 import tempfile
 import threading
 import urllib.robotparser
 from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Pattern, Sequence, Set, Tuple
 from urllib.parse import urlparse, urljoin, urlunparse, parse_qs, urlencode
 
 import requests
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
 from requests.adapters import HTTPAdapter
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from urllib3.util.timeout import Timeout
 from urllib3.util.retry import Retry
 
-from app.cache import invalidate_cache_prefix
+from app.cache import invalidate_cache_prefixes
 from app.models import CrawlSession, Document, User
 from app.config import (
     RAW_STORAGE_DIR, REQUEST_DELAY,
@@ -75,6 +78,16 @@ _CRAWL_LOGS: Dict[int, List[Dict[str, Any]]] = {}
 _CRAWL_LOGS_LOCK = threading.Lock()
 MAX_LOG_ENTRIES = 2000  # per crawl (increased for large crawls)
 
+# source_url recorded on documents uploaded by hand rather than crawled
+MANUAL_UPLOAD_SOURCE_URL = "manual_upload"
+
+# Minimum seconds between progress commits during the download phase
+PROGRESS_COMMIT_INTERVAL = 1.0
+
+# Filename sanitization (compiled once; sanitize_filename runs for every PDF)
+_PATH_SEPARATOR_TABLE = str.maketrans({'/': '_', '\\': '_'})
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w.-]')
+
 
 def crawl_log(crawl_id: int, level: str, message: str):
     """Add a log entry to the in-memory crawl log store."""
@@ -344,10 +357,55 @@ def create_crawl_session(
 # DOCUMENT VALIDATION
 # ============================================================================
 
+# Policy type mapping
+POLICY_TYPE_KEYWORDS: Dict[str, List[str]] = {
+    "life": ["life", "lif", "living", "death", "tpd", "income protection", "trauma"],
+    "home": ["home", "house", "property", "building", "landlord", "rental", "dwelling"],
+    "contents": ["contents", "contents plus", "personal belongings", "valuables", "household contents"],
+    "motor": ["motor", "vehicle", "car", "auto", "comprehensive", "third party", "tpft"],
+    "travel": ["travel", "trip", "overseas", "holiday", "international"],
+    "health": ["health", "medical", "hospital", "dental", "optical"],
+    "business": ["business", "commercial", "liability", "sme", "professional indemnity", "public liability"],
+    "pet": ["pet", "dog", "cat", "animal"],
+    "marine": ["marine", "boat", "watercraft", "yacht"],
+}
+
+
+def _keyword_union(keywords: Sequence[str]) -> Pattern[str]:
+    """Compile lowercase keywords into one alternation matched against a lowered URL."""
+    return re.compile("|".join(re.escape(keyword.lower()) for keyword in keywords))
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_document_filters(
+    keyword_filters: Tuple[str, ...],
+    policy_types: Tuple[str, ...],
+) -> Tuple[Tuple[Tuple[str, Pattern[str]], ...], Optional[Pattern[str]]]:
+    """
+    Build the matchers used by is_valid_document for one crawl's filters.
+
+    OPTIMIZATION: A crawl checks thousands of URLs against the same filters,
+    so each policy type's keywords (and the keyword filters) become a single
+    compiled regex, cached per (keyword_filters, policy_types) combination.
+    Policy types keep their configured order, so the first matching type wins.
+    """
+    policy_patterns = tuple(
+        (
+            policy_type,
+            _keyword_union(
+                POLICY_TYPE_KEYWORDS.get(policy_type.lower(), [policy_type.lower()])
+            ),
+        )
+        for policy_type in policy_types
+    )
+    keyword_pattern = _keyword_union(keyword_filters) if keyword_filters else None
+    return policy_patterns, keyword_pattern
+
+
 def is_valid_document(
     url: str,
-    keyword_filters: List[str],
-    policy_types: List[str]
+    keyword_filters: Sequence[str],
+    policy_types: Sequence[str]
 ) -> Tuple[bool, Optional[str]]:
     """
     Check if URL matches keyword and policy type filters.
@@ -360,36 +418,23 @@ def is_valid_document(
     but do not exclude.
     """
     url_lower = url.lower()
+    policy_patterns, keyword_pattern = _compile_document_filters(
+        tuple(keyword_filters or ()), tuple(policy_types or ())
+    )
     
     # Always accept PDFs - we classify after download
     # But try to determine policy type for metadata
     
-    # Policy type mapping
-    policy_type_map = {
-        "life": ["life", "lif", "living", "death", "tpd", "income protection", "trauma"],
-        "home": ["home", "house", "property", "building", "landlord", "rental", "dwelling"],
-        "contents": ["contents", "contents plus", "personal belongings", "valuables", "household contents"],
-        "motor": ["motor", "vehicle", "car", "auto", "comprehensive", "third party", "tpft"],
-        "travel": ["travel", "trip", "overseas", "holiday", "international"],
-        "health": ["health", "medical", "hospital", "dental", "optical"],
-        "business": ["business", "commercial", "liability", "sme", "professional indemnity", "public liability"],
-        "pet": ["pet", "dog", "cat", "animal"],
-        "marine": ["marine", "boat", "watercraft", "yacht"],
-    }
-    
     # Try to determine policy type from URL
-    for policy_type in (policy_types or []):
-        policy_keywords = policy_type_map.get(policy_type.lower(), [policy_type.lower()])
-        if any(pk in url_lower for pk in policy_keywords):
+    for policy_type, pattern in policy_patterns:
+        if pattern.search(url_lower):
             logger.debug(f"Accepted ({policy_type}): {url}")
             return True, policy_type
     
     # Check keyword filters for classification hints
-    if keyword_filters:
-        keyword_match = any(keyword.lower() in url_lower for keyword in keyword_filters)
-        if keyword_match:
-            logger.debug(f"Accepted (keyword match): {url}")
-            return True, "General"
+    if keyword_pattern and keyword_pattern.search(url_lower):
+        logger.debug(f"Accepted (keyword match): {url}")
+        return True, "General"
     
     # Accept all PDFs regardless - we classify after download
     if url_lower.endswith('.pdf') or url_lower.endswith('.pdf/'):
@@ -556,10 +601,10 @@ def sanitize_filename(name: str) -> str:
     SECURITY: Removes dangerous characters and prevents directory traversal.
     """
     # Remove path separators and dangerous sequences
-    safe_name = name.replace('/', '_').replace('\\', '_').replace('..', '_')
+    safe_name = name.translate(_PATH_SEPARATOR_TABLE).replace('..', '_')
     
     # Allow only alphanumeric, underscore, hyphen, period
-    safe_name = ''.join(c for c in safe_name if c.isalnum() or c in ('_', '-', '.'))
+    safe_name = _UNSAFE_FILENAME_CHARS.sub('', safe_name)
     
     # Ensure not empty and doesn't start with dot
     safe_name = safe_name.lstrip('.') or "unknown"
@@ -571,6 +616,31 @@ def sanitize_filename(name: str) -> str:
     return safe_name
 
 
+def url_fingerprint(url: str) -> int:
+    """
+    64-bit fingerprint of a URL for the crawl's visited set.
+
+    MEMORY: An int entry is far smaller than the URL string it replaces.
+    A collision only means one URL is skipped (~3e-8 at 1M URLs).
+    """
+    return int.from_bytes(
+        hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def scan_dir_names(directory: Path) -> Set[str]:
+    """
+    Snapshot the entry names of a storage directory.
+
+    OPTIMIZATION: One listdir per folder replaces a stat() per collision probe.
+    Returns an empty set if the directory does not exist yet.
+    """
+    try:
+        return set(os.listdir(directory))
+    except FileNotFoundError:
+        return set()
+
+
 def extract_insurer_name(url: str) -> str:
     """Extract and sanitize insurer name from URL."""
     domain = urlparse(url).netloc
@@ -822,13 +892,14 @@ def crawl_domain(
     session: requests.Session,
     crawl_id: int,
     time_limit: Optional[datetime] = None,
-    global_visited: Optional[Set[str]] = None,
+    global_visited: Optional[Set[int]] = None,
 ) -> Tuple[List[str], int]:
     """
     Crawl a domain to find PDF URLs with time and page limits.
     
     Args:
-        global_visited: Shared visited set across seeds to skip already-crawled URLs.
+        global_visited: Shared set of url_fingerprint() values across seeds
+            to skip already-crawled URLs.
     
     Returns:
         Tuple of (valid PDF URLs, actual pages crawled count)
@@ -872,7 +943,7 @@ def crawl_domain(
     )
     
     pdf_urls: Set[str] = set()
-    visited: Set[str] = global_visited if global_visited is not None else set()
+    visited: Set[int] = global_visited if global_visited is not None else set()
     
     # Use deque for BFS or list for DFS based on CRAWL_MODE
     if CRAWL_MODE == "breadth":
@@ -909,7 +980,8 @@ def crawl_domain(
             url = queue.popleft()
         logger.info(f"[Crawl {crawl_id}] Processing URL from queue: {url} (queue_size={len(queue)}, visited={len(visited)})")
         
-        if url in visited:
+        url_fp = url_fingerprint(url)
+        if url_fp in visited:
             logger.debug(f"[Crawl {crawl_id}] Already visited, skipping: {url}")
             continue
         
@@ -918,10 +990,10 @@ def crawl_domain(
         logger.info(f"[Crawl {crawl_id}] Robots.txt check for {url}: {can_fetch_result}")
         if not can_fetch_result:
             logger.warning(f"[Crawl {crawl_id}] BLOCKED by robots.txt: {url}")
-            visited.add(url)
+            visited.add(url_fp)
             continue
         
-        visited.add(url)
+        visited.add(url_fp)
         
         # Stay on same domain
         if not same_domain(seed_url, url):
@@ -1008,11 +1080,13 @@ def crawl_domain(
                         )
                     continue
                 
+                full_url_fp = url_fingerprint(full_url)
+
                 # Check if URL/link text suggests a document download
                 # Use HEAD request to verify (limited per page to avoid slowdown)
                 if (head_checked < MAX_HEAD_CHECKS_PER_PAGE
                         and same_domain(seed_url, full_url)
-                        and full_url not in visited
+                        and full_url_fp not in visited
                         and full_url not in pdf_urls
                         and is_potential_document_url(full_url, link_text)):
                     head_checked += 1
@@ -1028,7 +1102,7 @@ def crawl_domain(
                         continue
                 
                 # Add to queue if same domain and not visited
-                if same_domain(seed_url, full_url) and full_url not in visited:
+                if same_domain(seed_url, full_url) and full_url_fp not in visited:
                     # Track path diversity
                     url_path = urlparse(full_url).path
                     path_prefix = "/".join(url_path.split("/")[:3])  # e.g., /documents/home
@@ -1487,6 +1561,42 @@ def extract_pdf_text_sample(file_path: Path, max_chars: int = 2000) -> Optional[
     return None
 
 
+def _classify_downloaded_pdf(
+    local_path: Path,
+    pdf_url: str,
+    filename: str,
+    policy_type: str,
+    file_size: int,
+) -> Dict[str, Any]:
+    """
+    Extract a text sample from a downloaded PDF and classify it.
+
+    Runs on the classification worker pool; it touches no DB state so it can
+    overlap with the next download.
+    """
+    pdf_text = extract_pdf_text_sample(local_path)
+    return classify_document(
+        url=pdf_url,
+        filename=filename,
+        policy_type=policy_type,
+        file_size=file_size,
+        pdf_text_sample=pdf_text,
+    )
+
+
+def _find_hash_duplicate(db: Session, file_hash: str) -> Optional[Document]:
+    """
+    Find an earlier crawled document with the same content, row-locked.
+
+    Manual uploads are excluded: a crawl that finds the same PDF online should
+    still record it with its source URL and insurer.
+    """
+    return db.query(Document).filter(
+        Document.file_hash == file_hash,
+        Document.source_url != MANUAL_UPLOAD_SOURCE_URL,
+    ).with_for_update().first()
+
+
 # ============================================================================
 # MAIN CRAWL EXECUTION ENGINE
 # ============================================================================
@@ -1569,20 +1679,33 @@ def run_crawl_session(session_id: int):
             session.status = "running"
             session.started_at = datetime.now(timezone.utc)
             db.commit()
+
+            # OPTIMIZATION: Snapshot session config once; ORM attribute access
+            # goes through instrumented descriptors on every read.
+            seed_urls = tuple(session.seed_urls or ())
+            keyword_filters = tuple(session.keyword_filters or ())
+            policy_types = tuple(session.policy_types or ())
+            country = session.country
+            max_pages = session.max_pages
+            session_pk = session.id
             
             logger.info(
                 f"[Crawl {session_id}] Configuration: "
-                f"country={session.country}, max_pages={session.max_pages}, "
-                f"max_minutes={session.max_minutes}, seeds={len(session.seed_urls)}, "
-                f"filters={len(session.keyword_filters)}"
+                f"country={country}, max_pages={max_pages}, "
+                f"max_minutes={session.max_minutes}, seeds={len(seed_urls)}, "
+                f"filters={len(keyword_filters)}"
             )
             
             # Calculate time limit
             time_limit = None
+            # OPTIMIZATION: Monotonic deadline for the per-seed/per-PDF checks,
+            # cheaper than building a tz-aware datetime each time
+            deadline_mono: Optional[float] = None
             if session.max_minutes:
                 time_limit = datetime.now(timezone.utc) + timedelta(
                     minutes=session.max_minutes
                 )
+                deadline_mono = time.monotonic() + session.max_minutes * 60
                 logger.info(
                     f"[Crawl {session_id}] Time limit: {session.max_minutes} minutes "
                     f"(until {time_limit.isoformat()})"
@@ -1594,23 +1717,23 @@ def run_crawl_session(session_id: int):
             
             all_pdf_urls: Set[str] = set()
             total_pages = 0
-            global_visited: Set[str] = set()  # Share visited URLs across seeds
+            global_visited: Set[int] = set()  # Share visited URL fingerprints across seeds
             
             # CRITICAL FIX: Budget pages PER SEED to avoid spending all on one domain
-            num_seeds = len(session.seed_urls)
-            pages_per_seed = max(3, session.max_pages // max(1, num_seeds))
-            remaining_budget = session.max_pages
+            num_seeds = len(seed_urls)
+            pages_per_seed = max(3, max_pages // max(1, num_seeds))
+            remaining_budget = max_pages
             
             crawl_log(session_id, "info",
-                f"Starting crawl: {num_seeds} seeds, {session.max_pages} total pages, "
+                f"Starting crawl: {num_seeds} seeds, {max_pages} total pages, "
                 f"{pages_per_seed} pages/seed")
             logger.info(
-                f"[Crawl {session_id}] Page budget: {session.max_pages} total, "
+                f"[Crawl {session_id}] Page budget: {max_pages} total, "
                 f"{pages_per_seed}/seed ({num_seeds} seeds)")
             
             # Crawl each seed URL with budgeted pages
-            for idx, seed_url in enumerate(session.seed_urls, 1):
-                if time_limit and datetime.now(timezone.utc) > time_limit:
+            for idx, seed_url in enumerate(seed_urls, 1):
+                if deadline_mono and time.monotonic() > deadline_mono:
                     crawl_log(session_id, "warn", f"Time limit reached at seed {idx}/{num_seeds}")
                     break
                 
@@ -1630,8 +1753,8 @@ def run_crawl_session(session_id: int):
                 pdf_urls, pages_crawled = crawl_domain(
                     seed_url=seed_url,
                     max_pages=seed_budget,
-                    keyword_filters=session.keyword_filters,
-                    policy_types=session.policy_types,
+                    keyword_filters=keyword_filters,
+                    policy_types=policy_types,
                     session=http_session,
                     crawl_id=session_id,
                     time_limit=time_limit,
@@ -1656,85 +1779,272 @@ def run_crawl_session(session_id: int):
                 logger.info(
                     f"[Crawl {session_id}] Seed {idx} done: "
                     f"{len(pdf_urls)} PDFs, {pages_crawled} pages "
-                    f"(running total: {total_pages}/{session.max_pages})")
+                    f"(running total: {total_pages}/{max_pages})")
             
             # Download PDFs and create document records
             downloaded_count = 0
             filtered_count = 0
             duplicate_count = 0
             error_count = 0
-            
+
+            # Filenames on disk per storage folder, scanned once per folder
+            existing_files: Dict[str, Set[str]] = {}
+
+            def folder_files(folder: str) -> Set[str]:
+                if folder not in existing_files:
+                    existing_files[folder] = scan_dir_names(RAW_STORAGE_DIR / folder)
+                return existing_files[folder]
+
+            # Policy-type folders already created during this crawl
+            ensured_dirs: Set[str] = set()
+
             crawl_log(session_id, "info",
                 f"Phase 2: Downloading {len(all_pdf_urls)} PDF candidates")
             logger.info(
                 f"[Crawl {session_id}] Starting PDF downloads "
                 f"({len(all_pdf_urls)} candidates)"
             )
-            
-            for idx, pdf_url in enumerate(all_pdf_urls, 1):
-                # Check time limit
-                if time_limit and datetime.now(timezone.utc) > time_limit:
-                    logger.warning(
-                        f"[Crawl {session_id}] Time limit reached during downloads "
-                        f"({idx}/{len(all_pdf_urls)})"
-                    )
-                    break
-                
-                # Re-apply filters to determine policy type
-                is_valid, policy_type = is_valid_document(
-                    pdf_url,
-                    session.keyword_filters,
-                    session.policy_types
+
+            # OPTIMIZATION: Phase 2 runs as one transaction with a SAVEPOINT per
+            # PDF. Progress is polled by the dashboard every few seconds, so the
+            # transaction is only committed once per PROGRESS_COMMIT_INTERVAL
+            # and when the crawl completes.
+            last_progress_commit = time.monotonic()
+
+            # Errors not yet written to crawl_sessions.errors_count
+            pending_errors = 0
+
+            def flush_pending_errors() -> None:
+                """Add buffered errors to errors_count with a single UPDATE."""
+                nonlocal pending_errors
+                if not pending_errors:
+                    return
+                db.execute(
+                    update(CrawlSession)
+                    .where(CrawlSession.id == session_pk)
+                    .values(errors_count=func.coalesce(CrawlSession.errors_count, 0) + pending_errors)
+                    .execution_options(synchronize_session=False)
                 )
-                
-                if not is_valid:
-                    filtered_count += 1
-                    logger.debug(
-                        f"[Crawl {session_id}] Filtered out on re-check: {pdf_url}"
+                pending_errors = 0
+
+            # Hashes downloaded this crawl whose Document rows are still pending
+            # classification (not yet visible to the duplicate query)
+            queued_hashes: Set[str] = set()
+
+            def store_classified(future: Future, job: Dict[str, Any]) -> None:
+                """
+                Move a classified PDF into its policy folder and insert its Document.
+
+                Always runs on the crawl thread, which stays the single DB writer.
+                """
+                nonlocal downloaded_count, error_count, pending_errors, last_progress_commit
+
+                pdf_url = job["pdf_url"]
+                filename = job["filename"]
+                local_path = job["local_path"]
+                insurer_files = job["insurer_files"]
+                download_result = job["download_result"]
+
+                try:
+                    classification_result = future.result()
+                except Exception as e:
+                    logger.error(
+                        f"[Crawl {session_id}] Classification failed for {pdf_url}: {e}",
+                        exc_info=True
                     )
-                    continue
-                
-                # Extract insurer name
-                insurer = extract_insurer_name(pdf_url)
-                
-                # Generate safe filename
-                url_path = urlparse(pdf_url).path
-                filename = os.path.basename(url_path) or "document.pdf"
-                filename = sanitize_filename(filename)
-                
-                if not filename.endswith('.pdf'):
-                    filename += '.pdf'
-                
-                # Ensure unique filename (prevent overwrites)
-                base_name = filename.replace('.pdf', '')
-                counter = 1
-                while True:
-                    test_path = RAW_STORAGE_DIR / insurer / filename
-                    if not test_path.exists():
-                        break
-                    filename = f"{base_name}_{counter}.pdf"
-                    counter += 1
-                
-                # Download PDF with streaming - initially save to insurer folder
-                local_path = RAW_STORAGE_DIR / insurer / filename
-                download_result = download_pdf_streaming(
-                    pdf_url, local_path, http_session, session_id
-                )
-                
-                if download_result:
+                    queued_hashes.discard(download_result['file_hash'])
+                    error_count += 1
+                    pending_errors += 1
+                    return
+
+                stored = False
+                try:
+                    # Use better insurer name if found
+                    doc_insurer = classification_result.get("insurer_name") or job["insurer"]
+
+                    # Use detected policy type if available
+                    doc_policy_type = classification_result.get("detected_policy_type") or job["policy_type"] or "General"
+
+                    # Move file to policy_type folder for better organization
+                    policy_dir = RAW_STORAGE_DIR / doc_policy_type
+                    if doc_policy_type not in ensured_dirs:
+                        policy_dir.mkdir(parents=True, exist_ok=True)
+                        ensured_dirs.add(doc_policy_type)
+                    new_local_path = policy_dir / local_path.name
+                    policy_files = folder_files(doc_policy_type)
+
+                    # Handle filename collision in policy_type folder
+                    if new_local_path != local_path and new_local_path.name in policy_files:
+                        base = local_path.stem
+                        ext = local_path.suffix
+                        move_counter = 1
+                        while new_local_path.name in policy_files:
+                            new_local_path = policy_dir / f"{base}_{move_counter}{ext}"
+                            move_counter += 1
+
                     try:
-                        # CRITICAL: Check for duplicate BEFORE insert
-                        existing_doc = db.query(Document).filter(
-                            Document.file_hash == download_result['file_hash']
-                        ).with_for_update().first()
-                        
-                        if existing_doc:
-                            # Check if existing file still exists on disk
-                            existing_file_path = None
-                            if existing_doc.local_file_path:
-                                existing_file_path = Path(existing_doc.local_file_path)
-                            
-                            if existing_file_path and existing_file_path.exists():
+                        if local_path.exists() and local_path != new_local_path:
+                            # Same filesystem (both under RAW_STORAGE_DIR): a single rename
+                            os.replace(local_path, new_local_path)
+                            insurer_files.discard(local_path.name)
+                            policy_files.add(new_local_path.name)
+                            local_path = new_local_path
+                    except Exception as move_err:
+                        logger.warning(
+                            f"[Crawl {session_id}] Could not move file to policy_type folder: {move_err}. "
+                            f"Keeping in original location."
+                        )
+
+                    logger.info(
+                        f"[Crawl {session_id}] Classified '{filename}': "
+                        f"{classification_result['classification']} "
+                        f"({classification_result['confidence']*100:.0f}% confidence, "
+                        f"policy_type={doc_policy_type}, "
+                        f"status={classification_result['status']})"
+                    )
+
+                    # Create document record with classification
+                    doc = Document(
+                        crawl_session_id=session_pk,
+                        source_url=pdf_url,
+                        insurer=doc_insurer,
+                        local_file_path=str(local_path),
+                        file_size=download_result['file_size'],
+                        file_hash=download_result['file_hash'],
+                        country=country,
+                        policy_type=doc_policy_type,
+                        document_type=classification_result["classification"],
+                        classification=classification_result["classification"],
+                        confidence=classification_result["confidence"],
+                        status=classification_result["status"],
+                        warnings=classification_result["warnings"] if classification_result["warnings"] else None,
+                        metadata_json=classification_result["metadata"],
+                    )
+
+                    # SAVEPOINT per PDF: a failed insert only rolls back this row.
+                    # Releasing it flushes, so the hash duplicate check sees the row.
+                    with db.begin_nested():
+                        db.add(doc)
+                    stored = True
+                    queued_hashes.discard(download_result['file_hash'])
+                    downloaded_count += 1
+
+                    # Update session stats
+                    session.pdfs_downloaded = downloaded_count
+                    session.progress_pct = 50 + min(
+                        50,
+                        int((job["idx"] / max(len(all_pdf_urls), 1)) * 50)
+                    )
+                    if time.monotonic() - last_progress_commit > PROGRESS_COMMIT_INTERVAL:
+                        flush_pending_errors()
+                        db.commit()
+                        last_progress_commit = time.monotonic()
+
+                    if downloaded_count % 10 == 0:
+                        logger.info(
+                            f"[Crawl {session_id}] Progress: "
+                            f"{downloaded_count}/{len(all_pdf_urls)} downloaded, "
+                            f"{duplicate_count} duplicates, {filtered_count} filtered"
+                        )
+                        crawl_log(session_id, "info",
+                            f"Downloaded {downloaded_count}/{len(all_pdf_urls)} PDFs "
+                            f"({duplicate_count} dups, {filtered_count} filtered)")
+
+                except Exception as e:
+                    # Contain any per-PDF failure (bad classifier output, file
+                    # move, insert): letting it escape would roll back every row
+                    # inserted since the last progress commit, whose files have
+                    # already been moved into storage
+                    logger.error(
+                        f"[Crawl {session_id}] Error storing {pdf_url}: {e}",
+                        exc_info=True
+                    )
+                    if not stored:
+                        # No row references this PDF, so don't leave it orphaned
+                        local_path.unlink(missing_ok=True)
+                    queued_hashes.discard(download_result['file_hash'])
+                    error_count += 1
+                    pending_errors += 1
+
+            # OPTIMIZATION: Text extraction + classification is CPU work, downloads
+            # are network-bound. Classify on a worker pool while the next PDF
+            # downloads; results are stored in download order on this thread.
+            pending: deque = deque()
+
+            with ThreadPoolExecutor(
+                max_workers=max(1, CRAWL_PDF_CONCURRENCY),
+                thread_name_prefix=f"crawl-{session_id}-classify",
+            ) as classify_pool:
+                for idx, pdf_url in enumerate(all_pdf_urls, 1):
+                    # Check time limit
+                    if deadline_mono and time.monotonic() > deadline_mono:
+                        logger.warning(
+                            f"[Crawl {session_id}] Time limit reached during downloads "
+                            f"({idx}/{len(all_pdf_urls)})"
+                        )
+                        break
+
+                    # Re-apply filters to determine policy type
+                    is_valid, policy_type = is_valid_document(
+                        pdf_url,
+                        keyword_filters,
+                        policy_types
+                    )
+
+                    if not is_valid:
+                        filtered_count += 1
+                        logger.debug(
+                            f"[Crawl {session_id}] Filtered out on re-check: {pdf_url}"
+                        )
+                        continue
+
+                    # Extract insurer name
+                    insurer = extract_insurer_name(pdf_url)
+
+                    # Generate safe filename
+                    url_path = urlparse(pdf_url).path
+                    filename = os.path.basename(url_path) or "document.pdf"
+                    filename = sanitize_filename(filename)
+
+                    if not filename.endswith('.pdf'):
+                        filename += '.pdf'
+
+                    # Ensure unique filename (prevent overwrites)
+                    insurer_files = folder_files(insurer)
+                    base_name = filename.replace('.pdf', '')
+                    counter = 1
+                    while filename in insurer_files:
+                        filename = f"{base_name}_{counter}.pdf"
+                        counter += 1
+
+                    # Download PDF with streaming - initially save to insurer folder
+                    local_path = RAW_STORAGE_DIR / insurer / filename
+                    download_result = download_pdf_streaming(
+                        pdf_url, local_path, http_session, session_id
+                    )
+
+                    if download_result:
+                        insurer_files.add(filename)
+                        try:
+                            # CRITICAL: Check for duplicate BEFORE insert
+                            if download_result['file_hash'] in queued_hashes:
+                                existing_doc = None
+                                is_duplicate = True
+                            else:
+                                existing_doc = _find_hash_duplicate(
+                                    db, download_result['file_hash']
+                                )
+                                is_duplicate = False
+
+                            if existing_doc:
+                                # Check if existing file still exists on disk
+                                existing_file_path = None
+                                if existing_doc.local_file_path:
+                                    existing_file_path = Path(existing_doc.local_file_path)
+
+                                is_duplicate = bool(existing_file_path and existing_file_path.exists())
+
+                            if is_duplicate:
                                 # True duplicate - file exists, skip
                                 logger.info(
                                     f"[Crawl {session_id}] Duplicate PDF "
@@ -1743,139 +2053,78 @@ def run_crawl_session(session_id: int):
                                 try:
                                     if local_path.exists():
                                         local_path.unlink()
+                                    insurer_files.discard(filename)
                                 except Exception as e:
                                     logger.error(f"[Crawl {session_id}] Failed to delete duplicate: {e}")
-                                
+
                                 duplicate_count += 1
                                 filtered_count += 1
                                 continue
-                            else:
+
+                            if existing_doc:
                                 # File MISSING - update old record with fresh download
                                 logger.warning(
                                     f"[Crawl {session_id}] Hash match but file missing! "
                                     f"Re-downloading doc #{existing_doc.id}: {pdf_url}"
                                 )
-                                existing_doc.local_file_path = str(local_path)
-                                existing_doc.source_url = pdf_url
-                                existing_doc.file_size = download_result['file_size']
-                                existing_doc.crawl_session_id = session_id
-                                db.commit()
+                                with db.begin_nested():
+                                    existing_doc.local_file_path = str(local_path)
+                                    existing_doc.source_url = pdf_url
+                                    existing_doc.file_size = download_result['file_size']
+                                    existing_doc.crawl_session_id = session_id
                                 download_count += 1
                                 logger.info(
                                     f"[Crawl {session_id}] ✅ Re-downloaded doc #{existing_doc.id}: "
                                     f"{filename} ({download_result['file_size'] / 1024:.1f}KB)"
                                 )
                                 continue
-                        
-                        # ============================================
-                        # CLASSIFICATION PIPELINE
-                        # ============================================
-                        
-                        # Try to extract text from PDF for better classification
-                        pdf_text = extract_pdf_text_sample(local_path)
-                        
-                        # Run classification engine
-                        classification_result = classify_document(
-                            url=pdf_url,
-                            filename=filename,
-                            policy_type=policy_type or "General",
-                            file_size=download_result['file_size'],
-                            pdf_text_sample=pdf_text,
-                        )
-                        
-                        # Use better insurer name if found
-                        doc_insurer = classification_result.get("insurer_name") or insurer
-                        
-                        # Use detected policy type if available
-                        doc_policy_type = classification_result.get("detected_policy_type") or policy_type or "General"
-                        
-                        # Move file to policy_type folder for better organization
-                        policy_dir = RAW_STORAGE_DIR / doc_policy_type
-                        policy_dir.mkdir(parents=True, exist_ok=True)
-                        new_local_path = policy_dir / local_path.name
-                        
-                        # Handle filename collision in policy_type folder
-                        if new_local_path.exists() and new_local_path != local_path:
-                            base = local_path.stem
-                            ext = local_path.suffix
-                            move_counter = 1
-                            while new_local_path.exists():
-                                new_local_path = policy_dir / f"{base}_{move_counter}{ext}"
-                                move_counter += 1
-                        
-                        try:
-                            if local_path.exists() and local_path != new_local_path:
-                                import shutil
-                                shutil.move(str(local_path), str(new_local_path))
-                                local_path = new_local_path
-                        except Exception as move_err:
-                            logger.warning(
-                                f"[Crawl {session_id}] Could not move file to policy_type folder: {move_err}. "
-                                f"Keeping in original location."
+
+                            # ============================================
+                            # CLASSIFICATION PIPELINE
+                            # ============================================
+
+                            queued_hashes.add(download_result['file_hash'])
+                            future = classify_pool.submit(
+                                _classify_downloaded_pdf,
+                                local_path,
+                                pdf_url,
+                                filename,
+                                policy_type or "General",
+                                download_result['file_size'],
                             )
-                        
-                        logger.info(
-                            f"[Crawl {session_id}] Classified '{filename}': "
-                            f"{classification_result['classification']} "
-                            f"({classification_result['confidence']*100:.0f}% confidence, "
-                            f"policy_type={doc_policy_type}, "
-                            f"status={classification_result['status']})"
-                        )
-                        
-                        # Create document record with classification
-                        doc = Document(
-                            crawl_session_id=session.id,
-                            source_url=pdf_url,
-                            insurer=doc_insurer,
-                            local_file_path=str(local_path),
-                            file_size=download_result['file_size'],
-                            file_hash=download_result['file_hash'],
-                            country=session.country,
-                            policy_type=doc_policy_type,
-                            document_type=classification_result["classification"],
-                            classification=classification_result["classification"],
-                            confidence=classification_result["confidence"],
-                            status=classification_result["status"],
-                            warnings=classification_result["warnings"] if classification_result["warnings"] else None,
-                            metadata_json=classification_result["metadata"],
-                        )
-                        
-                        db.add(doc)
-                        downloaded_count += 1
-                        
-                        # Update session stats
-                        session.pdfs_downloaded = downloaded_count
-                        session.progress_pct = 50 + min(
-                            50,
-                            int((idx / max(len(all_pdf_urls), 1)) * 50)
-                        )
-                        db.commit()
-                        
-                        if downloaded_count % 10 == 0:
-                            logger.info(
-                                f"[Crawl {session_id}] Progress: "
-                                f"{downloaded_count}/{len(all_pdf_urls)} downloaded, "
-                                f"{duplicate_count} duplicates, {filtered_count} filtered"
+                            pending.append((future, {
+                                "idx": idx,
+                                "pdf_url": pdf_url,
+                                "filename": filename,
+                                "local_path": local_path,
+                                "insurer": insurer,
+                                "insurer_files": insurer_files,
+                                "policy_type": policy_type,
+                                "download_result": download_result,
+                            }))
+
+                        except SQLAlchemyError as e:
+                            logger.error(
+                                f"[Crawl {session_id}] Database error processing {pdf_url}: {e}",
+                                exc_info=True
                             )
-                            crawl_log(session_id, "info",
-                                f"Downloaded {downloaded_count}/{len(all_pdf_urls)} PDFs "
-                                f"({duplicate_count} dups, {filtered_count} filtered)")
-                    
-                    except SQLAlchemyError as e:
-                        logger.error(
-                            f"[Crawl {session_id}] Database error processing {pdf_url}: {e}",
-                            exc_info=True
-                        )
+                            error_count += 1
+                            pending_errors += 1
+
+                    else:
                         error_count += 1
-                        session.errors_count = (session.errors_count or 0) + 1
-                        db.commit()
-                
-                else:
-                    error_count += 1
-                    session.errors_count = (session.errors_count or 0) + 1
-                    db.commit()
-            
+                        pending_errors += 1
+
+                    # Store whatever has finished classifying, in download order
+                    while pending and pending[0][0].done():
+                        store_classified(*pending.popleft())
+
+                # Wait for the remaining classifications
+                while pending:
+                    store_classified(*pending.popleft())
+
             # Mark as completed
+            flush_pending_errors()
             session.status = "completed"
             session.completed_at = datetime.now(timezone.utc)
             session.progress_pct = 100
@@ -1924,8 +2173,7 @@ def run_crawl_session(session_id: int):
 
         # Best-effort cache invalidation so dashboards reflect crawl updates quickly.
         try:
-            invalidate_cache_prefix("stats:")
-            invalidate_cache_prefix("documents:")
+            invalidate_cache_prefixes(["stats:", "documents:"])
         except Exception as e:
             logger.debug(f"[Crawl {session_id}] Cache invalidation failed: {e}")
         
@@ -15,14 +15,23 @@ HANDLES:
 - System reset (with transaction safety)
 - Document statistics
 """
+import csv
 import io
+import itertools
 import logging
+import mmap
+import os
 import shutil
+import stat
 import zipfile
+import zlib
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Generator
+from typing import Any, Iterator, List, Optional, Generator, Tuple, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query, Session
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.cache import invalidate_cache_prefix
@@ -31,6 +40,11 @@ from app.config import RAW_STORAGE_DIR, STORAGE_DIR
 
 logger = logging.getLogger(__name__)
 
+# Files mapped (and read ahead by the kernel) while a ZIP download is streamed
+ZIP_PREFETCH_FILES = 4
+# Slice of a mapped file copied into the archive per yielded chunk
+ZIP_WRITE_CHUNK_SIZE = 1024 * 1024
+
 # ============================================================================
 # DOCUMENT QUERIES
 # ============================================================================
@@ -40,8 +54,23 @@ def get_document_by_id(db: Session, document_id: int) -> Optional[Document]:
     return db.query(Document).filter(Document.id == document_id).first()
 
 
-def get_all_documents(
-    db: Session,
+def document_search_filter(search: str, dialect_name: str):
+    """
+    Case-insensitive substring match on insurer, source URL or classification.
+
+    ILIKE compiles to lower(col) LIKE lower(term) outside PostgreSQL. SQLite's
+    LIKE already ignores ASCII case and its lower() only folds ASCII, so a
+    plain LIKE matches the same rows without three lower() calls per row.
+    """
+    search_term = f"%{search}%"
+    columns = (Document.insurer, Document.source_url, Document.classification)
+    if dialect_name == "sqlite":
+        return or_(*(column.like(search_term) for column in columns))
+    return or_(*(column.ilike(search_term) for column in columns))
+
+
+def _apply_document_filters(
+    query: Query,
     crawl_session_id: Optional[int] = None,
     country: Optional[str] = None,
     policy_type: Optional[str] = None,
@@ -50,30 +79,8 @@ def get_all_documents(
     classification: Optional[str] = None,
     search: Optional[str] = None,
     min_confidence: Optional[float] = None,
-    limit: Optional[int] = None,
-    offset: Optional[int] = 0
-) -> List[Document]:
-    """
-    Get all documents with comprehensive filtering and pagination.
-    
-    Args:
-        db: Database session
-        crawl_session_id: Optional filter by crawl session
-        country: Filter by country
-        policy_type: Filter by policy type (Home, Pet, Motor, etc.)
-        status: Filter by status (validated, needs-review, etc.)
-        insurer: Filter by insurer name
-        classification: Filter by classification type
-        search: Search term for insurer/URL/classification
-        min_confidence: Minimum confidence threshold
-        limit: Max number of results (None = all)
-        offset: Skip this many results (for pagination)
-    
-    Returns:
-        List of Document objects
-    """
-    query = db.query(Document)
-    
+) -> Query:
+    """Apply the shared document filters to a Document (or Document column) query."""
     if crawl_session_id:
         query = query.filter(Document.crawl_session_id == crawl_session_id)
     
@@ -93,16 +100,60 @@ def get_all_documents(
         query = query.filter(Document.classification == classification)
     
     if search:
-        search_term = f"%{search}%"
         query = query.filter(
-            (Document.insurer.ilike(search_term)) |
-            (Document.source_url.ilike(search_term)) |
-            (Document.classification.ilike(search_term))
+            document_search_filter(search, query.session.get_bind().dialect.name)
         )
     
     if min_confidence is not None:
         query = query.filter(Document.confidence >= min_confidence)
     
+    return query
+
+
+def get_all_documents(
+    db: Session,
+    crawl_session_id: Optional[int] = None,
+    country: Optional[str] = None,
+    policy_type: Optional[str] = None,
+    status: Optional[str] = None,
+    insurer: Optional[str] = None,
+    classification: Optional[str] = None,
+    search: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = 0
+) -> List[Document]:
+    """
+    Get all documents with comprehensive filtering and pagination.
+    
+    Args:
+        db: Database session
+        crawl_session_id: Optional filter by crawl session
+        country: Filter by country
+        policy_type: Filter by policy type (Home, Pet, Motor, etc.)
+        status: Filter by status (validated, needs-review, etc.)
+        insurer: Filter by insurer name
+        classification: Filter by classification type
+        search: Search term for insurer/URL/classification
+        min_confidence: Minimum confidence threshold
+        limit: Max number of results (None = all)
+        offset: Skip this many results (for pagination)
+    
+    Returns:
+        List of Document objects
+    """
+    query = _apply_document_filters(
+        db.query(Document),
+        crawl_session_id=crawl_session_id,
+        country=country,
+        policy_type=policy_type,
+        status=status,
+        insurer=insurer,
+        classification=classification,
+        search=search,
+        min_confidence=min_confidence,
+    )
+    
     # Order by creation date (newest first) for consistent pagination
     query = query.order_by(Document.created_at.desc())
     
@@ -176,7 +227,12 @@ def get_document_file_path(document: Document) -> Optional[Path]:
         if file_path is None:
             return None
         
-        if file_path.exists() and file_path.is_file():
+        # One stat() instead of exists() + is_file()
+        try:
+            is_file = stat.S_ISREG(file_path.stat().st_mode)
+        except FileNotFoundError:
+            is_file = False
+        if is_file:
             return file_path
         
         logger.warning(
@@ -196,74 +252,194 @@ def get_document_file_path(document: Document) -> Optional[Path]:
 # STREAMING ZIP GENERATION (CRITICAL IMPROVEMENT)
 # ============================================================================
 
+class _ZipChunkSink(io.RawIOBase):
+    """Write-only, unseekable sink that collects ZIP output until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _map_file(path: Path) -> Union[mmap.mmap, bytes]:
+    """
+    Map a file read-only and ask the kernel to start reading it in.
+
+    The ZIP writer then copies straight out of the page cache instead of from
+    an intermediate bytes object. Empty files cannot be mapped and come back
+    as b"".
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapping, "madvise"):
+        try:
+            mapping.madvise(mmap.MADV_WILLNEED)
+        except OSError:
+            pass  # Only a hint
+    return mapping
+
+
+def _mapped_document_files(
+    file_paths: List[Path]
+) -> Iterator[Tuple[Path, Optional[Union[mmap.mmap, bytes]]]]:
+    """
+    Map files in input order, ZIP_PREFETCH_FILES ahead of the consumer.
+
+    Mapping a file with MADV_WILLNEED starts asynchronous kernel readahead, so
+    the next files come off disk while the current entry is written. Each
+    mapping is closed once the consumer moves on. A file that cannot be
+    opened yields None.
+    """
+    def _map(path: Path) -> Optional[Union[mmap.mmap, bytes]]:
+        try:
+            return _map_file(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading {path} for ZIP: {e}")
+            return None
+
+    pending: deque = deque()
+    paths = iter(file_paths)
+    try:
+        for path in itertools.islice(paths, ZIP_PREFETCH_FILES):
+            pending.append((path, _map(path)))
+        while pending:
+            path, mapping = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, _map(next_path)))
+            try:
+                yield path, mapping
+            finally:
+                if isinstance(mapping, mmap.mmap):
+                    mapping.close()
+    finally:
+        for _, mapping in pending:
+            if isinstance(mapping, mmap.mmap):
+                mapping.close()
+
+
+# Undocumented ZipFile attributes _write_stored_entry relies on (stable since
+# Python 3.6); if a release drops one, entries fall back to ZipFile.open()
+_ZIPFILE_WRITE_INTERNALS = ("fp", "start_dir", "filelist", "NameToInfo")
+
+
+def _write_stored_entry(
+    zipf: zipfile.ZipFile,
+    sink: _ZipChunkSink,
+    zinfo: zipfile.ZipInfo,
+    data: Union[mmap.mmap, bytes],
+) -> Iterator[bytes]:
+    """
+    Write one STORED entry with its CRC and sizes in the local header.
+
+    ZipFile.open() on an unseekable sink zeroes them and appends a data
+    descriptor, even when they are set on the ZipInfo beforehand, and
+    streaming readers (unzip from stdin, Java's ZipInputStream) reject that
+    for STORED entries. The data is already mapped, so the CRC is computed
+    up front and the header written by hand; the entry is then registered so
+    close() lists it in the central directory.
+    """
+    zinfo.compress_type = zipfile.ZIP_STORED
+    zinfo.file_size = len(data)
+    if not all(hasattr(zipf, name) for name in _ZIPFILE_WRITE_INTERNALS):
+        with zipf.open(zinfo, "w") as dest, memoryview(data) as view:
+            for offset in range(0, len(view), ZIP_WRITE_CHUNK_SIZE):
+                dest.write(view[offset:offset + ZIP_WRITE_CHUNK_SIZE])
+                yield sink.drain()
+        return
+
+    zinfo.compress_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    with memoryview(data) as view:
+        for offset in range(0, len(view), ZIP_WRITE_CHUNK_SIZE):
+            zipf.fp.write(view[offset:offset + ZIP_WRITE_CHUNK_SIZE])
+            yield sink.drain()
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+
+
 def generate_zip_stream(
     documents: List[Document]
 ) -> Generator[bytes, None, None]:
     """
     Generate ZIP file as a stream without writing to disk.
     
-    CRITICAL IMPROVEMENT FROM V5:
-    - Generates ZIP in memory
-    - Yields chunks for streaming response
-    - No temporary file on disk
-    - Much more memory efficient for large datasets
+    - Entries are STORED: PDFs are already compressed, so deflate only costs CPU.
+      CRC and sizes go in each local header (no data descriptors), so the
+      archive can also be read front to back by streaming unzip tools
+    - Files are memory-mapped and written in ZIP_WRITE_CHUNK_SIZE slices, each
+      yielded straight away, so memory holds one slice rather than whole files
+    - Upcoming files are prefetched by the kernel (see _mapped_document_files)
     
     Yields:
         Bytes chunks of ZIP file
     """
-    # Use BytesIO as in-memory buffer
-    buffer = io.BytesIO()
-    
     logger.info(f"Generating ZIP stream for {len(documents)} documents")
     
-    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        files_added = 0
-        total_size = 0
-        
-        for doc in documents:
-            file_path = get_document_file_path(doc)
+    entries = []
+    for doc in documents:
+        file_path = get_document_file_path(doc)
+        if file_path:
+            # Create logical path in ZIP: policy_type/filename
+            entries.append((file_path, f"{doc.policy_type or 'General'}/{file_path.name}"))
+        else:
+            logger.warning(
+                f"Skipping document {doc.id} - file not found: "
+                f"{doc.local_file_path}"
+            )
+    
+    sink = _ZipChunkSink()
+    files_added = 0
+    total_size = 0
+    
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+        file_data = _mapped_document_files([file_path for file_path, _ in entries])
+        for (file_path, arc_name), (_, data) in zip(entries, file_data):
+            if data is None:
+                continue
+            try:
+                zinfo = zipfile.ZipInfo.from_file(file_path, arcname=arc_name)
+                yield from _write_stored_entry(zipf, sink, zinfo, data)
+            except Exception as e:
+                logger.error(
+                    f"Error adding {file_path} to ZIP: {e}",
+                    exc_info=True
+                )
+                continue
             
-            if file_path:
-                try:
-                    # Create logical path in ZIP: policy_type/filename
-                    arc_name = f"{doc.policy_type or 'General'}/{file_path.name}"
-                    
-                    # Add file to ZIP
-                    zipf.write(file_path, arcname=arc_name)
-                    
-                    files_added += 1
-                    total_size += file_path.stat().st_size
-                    
-                    if files_added % 50 == 0:
-                        logger.debug(
-                            f"Added {files_added}/{len(documents)} files to ZIP "
-                            f"({total_size / 1024 / 1024:.2f}MB)"
-                        )
-                
-                except Exception as e:
-                    logger.error(
-                        f"Error adding {file_path} to ZIP: {e}",
-                        exc_info=True
-                    )
-            else:
-                logger.warning(
-                    f"Skipping document {doc.id} - file not found: "
-                    f"{doc.local_file_path}"
+            files_added += 1
+            total_size += len(data)
+            
+            if files_added % 50 == 0:
+                logger.debug(
+                    f"Added {files_added}/{len(documents)} files to ZIP "
+                    f"({total_size / 1024 / 1024:.2f}MB)"
                 )
+            
+            yield sink.drain()
+    
+    # Central directory is written on close
+    yield sink.drain()
     
     logger.info(
         f"ZIP stream generated: {files_added} files, "
         f"{total_size / 1024 / 1024:.2f}MB"
     )
-    
-    # Get ZIP bytes and yield in chunks
-    buffer.seek(0)
-    
-    while True:
-        chunk = buffer.read(8192)  # 8KB chunks
-        if not chunk:
-            break
-        yield chunk
 
 
 def create_download_zip_stream(
@@ -326,6 +502,73 @@ def create_download_zip_stream(
     return generate_zip_stream(downloadable)
 
 
+# ============================================================================
+# STREAMING CSV EXPORT
+# ============================================================================
+
+CSV_EXPORT_COLUMNS = (
+    "ID", "Insurer", "Policy Type", "Classification",
+    "Country", "Confidence", "Status", "Source URL",
+)
+# Rows fetched per round-trip, and rows per yielded chunk
+CSV_EXPORT_BATCH_SIZE = 1000
+
+
+def generate_csv_stream(
+    bind: Union[Engine, Connection],
+    **filters: Any,
+) -> Generator[str, None, None]:
+    """
+    Stream filtered documents as CSV without loading the result set.
+    
+    Runs on its own session from `bind` because the request session is closed
+    before a streaming body is sent. Only the exported columns are selected and
+    rows are fetched CSV_EXPORT_BATCH_SIZE at a time (a server-side cursor on
+    MySQL/PostgreSQL), so memory is constant in the number of documents.
+    Columns match the client-side export on the Library page.
+    
+    Yields:
+        CSV text chunks, header first
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def _drain() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+    
+    writer.writerow(CSV_EXPORT_COLUMNS)
+    yield _drain()
+    
+    with Session(bind=bind) as export_db:
+        rows = _apply_document_filters(
+            export_db.query(
+                Document.id,
+                Document.insurer,
+                Document.policy_type,
+                Document.classification,
+                Document.country,
+                Document.confidence,
+                Document.status,
+                Document.source_url,
+            ),
+            **filters,
+        ).order_by(Document.created_at.desc()).yield_per(CSV_EXPORT_BATCH_SIZE)
+        
+        for count, row in enumerate(rows, 1):
+            writer.writerow((
+                row.id, row.insurer, row.policy_type, row.classification,
+                row.country, f"{(row.confidence or 0) * 100:.0f}%",
+                row.status, row.source_url,
+            ))
+            if count % CSV_EXPORT_BATCH_SIZE == 0:
+                yield _drain()
+    
+    yield _drain()
+
+
 # ============================================================================
 # SYSTEM RESET (WITH TRANSACTION SAFETY)
 # ============================================================================
@@ -499,6 +742,7 @@ def get_document_stats(db: Session) -> dict:
 # ============================================================================
 
 __all__ = [
+    'document_search_filter',
     'get_document_by_id',
     'get_all_documents',
     'get_document_count',
@@ -6,17 +6,50 @@ v7: Updated URLs to target specific policy document/wording pages.
 """
 import json
 import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.config import USER_AGENT
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 CUSTOM_INSURERS_FILE = Path(__file__).parent.parent.parent / "storage" / "custom_insurers.json"
 
+# Shared HTTP session for seed URL validation (keep-alive across calls)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+_SESSION.headers.update({"User-Agent": USER_AGENT})
+
+# Max concurrent HEAD requests per validation call
+VALIDATION_MAX_WORKERS = 16
+
+# Per-URL validation results: url -> (monotonic timestamp, result), LRU-ordered
+VALIDATION_TTL = 300.0
+VALIDATION_CACHE_MAX_SIZE = 4096
+_VALIDATION_CACHE: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+_VALIDATION_CACHE_LOCK = threading.Lock()
+
+# Parsed custom_insurers.json, reused while the file's mtime is unchanged.
+# The cached dict is shared: callers must not mutate it.
+_CUSTOM_CACHE: Dict[str, Any] = {"mtime": None, "data": {}}
+
 NZ_INSURERS: Dict[str, Dict] = {
     "AA Insurance": {
         "seed_urls": [
@@ -373,6 +406,16 @@ UK_INSURERS: Dict[str, Dict] = {
     },
 }
 
+# Freeze the built-in registry: seed_urls/policy_types become tuples inside
+# read-only mappings, so lookups can hand them out without defensive copies
+for _insurer_db in (NZ_INSURERS, AU_INSURERS, UK_INSURERS):
+    for _name, _info in _insurer_db.items():
+        _insurer_db[_name] = MappingProxyType({
+            "seed_urls": tuple(_info["seed_urls"]),
+            "policy_types": tuple(_info.get("policy_types", ())),
+        })
+del _insurer_db, _name, _info
+
 COUNTRY_MAP = {
     "NZ": NZ_INSURERS,
     "AU": AU_INSURERS,
@@ -385,30 +428,92 @@ COUNTRY_NAMES = {
     "UK": "United Kingdom",
 }
 
+# Insurer lookup entry: (name, lowercased name, info, frozenset of policy types)
+InsurerEntry = Tuple[str, str, Dict, FrozenSet[str]]
+
+
+def _insurer_entry(name: str, info: Dict) -> InsurerEntry:
+    return (name, name.lower(), info, frozenset(info.get("policy_types", ())))
+
+
+# Built-in insurers per country, built once at import
+_BUILTIN_BY_COUNTRY: Dict[str, Tuple[InsurerEntry, ...]] = {
+    ck: tuple(_insurer_entry(name, info) for name, info in insurer_db.items())
+    for ck, insurer_db in COUNTRY_MAP.items()
+}
+_BUILTIN_KEYS: Dict[str, Tuple[str, ...]] = {
+    ck: tuple(insurer_db.keys()) for ck, insurer_db in COUNTRY_MAP.items()
+}
+
 
 # ============================================================================
 # CUSTOM INSURER PERSISTENCE
 # ============================================================================
 
 def _load_custom_insurers() -> Dict[str, Dict[str, Dict]]:
-    if not CUSTOM_INSURERS_FILE.exists():
+    # OPTIMIZATION: Only re-parse when the mtime changes; the common path is one stat()
+    try:
+        mtime = os.stat(CUSTOM_INSURERS_FILE).st_mtime_ns
+    except FileNotFoundError:
         return {}
+    if mtime == _CUSTOM_CACHE["mtime"]:
+        return _CUSTOM_CACHE["data"]
+    # EAFP: the file may be replaced or removed after the stat above; take the
+    # mtime from the open handle so it matches the bytes actually read
     try:
-        with open(CUSTOM_INSURERS_FILE, "r") as f:
-            return json.load(f)
+        with open(CUSTOM_INSURERS_FILE, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            raw = f.read()
+    except FileNotFoundError:
+        return {}
+    except OSError as e:
+        logger.warning(f"Failed to load custom insurers: {e}")
+        return {}
+    try:
+        data = orjson.loads(raw) if orjson else json.loads(raw)
     except Exception as e:
         logger.warning(f"Failed to load custom insurers: {e}")
         return {}
+    _CUSTOM_CACHE["data"] = data
+    _CUSTOM_CACHE["mtime"] = mtime
+    return data
+
+
+def _copy_custom_insurers() -> Dict[str, Dict[str, Dict]]:
+    # Mutable copy for add/remove; the cached dict itself is shared
+    return {ck: dict(insurers) for ck, insurers in _load_custom_insurers().items()}
 
 
 def _save_custom_insurers(data: Dict[str, Dict[str, Dict]]) -> None:
     CUSTOM_INSURERS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(CUSTOM_INSURERS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+    # Write a uniquely named temp file, fsync it, then swap it in: a crash or
+    # power loss never leaves truncated JSON, and concurrent saves don't share
+    # a temp file
+    tmp_file = tempfile.NamedTemporaryFile(
+        dir=CUSTOM_INSURERS_FILE.parent,
+        prefix=f".{CUSTOM_INSURERS_FILE.name}.",
+        suffix=".tmp",
+        delete=False,
+    )
+    try:
+        with tmp_file as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file.name, CUSTOM_INSURERS_FILE)
+    except BaseException:
+        Path(tmp_file.name).unlink(missing_ok=True)
+        raise
+    # Force a re-read even if the mtime granularity hides the change
+    _CUSTOM_CACHE["mtime"] = None
 
 
 def add_custom_insurer(country: str, insurer_name: str, seed_urls: List[str], policy_types: Optional[List[str]] = None) -> Dict:
-    custom = _load_custom_insurers()
+    custom = _copy_custom_insurers()
     ck = country.upper()
     if ck not in custom:
         custom[ck] = {}
@@ -419,7 +524,7 @@ def add_custom_insurer(country: str, insurer_name: str, seed_urls: List[str], po
 
 
 def remove_custom_insurer(country: str, insurer_name: str) -> bool:
-    custom = _load_custom_insurers()
+    custom = _copy_custom_insurers()
     ck = country.upper()
     if ck in custom and insurer_name in custom[ck]:
         del custom[ck][insurer_name]
@@ -435,14 +540,30 @@ def list_custom_insurers(country: Optional[str] = None) -> Dict:
     return custom
 
 
+# Per-country {seed_url: [insurer, ...]} index, paired with the custom-insurer
+# dict it was built from so it is rebuilt when custom_insurers.json changes
+_URL_INDEX_CACHE: Dict[str, Tuple[Optional[Dict], Dict[str, List[str]]]] = {}
+
+
+def _url_to_insurers(ck: str) -> Dict[str, List[str]]:
+    custom_for_country = _load_custom_insurers().get(ck)
+    cached = _URL_INDEX_CACHE.get(ck)
+    if cached is not None and cached[0] is custom_for_country:
+        return cached[1]
+    index: Dict[str, List[str]] = {}
+    for entry in get_seed_urls(country=ck):
+        for url in entry["seed_urls"]:
+            index.setdefault(url, []).append(entry["insurer"])
+    _URL_INDEX_CACHE[ck] = (custom_for_country, index)
+    return index
+
+
 def resolve_insurers_from_urls(seed_urls: List[str], country: str = "NZ") -> List[str]:
-    all_insurers = get_seed_urls(country=country)
+    # OPTIMIZATION: One dict lookup per requested URL instead of scanning every insurer
+    index = _url_to_insurers(country.upper())
     matched = set()
-    for entry in all_insurers:
-        for url in entry["seed_urls"]:
-            if url in seed_urls:
-                matched.add(entry["insurer"])
-                break
+    for url in set(seed_urls):
+        matched.update(index.get(url, ()))
     return sorted(matched)
 
 
@@ -450,25 +571,44 @@ def resolve_insurers_from_urls(seed_urls: List[str], country: str = "NZ") -> Lis
 # SERVICE FUNCTIONS
 # ============================================================================
 
+# Per-country merged entries, paired with the custom-insurer dict they were built from
+_MERGED_ENTRIES_CACHE: Dict[str, Tuple[Dict, Tuple[InsurerEntry, ...]]] = {}
+
+
+def _merged_entries(ck: str, custom_for_country: Dict) -> Tuple[InsurerEntry, ...]:
+    cached = _MERGED_ENTRIES_CACHE.get(ck)
+    if cached is not None and cached[0] is custom_for_country:
+        return cached[1]
+    insurer_db = {**COUNTRY_MAP.get(ck, {}), **custom_for_country}
+    entries = tuple(_insurer_entry(name, info) for name, info in insurer_db.items())
+    _MERGED_ENTRIES_CACHE[ck] = (custom_for_country, entries)
+    return entries
+
+
 def get_seed_urls(country: str = "NZ", policy_type: Optional[str] = None, insurer: Optional[str] = None, validate: bool = False) -> List[Dict]:
+    # Built-in entries share the registry's tuples: treat seed_urls/policy_types as read-only
     ck = country.upper()
-    insurer_db = dict(COUNTRY_MAP.get(ck, {}))
     custom = _load_custom_insurers()
-    if ck in custom:
-        for name, info in custom[ck].items():
-            insurer_db[name] = info
-
-    if not insurer_db:
+    custom_for_country = custom.get(ck)
+    if custom_for_country:
+        entries = _merged_entries(ck, custom_for_country)
+    else:
+        # OPTIMIZATION: No custom insurers - use the precomputed built-ins as is
+        entries = _BUILTIN_BY_COUNTRY.get(ck, ())
+
+    if not entries:
         logger.warning(f"No insurers configured for country: {country}")
         return []
 
+    insurer_lower = insurer.lower() if insurer else None
+    custom_names = custom_for_country or {}
     results = []
-    for name, info in insurer_db.items():
-        if insurer and insurer.lower() not in name.lower():
+    for name, name_lower, info, policy_set in entries:
+        if insurer_lower and insurer_lower not in name_lower:
             continue
-        if policy_type and policy_type not in info.get("policy_types", []):
+        if policy_type and policy_type not in policy_set:
             continue
-        is_custom = ck in custom and name in custom.get(ck, {})
+        is_custom = name in custom_names
         entry = {"insurer": name, "seed_urls": info["seed_urls"], "policy_types": info.get("policy_types", []), "country": ck, "is_custom": is_custom}
         if validate:
             entry["validated_urls"] = _validate_urls(info["seed_urls"])
@@ -491,23 +631,56 @@ def get_supported_countries() -> List[str]:
 
 
 def get_insurers_list(country: str = "NZ") -> List[str]:
-    insurer_db = dict(COUNTRY_MAP.get(country.upper(), {}))
-    custom = _load_custom_insurers()
-    if country.upper() in custom:
-        insurer_db.update(custom[country.upper()])
-    return list(insurer_db.keys())
+    ck = country.upper()
+    custom_for_country = _load_custom_insurers().get(ck)
+    builtin_keys = _BUILTIN_KEYS.get(ck, ())
+    if not custom_for_country:
+        return list(builtin_keys)
+    # Custom names that shadow a built-in keep the built-in's position
+    return list(builtin_keys) + [name for name in custom_for_country if name not in COUNTRY_MAP.get(ck, {})]
+
+
+def _head_url(url: str) -> Dict:
+    now = time.monotonic()
+    with _VALIDATION_CACHE_LOCK:
+        cached = _VALIDATION_CACHE.get(url)
+        if cached is not None and now - cached[0] < VALIDATION_TTL:
+            _VALIDATION_CACHE.move_to_end(url)
+            return cached[1]
+
+    try:
+        resp = _SESSION.head(url, timeout=10, allow_redirects=True, verify=False)
+        result = {"url": url, "reachable": resp.status_code < 400, "status_code": resp.status_code}
+    except Exception as e:
+        result = {"url": url, "reachable": False, "status_code": None, "error": str(e)}
+
+    with _VALIDATION_CACHE_LOCK:
+        _VALIDATION_CACHE[url] = (time.monotonic(), result)
+        _VALIDATION_CACHE.move_to_end(url)
+        while len(_VALIDATION_CACHE) > VALIDATION_CACHE_MAX_SIZE:
+            _VALIDATION_CACHE.popitem(last=False)
+    return result
+
+
+def _head_host_urls(urls: List[str]) -> List[Dict]:
+    # Back-to-back HEADs on one host reuse the same keep-alive connection
+    return [_head_url(url) for url in urls]
 
 
 def _validate_urls(urls: List[str]) -> List[Dict]:
-    validated = []
-    headers = {"User-Agent": USER_AGENT}
+    if not urls:
+        return []
+    # OPTIMIZATION: One worker per host, so each host pays connection setup once
+    # while different hosts are checked concurrently
+    by_host: Dict[str, List[str]] = {}
     for url in urls:
-        try:
-            resp = requests.head(url, timeout=10, headers=headers, allow_redirects=True, verify=False)
-            validated.append({"url": url, "reachable": resp.status_code < 400, "status_code": resp.status_code})
-        except Exception as e:
-            validated.append({"url": url, "reachable": False, "status_code": None, "error": str(e)})
-    return validated
+        by_host.setdefault(urlparse(url).netloc, []).append(url)
+    results: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=min(VALIDATION_MAX_WORKERS, len(by_host))) as pool:
+        for host_results in pool.map(_head_host_urls, by_host.values()):
+            for result in host_results:
+                results[result["url"]] = result
+    return [results[url] for url in urls]
 
 
 __all__ = [
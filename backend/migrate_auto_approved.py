@@ -11,6 +11,8 @@ but incorrectly marked as 'validated' (which shows as "Manually Approved").
 import sys
 sys.path.insert(0, '/app')
 
+from sqlalchemy import or_, update
+
 from app.database import SessionLocal
 from app.models import Document
 
@@ -18,38 +20,41 @@ from app.models import Document
 def migrate():
     db = SessionLocal()
     try:
-        # Find all "validated" documents that have classification metadata
-        # indicating they were auto-classified (not manually approved)
-        docs = db.query(Document).filter(
-            Document.status == "validated"
-        ).all()
+        # OPTIMIZATION: Both changes are single server-side UPDATEs; no rows are
+        # loaded into Python.
+
+        # "validated" documents whose classification metadata shows they were
+        # auto-classified (not manually approved). High-confidence docs without
+        # manual audit entries are also treated as auto-classified.
+        updated = db.execute(
+            update(Document)
+            .where(
+                Document.status == "validated",
+                or_(
+                    Document.metadata_json["classification_method"].as_string() == "rule-based-v2",
+                    Document.confidence >= 0.85,
+                ),
+            )
+            .values(status="auto-approved")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+        # Also update any "pending" docs to "needs-review" for consistency
+        pending_updated = db.execute(
+            update(Document)
+            .where(Document.status == "pending")
+            .values(status="needs-review")
+            .execution_options(synchronize_session=False)
+        ).rowcount
 
-        updated = 0
-        for doc in docs:
-            # Check if doc was auto-classified (has metadata from rule-based classifier)
-            metadata = doc.metadata_json or {}
-            is_auto = metadata.get("classification_method") == "rule-based-v2"
-            
-            # Also treat high-confidence docs without manual audit entries as auto-classified
-            if is_auto or (doc.confidence and doc.confidence >= 0.85):
-                doc.status = "auto-approved"
-                updated += 1
+        db.commit()
 
         if updated > 0:
-            db.commit()
             print(f"✓ Updated {updated} documents from 'validated' to 'auto-approved'")
         else:
             print("No documents needed updating.")
 
-        # Also update any "pending" docs to "needs-review" for consistency
-        pending_docs = db.query(Document).filter(Document.status == "pending").all()
-        pending_updated = 0
-        for doc in pending_docs:
-            doc.status = "needs-review"
-            pending_updated += 1
-
         if pending_updated > 0:
-            db.commit()
             print(f"✓ Updated {pending_updated} documents from 'pending' to 'needs-review'")
 
         print("\nMigration complete!")
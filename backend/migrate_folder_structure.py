@@ -9,84 +9,144 @@ Usage:
 """
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Allow running as standalone script
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from sqlalchemy import func, select
+
 from app.database import get_db
 from app.models import Document
 from app.config import RAW_STORAGE_DIR
 
+# Documents read, and path updates committed, per batch
+BATCH_SIZE = 500
+
+# Concurrent file moves (keep modest for rotational disks)
+MOVE_WORKERS = 8
+
 
 def migrate_to_policy_type_structure():
     """Migrate existing files from insurer folders to policy_type folders."""
     db = next(get_db())
     
     try:
-        documents = db.query(Document).all()
+        total = db.scalar(select(func.count(Document.id)))
         migrated = 0
         skipped = 0
         errors = 0
         
-        print(f"Found {len(documents)} documents to process")
+        print(f"Found {total} documents to process")
         print(f"Storage directory: {RAW_STORAGE_DIR}")
         
-        for doc in documents:
-            try:
-                old_path = Path(doc.local_file_path)
-                if not old_path.exists():
-                    print(f"  [SKIP] File not found: {old_path}")
-                    skipped += 1
-                    continue
-                
-                # Determine new path based on policy_type
-                policy_type = doc.policy_type or "General"
-                new_dir = RAW_STORAGE_DIR / policy_type
-                new_dir.mkdir(parents=True, exist_ok=True)
-                new_path = new_dir / old_path.name
-                
-                # Handle filename collision
-                if new_path.exists() and new_path != old_path:
-                    base = old_path.stem
-                    ext = old_path.suffix
-                    counter = 1
-                    while new_path.exists():
-                        new_path = new_dir / f"{base}_{counter}{ext}"
-                        counter += 1
+        # OPTIMIZATION: Walk the table in id order, BATCH_SIZE rows at a time,
+        # instead of loading every Document; each batch's path changes go out
+        # as one bulk UPDATE + commit.
+        last_id = 0
+        # Destinations claimed by planned moves that may not exist on disk yet
+        reserved: set[Path] = set()
+        # policy_type -> directory, created once per policy_type
+        policy_dirs: dict[str, Path] = {}
+        
+        with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as pool:
+            while True:
+                rows = db.execute(
+                    select(Document.id, Document.local_file_path, Document.policy_type)
+                    .where(Document.id > last_id)
+                    .order_by(Document.id)
+                    .limit(BATCH_SIZE)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
                 
-                # Move file if path changed
-                if old_path != new_path:
-                    shutil.move(str(old_path), str(new_path))
+                # Pass 1: plan destinations (sequential, so collisions resolve deterministically)
+                planned = []
+                for doc_id, local_file_path, doc_policy_type in rows:
+                    try:
+                        old_path = Path(local_file_path)
+                        if not old_path.exists():
+                            print(f"  [SKIP] File not found: {old_path}")
+                            skipped += 1
+                            continue
+                        
+                        # Determine new path based on policy_type
+                        policy_type = doc_policy_type or "General"
+                        new_dir = policy_dirs.get(policy_type)
+                        if new_dir is None:
+                            new_dir = RAW_STORAGE_DIR / policy_type
+                            new_dir.mkdir(parents=True, exist_ok=True)
+                            policy_dirs[policy_type] = new_dir
+                        
+                        # Already in its policy_type folder
+                        if old_path.parent == new_dir:
+                            skipped += 1
+                            continue
+                        
+                        new_path = new_dir / old_path.name
+                        
+                        # Handle filename collision
+                        if new_path in reserved or new_path.exists():
+                            base = old_path.stem
+                            ext = old_path.suffix
+                            counter = 1
+                            while new_path in reserved or new_path.exists():
+                                new_path = new_dir / f"{base}_{counter}{ext}"
+                                counter += 1
+                        
+                        reserved.add(new_path)
+                        planned.append((doc_id, old_path, new_path))
                     
-                    # Update database record
-                    doc.local_file_path = str(new_path)
+                    except Exception as e:
+                        print(f"  [ERROR] Doc {doc_id}: {e}")
+                        errors += 1
+                
+                # Pass 2: move files concurrently; only successful moves are recorded
+                futures = {
+                    pool.submit(shutil.move, str(old_path), str(new_path)): (doc_id, new_path)
+                    for doc_id, old_path, new_path in planned
+                }
+                updates = []
+                for future in as_completed(futures):
+                    doc_id, new_path = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"  [ERROR] Doc {doc_id}: {e}")
+                        errors += 1
+                        continue
+                    updates.append({"id": doc_id, "local_file_path": str(new_path)})
                     migrated += 1
-                    
-                    if migrated % 50 == 0:
-                        print(f"  Migrated {migrated} files...")
-                        db.commit()
-                else:
-                    skipped += 1
-            
-            except Exception as e:
-                print(f"  [ERROR] Doc {doc.id}: {e}")
-                errors += 1
+                
+                if updates:
+                    db.bulk_update_mappings(Document, updates)
+                    db.commit()
+                    print(f"  Migrated {migrated} files...")
         
-        db.commit()
         print(f"\nMigration complete:")
         print(f"  Migrated: {migrated}")
         print(f"  Skipped:  {skipped}")
         print(f"  Errors:   {errors}")
         
         # Clean up empty directories
+        # scandir reports the entry type without an extra stat, and the
+        # emptiness check stops at the first child
         cleanup_count = 0
-        if RAW_STORAGE_DIR.exists():
-            for item in RAW_STORAGE_DIR.iterdir():
-                if item.is_dir() and not any(item.iterdir()):
-                    item.rmdir()
-                    cleanup_count += 1
+        try:
+            with os.scandir(RAW_STORAGE_DIR) as entries:
+                for entry in entries:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(entry.path) as children:
+                        empty = next(children, None) is None
+                    if empty:
+                        os.rmdir(entry.path)
+                        cleanup_count += 1
+        except FileNotFoundError:
+            pass
         
         if cleanup_count:
             print(f"  Cleaned up {cleanup_count} empty directories")
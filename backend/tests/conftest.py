@@ -11,7 +11,10 @@ import os
 import sys
 
 # CRITICAL: Set environment variables BEFORE any app imports
-os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+# The app's own engine (startup create_all, health check, orphan cleanup)
+# points at a shared-cache in-memory database: pooled connections all see the
+# same schema, nothing touches disk, and each xdist worker process gets its own.
+os.environ["DATABASE_URL"] = "sqlite:///file:policycheck_app?mode=memory&cache=shared&uri=true"
 os.environ["ENVIRONMENT"] = "testing"
 os.environ["CACHE_ENABLED"] = "false"
 os.environ["METRICS_ENABLED"] = "false"
@@ -20,34 +23,68 @@ os.environ["API_RATE_LIMIT_ENABLED"] = "false"
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import functools
 import pytest
-from datetime import datetime, timezone
-from typing import Generator, Dict, Any
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import AsyncGenerator, Generator, Dict, Any, Mapping
 from io import BytesIO
+from unittest.mock import MagicMock, create_autospec
 
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event, text
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine, delete, event, insert
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
 
 # Now import app components (after env vars are set)
 from app.main import app
 from app.database import get_db
 from app.models import Base
-from app.auth import create_access_token, get_password_hash
+from app.auth import create_access_token, create_csrf_token, get_password_hash
 from app.models import User, Document, CrawlSession, AuditLog
+from app.routers import crawl_router, documents_router
 
 # ============================================================================
 # TEST DATABASE CONFIGURATION
 # ============================================================================
 
-TEST_DATABASE_URL = "sqlite:///./test.db"
+# In-memory database behind a StaticPool: every engine.connect() reuses the
+# same DBAPI connection, so there is no file I/O and no per-test connection
+# setup, and the schema lives as long as the engine.
+TEST_DATABASE_URL = "sqlite://"
 
 engine = create_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    pool_pre_ping=True,
+    poolclass=StaticPool,
 )
 
+
+@event.listens_for(engine, "connect")
+def _sqlite_on_connect(dbapi_connection, connection_record):
+    # Disable pysqlite's implicit transaction handling so SQLAlchemy's BEGIN
+    # (below) opens the test transaction and SAVEPOINTs nest inside it.
+    dbapi_connection.isolation_level = None
+    # Tests need no crash durability. Pragmas must run outside a transaction,
+    # so they can't live in db_session. (journal_mode=WAL is not applicable
+    # to an in-memory database, whose journal is already in memory.)
+    dbapi_connection.executescript(
+        "PRAGMA synchronous=OFF;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+        "PRAGMA foreign_keys=ON;"
+    )
+
+
+@event.listens_for(engine, "begin")
+def _sqlite_on_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+# Fixed timestamp for fixture rows; no test asserts on real-clock values
+_FIXED_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
 TestingSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -63,22 +100,30 @@ TestingSessionLocal = sessionmaker(
 @pytest.fixture(scope="session")
 def db_engine():
     """Create a database engine for testing (session scope)."""
-    # Create all tables
+    # Create all tables once; tests are isolated by db_session's rollback
     Base.metadata.create_all(bind=engine)
     yield engine
-    # Drop all tables after tests
-    Base.metadata.drop_all(bind=engine)
+    # The in-memory database goes away with its only connection, so there
+    # is no schema to drop
+    engine.dispose()
 
 
 @pytest.fixture(scope="function")
 def db_session(db_engine) -> Generator[Session, None, None]:
-    """Create a fresh database session for each test."""
+    """
+    Create a fresh database session for each test.
+    
+    The session joins an outer transaction through a SAVEPOINT: commit()
+    in fixtures or endpoints only releases the savepoint (and a new one is
+    started), and everything is rolled back when the test ends.
+    """
+    # With StaticPool this is the one shared connection; isolation comes from
+    # the outer transaction, so tests must not open a second one concurrently.
     connection = db_engine.connect()
     transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
-    
-    # Enable foreign key constraints for SQLite
-    session.execute(text("PRAGMA foreign_keys=ON"))
+    session = TestingSessionLocal(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
     
     yield session
     
@@ -87,120 +132,225 @@ def db_session(db_engine) -> Generator[Session, None, None]:
     connection.close()
 
 
+@pytest.fixture
+def documents_queries(db_engine) -> Generator[list[tuple[str, Any]], None, None]:
+    """(statement, DBAPI parameters) for each documents read in one test."""
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM documents" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="session")
+def _test_client() -> Generator[TestClient, None, None]:
+    """Enter the app lifespan once and share the client across tests."""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture(scope="function")
-def client(db_session) -> Generator[TestClient, None, None]:
+def client(_test_client: TestClient, db_session) -> Generator[TestClient, None, None]:
     """Create a test client with overridden database dependency."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    # The app is built once at import; only the override changes per test.
+    # A plain callable (not a generator) skips FastAPI's per-request exit
+    # stack and threadpool hop for teardown; db_session's own fixture
+    # handles cleanup.
+    app.dependency_overrides[get_db] = lambda: db_session
+    # Don't leak cookies (e.g. from login) between tests
+    _test_client.cookies.clear()
     
-    app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
+    yield _test_client
     
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+async def async_client(client: TestClient) -> AsyncGenerator[AsyncClient, None]:
+    """
+    In-process ASGI client for async tests.
+    
+    Requests are dispatched straight into the app on the test's event loop
+    instead of through TestClient's thread portal. Depends on ``client`` for
+    the lifespan startup and the get_db override.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        yield ac
+
+
 # ============================================================================
 # AUTHENTICATION FIXTURES
 # ============================================================================
 
-@pytest.fixture
-def test_user(db_session: Session) -> User:
-    """Create a test user."""
-    user = User(
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Plain copy of a template user row.
+    
+    Session-scoped users outlive every test's db_session, so fixtures hand
+    out these instead of ORM objects; use db_session.get(User, snapshot.id)
+    when a test needs the mapped instance.
+    """
+    id: int
+    username: str
+    role: str
+
+
+@functools.lru_cache(maxsize=None)
+def _password_hash(password: str) -> str:
+    """bcrypt is deliberately slow; hash each fixture password only once."""
+    return get_password_hash(password)
+
+
+def _create_template_user(db_engine, **fields) -> UserSnapshot:
+    """Commit a user once for the whole session (outside any test transaction)."""
+    with TestingSessionLocal(bind=db_engine) as session:
+        user = User(**fields)
+        session.add(user)
+        session.commit()
+        return UserSnapshot(id=user.id, username=user.username, role=user.role)
+
+
+@pytest.fixture(scope="session")
+def test_user(db_engine) -> UserSnapshot:
+    """Create a test user (once per session; per-test changes are rolled back)."""
+    return _create_template_user(
+        db_engine,
         username="testuser",
-        password_hash=get_password_hash("TestPass123!"),
+        password_hash=_password_hash("TestPass123!"),
         name="Test User",
         role="reviewer",
         country="NZ",
-        created_at=datetime.now(timezone.utc),
+        created_at=_FIXED_NOW,
     )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
 
 
-@pytest.fixture
-def admin_user(db_session: Session) -> User:
-    """Create an admin test user."""
-    user = User(
+@pytest.fixture(scope="session")
+def admin_user(db_engine) -> UserSnapshot:
+    """Create an admin test user (once per session; per-test changes are rolled back)."""
+    return _create_template_user(
+        db_engine,
         username="adminuser",
-        password_hash=get_password_hash("AdminPass123!"),
+        password_hash=_password_hash("AdminPass123!"),
         name="Admin User",
         role="admin",
         country="NZ",
-        created_at=datetime.now(timezone.utc),
+        created_at=_FIXED_NOW,
     )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
-    return user
 
 
-@pytest.fixture
-def auth_headers(test_user: User) -> Dict[str, str]:
-    """Get authentication headers for test user."""
-    token = create_access_token(data={"sub": test_user.username, "user_id": test_user.id})
-    return {"Authorization": f"Bearer {token}"}
+# Long enough to outlive any test run, so session-scoped tokens never expire mid-suite
+_TEST_TOKEN_LIFETIME = timedelta(hours=12)
 
 
-@pytest.fixture
-def admin_auth_headers(admin_user: User) -> Dict[str, str]:
-    """Get authentication headers for admin user."""
-    token = create_access_token(data={"sub": admin_user.username, "user_id": admin_user.id})
-    return {"Authorization": f"Bearer {token}"}
+def _bearer_headers(user: UserSnapshot) -> Mapping[str, str]:
+    token = create_access_token(
+        data={"sub": user.username, "user_id": user.id},
+        expires_delta=_TEST_TOKEN_LIFETIME,
+    )
+    return MappingProxyType({"Authorization": f"Bearer {token}"})
 
 
-@pytest.fixture
-def auth_headers_with_csrf(auth_headers: Dict[str, str]) -> Dict[str, str]:
-    """Get authentication headers with CSRF token."""
-    from app.auth import create_csrf_token
+@pytest.fixture(scope="session")
+def testuser_access_token(test_user: UserSnapshot) -> str:
+    """Bare access token for the test user, e.g. for ?token= query params."""
+    return create_access_token(
+        data={"sub": test_user.username}, expires_delta=_TEST_TOKEN_LIFETIME
+    )
+
+
+@pytest.fixture(scope="session")
+def auth_headers(test_user: UserSnapshot) -> Mapping[str, str]:
+    """Get authentication headers for test user.
+
+    Signed once per session and returned read-only; call ``.copy()`` before
+    adding or changing headers.
+    """
+    return _bearer_headers(test_user)
+
+
+@pytest.fixture(scope="session")
+def admin_auth_headers(admin_user: UserSnapshot) -> Mapping[str, str]:
+    """Get authentication headers for admin user.
+
+    Signed once per session and returned read-only; call ``.copy()`` before
+    adding or changing headers.
+    """
+    return _bearer_headers(admin_user)
+
+
+@pytest.fixture(scope="session")
+def auth_headers_with_csrf(auth_headers: Mapping[str, str]) -> Mapping[str, str]:
+    """Get authentication headers with CSRF token (read-only, see ``auth_headers``)."""
     headers = auth_headers.copy()
     headers["X-CSRF-Token"] = create_csrf_token(subject="testuser")
-    return headers
+    return MappingProxyType(headers)
 
 
 # ============================================================================
 # SAMPLE DATA FIXTURES
 # ============================================================================
 
+_SAMPLE_DOCUMENT_VALUES = dict(
+    source_url="https://example.com/test.pdf",
+    insurer="Test Insurer",
+    local_file_path="/app/storage/raw/Test_Insurer/test.pdf",
+    file_size=1024,
+    file_hash="abc123hash",
+    country="NZ",
+    policy_type="Motor",
+    document_type="PDS",
+    classification="policy_document",
+    confidence=0.95,
+    status="pending",
+    metadata_json={"pages": 10, "version": "1.0"},
+    warnings=[],
+    created_at=_FIXED_NOW,
+    updated_at=_FIXED_NOW,
+)
+
+
 @pytest.fixture
-def sample_document(db_session: Session, test_user: User) -> Document:
+def sample_document(db_session: Session, test_user: UserSnapshot) -> Document:
     """Create a sample document for testing."""
-    doc = Document(
-        source_url="https://example.com/test.pdf",
-        insurer="Test Insurer",
-        local_file_path="/app/storage/raw/Test_Insurer/test.pdf",
-        file_size=1024,
-        file_hash="abc123hash",
-        country="NZ",
-        policy_type="Motor",
-        document_type="PDS",
-        classification="policy_document",
-        confidence=0.95,
-        status="pending",
-        metadata_json={"pages": 10, "version": "1.0"},
-        warnings=[],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
-    )
-    db_session.add(doc)
+    # Core INSERT ... RETURNING skips the unit-of-work; tests still get the
+    # mapped instance (loaded once) since they pass it to endpoints and ORM code.
+    doc_id = db_session.execute(
+        insert(Document).values(**_SAMPLE_DOCUMENT_VALUES).returning(Document.id)
+    ).scalar_one()
     db_session.commit()
-    db_session.refresh(doc)
-    return doc
+    return db_session.get(Document, doc_id)
+
+
+@pytest.fixture(scope="module")
+def module_sample_document_id(db_engine) -> Generator[int, None, None]:
+    """
+    Commit one sample document for a whole test module and yield its id.
+    
+    Modules whose tests only act on a single document can override
+    ``sample_document`` to load this row instead of inserting one per test;
+    each test's changes to it (including deleting it) are rolled back with
+    db_session's outer transaction. The row is removed after the module.
+    """
+    with db_engine.begin() as conn:
+        doc_id = conn.execute(
+            insert(Document).values(**_SAMPLE_DOCUMENT_VALUES).returning(Document.id)
+        ).scalar_one()
+    yield doc_id
+    with db_engine.begin() as conn:
+        conn.execute(delete(Document).where(Document.id == doc_id))
 
 
 @pytest.fixture
-def multiple_sample_documents(db_session: Session, test_user: User) -> list[Document]:
-    """Create multiple sample documents for testing."""
-    docs = []
-    for i in range(5):
-        doc = Document(
+def multiple_sample_documents(db_session: Session, test_user: UserSnapshot) -> list[Document]:
+    """Create multiple sample documents for testing (ordered as created)."""
+    rows = [
+        dict(
             source_url=f"https://example.com/test{i}.pdf",
             insurer=f"Test Insurer {i}",
             local_file_path=f"/app/storage/raw/Test_Insurer_{i}/test{i}.pdf",
@@ -214,19 +364,22 @@ def multiple_sample_documents(db_session: Session, test_user: User) -> list[Docu
             status=["pending", "validated", "rejected"][i % 3],
             metadata_json={"pages": 10 + i},
             warnings=[],
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=_FIXED_NOW,
+            updated_at=_FIXED_NOW,
         )
-        db_session.add(doc)
-        docs.append(doc)
+        for i in range(5)
+    ]
+    # ORM bulk INSERT ... RETURNING: one batched statement hands back the
+    # mapped objects in parameter order, with no follow-up SELECT
+    docs = db_session.scalars(
+        insert(Document).returning(Document, sort_by_parameter_order=True), rows
+    ).all()
     db_session.commit()
-    for doc in docs:
-        db_session.refresh(doc)
     return docs
 
 
 @pytest.fixture
-def sample_crawl_session(db_session: Session, test_user: User) -> CrawlSession:
+def sample_crawl_session(db_session: Session, test_user: UserSnapshot) -> CrawlSession:
     """Create a sample crawl session."""
     session = CrawlSession(
         country="NZ",
@@ -242,38 +395,98 @@ def sample_crawl_session(db_session: Session, test_user: User) -> CrawlSession:
         pdfs_downloaded=8,
         pdfs_filtered=2,
         errors_count=0,
-        started_at=datetime.now(timezone.utc),
-        completed_at=datetime.now(timezone.utc),
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        started_at=_FIXED_NOW,
+        completed_at=_FIXED_NOW,
+        created_at=_FIXED_NOW,
+        updated_at=_FIXED_NOW,
         user_id=test_user.id,
     )
     db_session.add(session)
     db_session.commit()
-    db_session.refresh(session)
     return session
 
 
+# ============================================================================
+# SERVICE MOCK FIXTURES
+# ============================================================================
+
+# Specced once at import: the method set and signatures are introspected a
+# single time, then the same mock is reset and reused by every test.
+_CRAWL_SERVICE_SPEC = create_autospec(crawl_router.crawl_service)
+# Specced functions expose a mocked __code__ whose flags look like a coroutine,
+# so Starlette's BackgroundTasks would await the result. The background task
+# gets a plain (unspecced) mock, which it runs as the sync call it is.
+_CRAWL_SERVICE_SPEC.run_crawl_session = MagicMock(name="run_crawl_session")
+
+
+@pytest.fixture
+def crawl_service_mock(monkeypatch) -> Any:
+    """Autospecced crawl_service swapped into the crawl router for one test."""
+    _CRAWL_SERVICE_SPEC.reset_mock(return_value=True, side_effect=True)
+    # Constants aren't callables, so mirror the real value instead of a mock
+    _CRAWL_SERVICE_SPEC.MAX_CONCURRENT_CRAWLS = crawl_router.crawl_service.MAX_CONCURRENT_CRAWLS
+    monkeypatch.setattr(crawl_router, "crawl_service", _CRAWL_SERVICE_SPEC)
+    return _CRAWL_SERVICE_SPEC
+
+
+@pytest.fixture
+def mock_classify(monkeypatch) -> MagicMock:
+    """
+    classify_document patched in the documents router with a pending Motor
+    result. Override per test with ``mock_classify.return_value |= {...}``.
+    """
+    mock = MagicMock(name="classify_document", return_value={
+        "detected_policy_type": "Motor",
+        "classification": "policy_document",
+        "confidence": 0.95,
+        "status": "pending",
+        "metadata": {},
+        "warnings": [],
+    })
+    monkeypatch.setattr(documents_router, "classify_document", mock)
+    return mock
+
+
 # ============================================================================
 # FILE UPLOAD FIXTURES
 # ============================================================================
 
+# Constant upload payloads; each fixture call wraps them in a fresh BytesIO
+_MINIMAL_PDF = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n196\n%%EOF"
+_SAMPLE_PDFS = tuple(
+    f"%PDF-1.4\n%Test PDF {i}\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
+    for i in range(3)
+)
+
+
+@pytest.fixture(scope="session")
+def minimal_pdf_bytes() -> bytes:
+    """Minimal valid PDF payload; wrap it in a fresh BytesIO per request."""
+    return _MINIMAL_PDF
+
+
 @pytest.fixture
 def sample_pdf_file() -> tuple[str, BytesIO, str]:
     """Create a sample PDF file for upload testing."""
     # Minimal valid PDF content
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\n2 0 obj\n<<\n/Type /Pages\n/Kids [3 0 R]\n/Count 1\n>>\nendobj\n3 0 obj\n<<\n/Type /Page\n/Parent 2 0 R\n/MediaBox [0 0 612 792]\n>>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<<\n/Size 4\n/Root 1 0 R\n>>\nstartxref\n196\n%%EOF"
-    return ("test_document.pdf", BytesIO(pdf_content), "application/pdf")
+    return ("test_document.pdf", BytesIO(_MINIMAL_PDF), "application/pdf")
 
 
 @pytest.fixture
 def multiple_sample_pdf_files() -> list[tuple[str, BytesIO, str]]:
     """Create multiple sample PDF files for batch upload testing."""
-    files = []
-    for i in range(3):
-        pdf_content = f"%PDF-1.4\n%Test PDF {i}\n1 0 obj\n<<\n/Type /Catalog\n/Pages 2 0 R\n>>\nendobj\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
-        files.append((f"test_document_{i}.pdf", BytesIO(pdf_content), "application/pdf"))
-    return files
+    return [
+        (f"test_document_{i}.pdf", BytesIO(pdf_content), "application/pdf")
+        for i, pdf_content in enumerate(_SAMPLE_PDFS)
+    ]
+
+
+@pytest.fixture(scope="session")
+def shared_pdf(tmp_path_factory) -> str:
+    """Path to one PDF on disk, written once per session; treat as read-only."""
+    path = tmp_path_factory.mktemp("pdfs") / "shared.pdf"
+    path.write_bytes(b"%PDF-1.4 shared content")
+    return str(path)
 
 
 @pytest.fixture
@@ -313,8 +526,9 @@ def pytest_configure(config):
 def pytest_collection_modifyitems(config, items):
     """Modify test collection to add markers based on test name/pattern."""
     for item in items:
-        # Auto-mark tests based on name patterns
-        if "integration" in item.nodeid.lower():
+        # Auto-mark tests based on name patterns (lowercase the node id once)
+        nodeid = item.nodeid.lower()
+        if "integration" in nodeid:
             item.add_marker(pytest.mark.integration)
-        elif "unit" in item.nodeid.lower():
+        elif "unit" in nodeid:
             item.add_marker(pytest.mark.unit)
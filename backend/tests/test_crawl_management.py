@@ -7,179 +7,185 @@ Includes:
 - Get crawl results
 - List crawl sessions
 - Delete crawl
+- Crawl deduplication
 - Get crawl logs
 - Seed URL discovery
 - Custom insurer management
 """
 import pytest
-from datetime import datetime, timezone
-from unittest.mock import patch, MagicMock
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.models import CrawlSession, Document
+from app.services import crawl_service
+
+# Shared start-crawl payload; tests spread it and override only what they vary
+_BASE_START_BODY = {
+    "country": "NZ",
+    "max_pages": 100,
+    "max_minutes": 30,
+    "seed_urls": ["https://example.com"],
+    "policy_types": [],
+    "keyword_filters": [],
+}
+
+# The start-crawl route only reads .id and .status from the created session
+_FAKE_SESSION = SimpleNamespace(id=1, status="running")
+_FAKE_ROOT_SESSION = SimpleNamespace(id=2, status="running")
+
+_WARMUP_PATHS = (
+    "/api/crawl/start",
+    "/api/crawl/latest",
+    "/api/crawl/sessions",
+    "/api/crawl/active/count",
+    "/api/crawl/seed-urls/countries",
+    "/api/crawl/custom-insurers",
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _warm_crawl_routes(_test_client):
+    # One throwaway OPTIONS per route so first-request costs in the middleware
+    # stack and router land here rather than in whichever test runs first
+    for path in _WARMUP_PATHS:
+        _test_client.options(path)
+
+
+@pytest.fixture(scope="class")
+def _seed_service_patch():
+    # Started once per test class that asks for it, stopped after its last test
+    with patch('app.routers.crawl_router.seed_url_service') as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_seed_service(_seed_service_patch):
+    """Class-wide seed_url_service mock, reset for each test."""
+    _seed_service_patch.reset_mock(return_value=True, side_effect=True)
+    return _seed_service_patch
 
 
 class TestStartCrawl:
     """Tests for starting crawl sessions."""
     
-    def test_start_crawl_success(
+    async def test_start_crawl_success(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         test_user,
-        db_session
+        db_session,
+        crawl_service_mock
     ):
         """Test starting a new crawl session."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            # Mock the service methods
-            mock_service.can_start_crawl.return_value = (True, "")
-            mock_session = MagicMock()
-            mock_session.id = 1
-            mock_session.status = "running"
-            mock_service.create_crawl_session.return_value = mock_session
-            mock_service.get_active_crawl_count.return_value = 1
-            
-            response = client.post(
-                "/api/crawl/start",
-                headers=auth_headers_with_csrf,
-                json={
-                    "country": "NZ",
-                    "max_pages": 100,
-                    "max_minutes": 30,
-                    "seed_urls": ["https://example.com/insurance"],
-                    "policy_types": ["Motor"],
-                    "keyword_filters": []
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["crawl_id"] == 1
-            assert data["status"] == "running"
-            assert "message" in data
+        # Mock the service methods
+        crawl_service_mock.can_start_crawl.return_value = (True, "")
+        crawl_service_mock.create_crawl_session.return_value = _FAKE_SESSION
+        crawl_service_mock.get_active_crawl_count.return_value = 1
+        
+        response = await async_client.post(
+            "/api/crawl/start",
+            headers=auth_headers_with_csrf,
+            json={
+                **_BASE_START_BODY,
+                "seed_urls": ["https://example.com/insurance"],
+                "policy_types": ["Motor"],
+            }
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["crawl_id"] == 1
+        assert data["status"] == "running"
+        assert "message" in data
     
-    def test_start_crawl_root_endpoint(
+    async def test_start_crawl_root_endpoint(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        crawl_service_mock
     ):
         """Test starting crawl via root /api/crawl endpoint."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            mock_service.can_start_crawl.return_value = (True, "")
-            mock_session = MagicMock()
-            mock_session.id = 2
-            mock_session.status = "running"
-            mock_service.create_crawl_session.return_value = mock_session
-            mock_service.get_active_crawl_count.return_value = 1
-            
-            response = client.post(
-                "/api/crawl",
-                headers=auth_headers_with_csrf,
-                json={
-                    "country": "AU",
-                    "max_pages": 50,
-                    "max_minutes": 20,
-                    "seed_urls": ["https://example.com/au"],
-                    "policy_types": [],
-                    "keyword_filters": []
-                }
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["crawl_id"] == 2
+        crawl_service_mock.can_start_crawl.return_value = (True, "")
+        crawl_service_mock.create_crawl_session.return_value = _FAKE_ROOT_SESSION
+        crawl_service_mock.get_active_crawl_count.return_value = 1
+        
+        response = await async_client.post(
+            "/api/crawl",
+            headers=auth_headers_with_csrf,
+            json={
+                **_BASE_START_BODY,
+                "country": "AU",
+                "max_pages": 50,
+                "max_minutes": 20,
+                "seed_urls": ["https://example.com/au"],
+            }
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["crawl_id"] == 2
     
-    def test_start_crawl_at_capacity(
+    async def test_start_crawl_at_capacity(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        crawl_service_mock
     ):
         """Test starting crawl when at max concurrent capacity."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            mock_service.can_start_crawl.return_value = (
-                False, 
-                "Maximum concurrent crawls reached"
-            )
-            mock_service.get_active_crawl_count.return_value = 3
-            mock_service.MAX_CONCURRENT_CRAWLS = 3
-            
-            response = client.post(
-                "/api/crawl/start",
-                headers=auth_headers_with_csrf,
-                json={
-                    "country": "NZ",
-                    "max_pages": 100,
-                    "max_minutes": 30,
-                    "seed_urls": ["https://example.com"],
-                    "policy_types": [],
-                    "keyword_filters": []
-                }
-            )
-            
-            assert response.status_code == 429  # Too Many Requests
-            assert "concurrent" in response.json()["detail"]["error"].lower()
+        crawl_service_mock.can_start_crawl.return_value = (
+            False, 
+            "Maximum concurrent crawls reached"
+        )
+        crawl_service_mock.get_active_crawl_count.return_value = 3
+        crawl_service_mock.MAX_CONCURRENT_CRAWLS = 3
+        
+        response = await async_client.post(
+            "/api/crawl/start",
+            headers=auth_headers_with_csrf,
+            json=_BASE_START_BODY
+        )
+        
+        assert response.status_code == 429  # Too Many Requests
+        assert "concurrent" in response.json()["detail"]["error"].lower()
     
-    def test_start_crawl_invalid_url(
+    async def test_start_crawl_invalid_url(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf
     ):
         """Test starting crawl with invalid seed URL."""
-        response = client.post(
+        response = await async_client.post(
             "/api/crawl/start",
             headers=auth_headers_with_csrf,
-            json={
-                "country": "NZ",
-                "max_pages": 100,
-                "max_minutes": 30,
-                "seed_urls": ["not-a-valid-url"],  # Invalid URL
-                "policy_types": [],
-                "keyword_filters": []
-            }
+            json={**_BASE_START_BODY, "seed_urls": ["not-a-valid-url"]}  # Invalid URL
         )
         
         assert response.status_code == 422  # Validation error
     
-    def test_start_crawl_without_auth(self, client):
+    async def test_start_crawl_without_auth(self, async_client):
         """Test starting crawl without authentication."""
-        response = client.post(
+        response = await async_client.post(
             "/api/crawl/start",
-            json={
-                "country": "NZ",
-                "max_pages": 100,
-                "max_minutes": 30,
-                "seed_urls": ["https://example.com"],
-            }
+            json=_BASE_START_BODY
         )
         
         assert response.status_code == 403
     
-    def test_start_crawl_max_pages_validation(
+    @pytest.mark.parametrize("max_pages", [
+        1000000,  # Exceeds limit
+        0,  # Below minimum
+    ])
+    async def test_start_crawl_max_pages_validation(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        max_pages
     ):
         """Test max_pages validation limits."""
-        # Test max_pages too high
-        response = client.post(
+        response = await async_client.post(
             "/api/crawl/start",
             headers=auth_headers_with_csrf,
-            json={
-                "country": "NZ",
-                "max_pages": 1000000,  # Exceeds limit
-                "max_minutes": 30,
-                "seed_urls": ["https://example.com"],
-            }
-        )
-        
-        assert response.status_code == 422
-        
-        # Test max_pages too low
-        response = client.post(
-            "/api/crawl/start",
-            headers=auth_headers_with_csrf,
-            json={
-                "country": "NZ",
-                "max_pages": 0,  # Below minimum
-                "max_minutes": 30,
-                "seed_urls": ["https://example.com"],
-            }
+            json={**_BASE_START_BODY, "max_pages": max_pages}
         )
         
         assert response.status_code == 422
@@ -188,14 +194,14 @@ class TestStartCrawl:
 class TestGetCrawlStatus:
     """Tests for getting crawl status."""
     
-    def test_get_crawl_status_success(
+    async def test_get_crawl_status_success(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session
     ):
         """Test getting status of an existing crawl."""
-        response = client.get(
+        response = await async_client.get(
             f"/api/crawl/{sample_crawl_session.id}/status",
             headers=auth_headers_with_csrf
         )
@@ -207,65 +213,65 @@ class TestGetCrawlStatus:
         assert "progress_pct" in data
         assert "pages_scanned" in data
     
-    def test_get_crawl_status_nonexistent(
+    async def test_get_crawl_status_nonexistent(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf
     ):
         """Test getting status of non-existent crawl."""
-        response = client.get(
+        response = await async_client.get(
             "/api/crawl/99999/status",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 404
     
-    def test_get_crawl_status_derived_phases(
+    @pytest.mark.parametrize("progress,status,expected_phase", [
+        (10, "running", "Scanning"),  # progress < 50
+        (75, "running", "Downloading"),  # 50 <= progress < 100
+        (100, "completed", "Complete"),
+    ])
+    async def test_get_crawl_status_derived_phases(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
-        db_session
+        db_session,
+        progress,
+        status,
+        expected_phase
     ):
         """Test that current_phase is correctly derived from progress."""
-        test_cases = [
-            (10, "running", "Scanning"),  # progress < 50
-            (75, "running", "Downloading"),  # 50 <= progress < 100
-            (100, "completed", "Complete"),
-        ]
+        sample_crawl_session.progress_pct = progress
+        sample_crawl_session.status = status
+        sample_crawl_session.pdfs_found = 10
+        sample_crawl_session.pdfs_downloaded = 8
+        sample_crawl_session.pages_scanned = 50
+        db_session.flush()
         
-        for progress, status, expected_phase in test_cases:
-            sample_crawl_session.progress_pct = progress
-            sample_crawl_session.status = status
-            sample_crawl_session.pdfs_found = 10
-            sample_crawl_session.pdfs_downloaded = 8
-            sample_crawl_session.pages_scanned = 50
-            db_session.commit()
-            
-            response = client.get(
-                f"/api/crawl/{sample_crawl_session.id}/status",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            assert response.json()["current_phase"] == expected_phase
+        response = await async_client.get(
+            f"/api/crawl/{sample_crawl_session.id}/status",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["current_phase"] == expected_phase
 
 
 class TestGetCrawlResults:
     """Tests for getting crawl results."""
     
-    def test_get_crawl_results_success(
+    async def test_get_crawl_results_success(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
         db_session
     ):
         """Test getting documents from a crawl session."""
         # Add some documents to the crawl session
-        from app.models import Document
-        for i in range(3):
-            doc = Document(
+        db_session.add_all([
+            Document(
                 source_url=f"https://example.com/doc{i}.pdf",
                 insurer=f"Insurer {i}",
                 local_file_path=f"/path/doc{i}.pdf",
@@ -277,10 +283,11 @@ class TestGetCrawlResults:
                 status="pending",
                 crawl_session_id=sample_crawl_session.id
             )
-            db_session.add(doc)
-        db_session.commit()
+            for i in range(3)
+        ])
+        db_session.flush()
         
-        response = client.get(
+        response = await async_client.get(
             f"/api/crawl/{sample_crawl_session.id}/results",
             headers=auth_headers_with_csrf
         )
@@ -291,14 +298,14 @@ class TestGetCrawlResults:
         assert data["total"] == 3
         assert len(data["documents"]) == 3
     
-    def test_get_crawl_results_empty(
+    async def test_get_crawl_results_empty(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session
     ):
         """Test getting results for crawl with no documents."""
-        response = client.get(
+        response = await async_client.get(
             f"/api/crawl/{sample_crawl_session.id}/results",
             headers=auth_headers_with_csrf
         )
@@ -312,16 +319,16 @@ class TestGetCrawlResults:
 class TestListCrawlSessions:
     """Tests for listing crawl sessions."""
     
-    def test_list_crawl_sessions(
+    async def test_list_crawl_sessions(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
         test_user,
         db_session
     ):
         """Test listing user's crawl sessions."""
-        response = client.get(
+        response = await async_client.get(
             "/api/crawl/sessions",
             headers=auth_headers_with_csrf
         )
@@ -333,18 +340,18 @@ class TestListCrawlSessions:
         # First item should be the most recent
         assert data[0]["id"] == sample_crawl_session.id
     
-    def test_list_crawl_sessions_pagination(
+    async def test_list_crawl_sessions_pagination(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         test_user,
         db_session
     ):
         """Test crawl sessions pagination."""
-        # Create multiple crawl sessions
-        from app.models import CrawlSession
-        for i in range(5):
-            session = CrawlSession(
+        # Create multiple crawl sessions, distinct times off one timestamp
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            CrawlSession(
                 country="NZ",
                 max_pages=100,
                 max_minutes=30,
@@ -353,37 +360,37 @@ class TestListCrawlSessions:
                 keyword_filters=[],
                 status="completed",
                 user_id=test_user.id,
-                created_at=datetime.now(timezone.utc)
+                created_at=now - timedelta(seconds=i)
             )
-            db_session.add(session)
-        db_session.commit()
+            for i in range(5)
+        ])
+        db_session.flush()
         
-        response = client.get(
+        # With 5 sessions the first page is capped by limit and the second
+        # can only hold exactly 2 if the offset was applied
+        first = await async_client.get(
             "/api/crawl/sessions?limit=3&offset=0",
             headers=auth_headers_with_csrf
         )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data) == 3
-        
-        # Get next page
-        response = client.get(
+        second = await async_client.get(
             "/api/crawl/sessions?limit=3&offset=3",
             headers=auth_headers_with_csrf
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data) >= 2  # At least 2 more
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert len(first.json()) == 3
+        assert len(second.json()) == 2
+        first_ids = {s["id"] for s in first.json()}
+        assert first_ids.isdisjoint(s["id"] for s in second.json())
 
 
 class TestDeleteCrawl:
     """Tests for deleting crawl sessions."""
     
-    def test_delete_crawl_success(
+    async def test_delete_crawl_success(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
         db_session
@@ -391,7 +398,7 @@ class TestDeleteCrawl:
         """Test deleting a completed crawl session."""
         crawl_id = sample_crawl_session.id
         
-        response = client.delete(
+        response = await async_client.delete(
             f"/api/crawl/{crawl_id}",
             headers=auth_headers_with_csrf
         )
@@ -401,9 +408,9 @@ class TestDeleteCrawl:
         assert data["status"] == "success"
         assert data["crawl_id"] == crawl_id
     
-    def test_delete_running_crawl_fails(
+    async def test_delete_running_crawl_fails(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
         db_session
@@ -412,7 +419,7 @@ class TestDeleteCrawl:
         sample_crawl_session.status = "running"
         db_session.commit()
         
-        response = client.delete(
+        response = await async_client.delete(
             f"/api/crawl/{sample_crawl_session.id}",
             headers=auth_headers_with_csrf
         )
@@ -420,32 +427,30 @@ class TestDeleteCrawl:
         assert response.status_code == 409  # Conflict
         assert "running" in response.json()["detail"].lower()
     
-    def test_delete_nonexistent_crawl(
+    async def test_delete_nonexistent_crawl(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf
     ):
         """Test deleting a non-existent crawl."""
-        response = client.delete(
+        response = await async_client.delete(
             "/api/crawl/99999",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 404
     
-    def test_delete_crawl_cascades_to_documents(
+    async def test_delete_crawl_cascades_to_documents(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session,
         db_session
     ):
         """Test that deleting crawl removes associated documents."""
-        from app.models import Document
-        
         # Add documents to crawl
-        for i in range(3):
-            doc = Document(
+        db_session.add_all([
+            Document(
                 source_url=f"https://example.com/doc{i}.pdf",
                 insurer="Test",
                 local_file_path=f"/path/doc{i}.pdf",
@@ -457,12 +462,13 @@ class TestDeleteCrawl:
                 status="pending",
                 crawl_session_id=sample_crawl_session.id
             )
-            db_session.add(doc)
-        db_session.commit()
+            for i in range(3)
+        ])
+        db_session.flush()
         
         crawl_id = sample_crawl_session.id
         
-        response = client.delete(
+        response = await async_client.delete(
             f"/api/crawl/{crawl_id}",
             headers=auth_headers_with_csrf
         )
@@ -476,64 +482,92 @@ class TestDeleteCrawl:
         assert remaining == 0
 
 
+class TestCrawlDeduplication:
+    """Tests for the crawler's content-hash duplicate check."""
+    
+    def test_manual_upload_does_not_suppress_crawled_copy(
+        self, 
+        db_session, 
+        sample_document
+    ):
+        """Test a manual upload with the same bytes is not treated as a crawl duplicate."""
+        db_session.add(Document(
+            source_url=crawl_service.MANUAL_UPLOAD_SOURCE_URL,
+            insurer="Manual Upload",
+            local_file_path="/app/storage/raw/Manual_Upload/upload.pdf",
+            file_hash="manualhash",
+            country="NZ",
+            policy_type="Motor",
+            document_type="PDS",
+            classification="policy_document",
+            status="pending",
+        ))
+        db_session.flush()
+        
+        assert crawl_service._find_hash_duplicate(db_session, "manualhash") is None
+        assert crawl_service._find_hash_duplicate(
+            db_session, sample_document.file_hash
+        ).id == sample_document.id
+
+
 class TestGetCrawlLogs:
     """Tests for crawl log endpoint."""
     
-    def test_get_crawl_logs(
+    async def test_get_crawl_logs(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
-        sample_crawl_session
+        sample_crawl_session,
+        crawl_service_mock
     ):
         """Test getting crawl logs."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            mock_service.get_crawl_logs.return_value = [
-                {"level": "INFO", "message": "Started crawl"},
-                {"level": "INFO", "message": "Found 10 PDFs"},
-            ]
-            
-            response = client.get(
-                f"/api/crawl/{sample_crawl_session.id}/logs",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["crawl_id"] == sample_crawl_session.id
-            assert "entries" in data
+        crawl_service_mock.get_crawl_logs.return_value = [
+            {"level": "INFO", "message": "Started crawl"},
+            {"level": "INFO", "message": "Found 10 PDFs"},
+        ]
+        
+        response = await async_client.get(
+            f"/api/crawl/{sample_crawl_session.id}/logs",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["crawl_id"] == sample_crawl_session.id
+        assert "entries" in data
     
-    def test_get_crawl_logs_with_since_param(
+    async def test_get_crawl_logs_with_since_param(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
-        sample_crawl_session
+        sample_crawl_session,
+        crawl_service_mock
     ):
         """Test getting crawl logs with since parameter."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            mock_service.get_crawl_logs.return_value = [
-                {"level": "INFO", "message": "New log entry"},
-            ]
-            
-            response = client.get(
-                f"/api/crawl/{sample_crawl_session.id}/logs?since=5",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            mock_service.get_crawl_logs.assert_called_with(sample_crawl_session.id, since=5)
+        crawl_service_mock.get_crawl_logs.return_value = [
+            {"level": "INFO", "message": "New log entry"},
+        ]
+        
+        response = await async_client.get(
+            f"/api/crawl/{sample_crawl_session.id}/logs?since=5",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        crawl_service_mock.get_crawl_logs.assert_called_with(sample_crawl_session.id, since=5)
 
 
 class TestGetLatestCrawl:
     """Tests for latest crawl endpoint."""
     
-    def test_get_latest_crawl(
+    async def test_get_latest_crawl(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf, 
         sample_crawl_session
     ):
         """Test getting the latest crawl session."""
-        response = client.get(
+        response = await async_client.get(
             "/api/crawl/latest",
             headers=auth_headers_with_csrf
         )
@@ -543,19 +577,18 @@ class TestGetLatestCrawl:
         assert data["crawl"] is not None
         assert data["crawl"]["id"] == sample_crawl_session.id
     
-    def test_get_latest_crawl_no_crawls(
+    async def test_get_latest_crawl_no_crawls(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf,
         db_session
     ):
         """Test getting latest when user has no crawls."""
         # Delete all crawls
-        from app.models import CrawlSession
         db_session.query(CrawlSession).delete()
         db_session.commit()
         
-        response = client.get(
+        response = await async_client.get(
             "/api/crawl/latest",
             headers=auth_headers_with_csrf
         )
@@ -567,140 +600,140 @@ class TestGetLatestCrawl:
 class TestActiveCrawlCount:
     """Tests for active crawl count endpoint."""
     
-    def test_get_active_crawl_count(
+    async def test_get_active_crawl_count(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        crawl_service_mock
     ):
         """Test getting active crawl count."""
-        with patch('app.routers.crawl_router.crawl_service') as mock_service:
-            mock_service.get_active_crawl_count.return_value = 2
-            mock_service.MAX_CONCURRENT_CRAWLS = 3
-            
-            response = client.get(
-                "/api/crawl/active/count",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["active_crawls"] == 2
-            assert data["max_concurrent_crawls"] == 3
-            assert data["available_slots"] == 1
-            assert data["at_capacity"] == False
+        crawl_service_mock.get_active_crawl_count.return_value = 2
+        crawl_service_mock.MAX_CONCURRENT_CRAWLS = 3
+        
+        response = await async_client.get(
+            "/api/crawl/active/count",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["active_crawls"] == 2
+        assert data["max_concurrent_crawls"] == 3
+        assert data["available_slots"] == 1
+        assert data["at_capacity"] == False
 
 
 class TestSeedUrls:
     """Tests for seed URL discovery endpoints."""
     
-    def test_get_seed_urls(
+    async def test_get_seed_urls(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test getting seed URLs for a country."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.get_seed_urls.return_value = [
-                {
-                    "insurer": "Test Insurance",
-                    "seed_urls": ["https://test.com/policies"],
-                    "policy_types": ["Motor", "Home"]
-                }
-            ]
-            
-            response = client.get(
-                "/api/crawl/seed-urls?country=NZ",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["country"] == "NZ"
-            assert "insurers" in data
-            assert len(data["insurers"]) == 1
+        mock_seed_service.get_seed_urls.return_value = [
+            {
+                "insurer": "Test Insurance",
+                "seed_urls": ["https://test.com/policies"],
+                "policy_types": ["Motor", "Home"]
+            }
+        ]
+        
+        response = await async_client.get(
+            "/api/crawl/seed-urls?country=NZ",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["country"] == "NZ"
+        assert "insurers" in data
+        assert len(data["insurers"]) == 1
     
-    def test_get_seed_urls_with_filters(
+    async def test_get_seed_urls_with_filters(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test getting seed URLs with policy type and insurer filters."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.get_seed_urls.return_value = []
-            
-            response = client.get(
-                "/api/crawl/seed-urls?country=AU&policy_type=Motor&insurer=Test",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            mock_service.get_seed_urls.assert_called_with(
-                country="AU",
-                policy_type="Motor",
-                insurer="Test",
-                validate=False
-            )
+        mock_seed_service.get_seed_urls.return_value = []
+        
+        response = await async_client.get(
+            "/api/crawl/seed-urls?country=AU&policy_type=Motor&insurer=Test",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        mock_seed_service.get_seed_urls.assert_called_with(
+            country="AU",
+            policy_type="Motor",
+            insurer="Test",
+            validate=False
+        )
     
-    def test_get_supported_countries(
+    async def test_get_supported_countries(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test getting list of supported countries."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.get_supported_countries.return_value = [
-                {"code": "NZ", "name": "New Zealand"},
-                {"code": "AU", "name": "Australia"},
-            ]
-            
-            response = client.get(
-                "/api/crawl/seed-urls/countries",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            assert "countries" in response.json()
+        mock_seed_service.get_supported_countries.return_value = [
+            {"code": "NZ", "name": "New Zealand"},
+            {"code": "AU", "name": "Australia"},
+        ]
+        
+        response = await async_client.get(
+            "/api/crawl/seed-urls/countries",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        assert "countries" in response.json()
 
 
 class TestCustomInsurers:
     """Tests for custom insurer management."""
     
-    def test_add_custom_insurer(
+    async def test_add_custom_insurer(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test adding a custom insurer."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.add_custom_insurer.return_value = {
+        mock_seed_service.add_custom_insurer.return_value = {
+            "country": "NZ",
+            "insurer": "Custom Insurance Co",
+            "seed_urls": ["https://custom.com"]
+        }
+        
+        response = await async_client.post(
+            "/api/crawl/custom-insurers",
+            headers=auth_headers_with_csrf,
+            json={
                 "country": "NZ",
-                "insurer": "Custom Insurance Co",
-                "seed_urls": ["https://custom.com"]
+                "insurer_name": "Custom Insurance Co",
+                "seed_urls": ["https://custom.com/policies"],
+                "policy_types": ["Motor"]
             }
-            
-            response = client.post(
-                "/api/crawl/custom-insurers",
-                headers=auth_headers_with_csrf,
-                json={
-                    "country": "NZ",
-                    "insurer_name": "Custom Insurance Co",
-                    "seed_urls": ["https://custom.com/policies"],
-                    "policy_types": ["Motor"]
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "ok"
-            assert "Custom Insurance Co" in data["message"]
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ok"
+        assert "Custom Insurance Co" in data["message"]
     
-    def test_add_custom_insurer_invalid_url(
+    async def test_add_custom_insurer_invalid_url(
         self, 
-        client, 
+        async_client, 
         auth_headers_with_csrf
     ):
         """Test adding custom insurer with invalid URL."""
-        response = client.post(
+        response = await async_client.post(
             "/api/crawl/custom-insurers",
             headers=auth_headers_with_csrf,
             json={
@@ -712,54 +745,54 @@ class TestCustomInsurers:
         
         assert response.status_code == 422
     
-    def test_remove_custom_insurer(
+    async def test_remove_custom_insurer(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test removing a custom insurer."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.remove_custom_insurer.return_value = True
-            
-            response = client.delete(
-                "/api/crawl/custom-insurers/NZ/Custom%20Insurance",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            assert "removed" in response.json()["message"].lower()
+        mock_seed_service.remove_custom_insurer.return_value = True
+        
+        response = await async_client.delete(
+            "/api/crawl/custom-insurers/NZ/Custom%20Insurance",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        assert "removed" in response.json()["message"].lower()
     
-    def test_remove_nonexistent_insurer(
+    async def test_remove_nonexistent_insurer(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test removing a non-existent custom insurer."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.remove_custom_insurer.return_value = False
-            
-            response = client.delete(
-                "/api/crawl/custom-insurers/NZ/NonExistent",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 404
+        mock_seed_service.remove_custom_insurer.return_value = False
+        
+        response = await async_client.delete(
+            "/api/crawl/custom-insurers/NZ/NonExistent",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 404
     
-    def test_list_custom_insurers(
+    async def test_list_custom_insurers(
         self, 
-        client, 
-        auth_headers_with_csrf
+        async_client, 
+        auth_headers_with_csrf,
+        mock_seed_service
     ):
         """Test listing custom insurers."""
-        with patch('app.routers.crawl_router.seed_url_service') as mock_service:
-            mock_service.list_custom_insurers.return_value = [
-                {"country": "NZ", "insurer": "Custom Co", "seed_urls": []}
-            ]
-            
-            response = client.get(
-                "/api/crawl/custom-insurers",
-                headers=auth_headers_with_csrf
-            )
-            
-            assert response.status_code == 200
-            assert isinstance(response.json(), list)
+        mock_seed_service.list_custom_insurers.return_value = [
+            {"country": "NZ", "insurer": "Custom Co", "seed_urls": []}
+        ]
+        
+        response = await async_client.get(
+            "/api/crawl/custom-insurers",
+            headers=auth_headers_with_csrf
+        )
+        
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
@@ -11,109 +11,148 @@ Includes:
 - Document preview
 """
 import pytest
-from datetime import datetime, timezone
-from unittest.mock import patch, MagicMock
-from io import BytesIO
+from pathlib import Path
 
+from sqlalchemy import select
 
-class TestDocumentApprove:
-    """Tests for document approval endpoint."""
+from app.cache import make_cache_key
+from app.models import Document
+from app.routers import documents_router
+from app.services import document_service
+
+
+@pytest.fixture
+def sample_document(db_session, module_sample_document_id):
+    """Module-wide sample document, loaded into this test's session."""
+    return db_session.get(Document, module_sample_document_id)
+
+
+@pytest.fixture
+def served_pdf(monkeypatch, shared_pdf) -> Path:
+    """Resolve every document to the shared PDF so file endpoints serve it."""
+    path = Path(shared_pdf)
+    monkeypatch.setattr(document_service, "get_document_file_path", lambda doc: path)
+    return path
+
+
+class TestDocumentGet:
+    """Tests for reading a single document back."""
     
-    def test_approve_pending_document(
+    def test_get_document(
         self, 
         client, 
         auth_headers_with_csrf, 
         sample_document
     ):
-        """Test approving a pending document."""
-        response = client.put(
-            f"/api/documents/{sample_document.id}/approve",
+        """Test the GET response reflects the stored document state."""
+        response = client.get(
+            f"/api/documents/{sample_document.id}",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 200
-        assert response.json()["status"] == "success"
-        
-        # Verify document status updated
-        get_response = client.get(
-            f"/api/documents/{sample_document.id}",
-            headers=auth_headers_with_csrf
-        )
-        assert get_response.json()["status"] == "validated"
+        data = response.json()
+        assert data["id"] == sample_document.id
+        assert data["status"] == sample_document.status
+        assert data["classification"] == sample_document.classification
+        assert data["document_type"] == sample_document.document_type
+        assert data["confidence"] == sample_document.confidence
+
+
+class TestDocumentStatusActions:
+    """Tests shared by the approve/reject/archive endpoints."""
     
-    def test_approve_already_validated_document(
+    @pytest.mark.parametrize("action,expected_status", [
+        ("approve", "validated"),
+        ("reject", "rejected"),
+        ("archive", "rejected"),  # archive = reject
+    ])
+    def test_status_transition(
         self, 
         client, 
         auth_headers_with_csrf, 
         sample_document,
-        db_session
+        db_session,
+        action,
+        expected_status
     ):
-        """Test approving an already validated document."""
-        # First approve
-        sample_document.status = "validated"
-        db_session.commit()
-        
-        # Try to approve again
+        """Test that each action moves a pending document to its status."""
         response = client.put(
-            f"/api/documents/{sample_document.id}/approve",
+            f"/api/documents/{sample_document.id}/{action}",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 200
         assert response.json()["status"] == "success"
+        
+        # Verify document status updated (reloaded from the DB)
+        db_session.expire(sample_document)
+        assert sample_document.status == expected_status
     
-    def test_approve_nonexistent_document(self, client, auth_headers_with_csrf):
-        """Test approving a non-existent document."""
+    @pytest.mark.parametrize("action", ["approve", "reject", "archive"])
+    def test_status_action_nonexistent_document(
+        self, 
+        client, 
+        auth_headers_with_csrf,
+        action
+    ):
+        """Test status actions on a non-existent document."""
         response = client.put(
-            "/api/documents/99999/approve",
+            f"/api/documents/99999/{action}",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
+
+
+class TestDocumentActionAuth:
+    """Authentication/CSRF checks shared by the document action endpoints."""
     
-    def test_approve_without_auth(self, client, sample_document):
-        """Test approval fails without authentication."""
-        response = client.put(
-            f"/api/documents/{sample_document.id}/approve"
-        )
-        
-        assert response.status_code == 403
-    
-    def test_approve_without_csrf(self, client, auth_headers, sample_document):
-        """Test approval fails without CSRF token."""
-        response = client.put(
-            f"/api/documents/{sample_document.id}/approve",
-            headers=auth_headers
-        )
+    @pytest.mark.parametrize("method,suffix,use_auth", [
+        ("put", "approve", False),
+        ("put", "approve", True),  # Authenticated but no CSRF token
+        ("delete", "", False),
+        ("get", "download", False),
+    ])
+    def test_auth_required(self, client, auth_headers, method, suffix, use_auth):
+        """Test actions are refused before the document is looked up."""
+        # No sample_document: the request must fail before any DB lookup
+        headers = auth_headers if use_auth else {}
+        url = f"/api/documents/1/{suffix}".rstrip("/")
+        
+        response = getattr(client, method)(url, headers=headers)
         
         assert response.status_code == 403
 
 
-class TestDocumentReject:
-    """Tests for document rejection endpoint."""
+class TestDocumentApprove:
+    """Tests for document approval endpoint."""
     
-    def test_reject_pending_document(
+    def test_approve_already_validated_document(
         self, 
         client, 
         auth_headers_with_csrf, 
-        sample_document
+        sample_document,
+        db_session
     ):
-        """Test rejecting a pending document."""
+        """Test approving an already validated document."""
+        # First approve
+        sample_document.status = "validated"
+        db_session.commit()
+        
+        # Try to approve again
         response = client.put(
-            f"/api/documents/{sample_document.id}/reject",
+            f"/api/documents/{sample_document.id}/approve",
             headers=auth_headers_with_csrf
         )
         
         assert response.status_code == 200
         assert response.json()["status"] == "success"
-        
-        # Verify document status updated
-        get_response = client.get(
-            f"/api/documents/{sample_document.id}",
-            headers=auth_headers_with_csrf
-        )
-        assert get_response.json()["status"] == "rejected"
+
+
+class TestDocumentReject:
+    """Tests for document rejection endpoint."""
     
     def test_reject_validated_document(
         self, 
@@ -135,47 +174,13 @@ class TestDocumentReject:
         assert response.json()["status"] == "success"
         
         # Verify status changed to rejected
-        get_response = client.get(
-            f"/api/documents/{sample_document.id}",
-            headers=auth_headers_with_csrf
-        )
-        assert get_response.json()["status"] == "rejected"
-    
-    def test_reject_nonexistent_document(self, client, auth_headers_with_csrf):
-        """Test rejecting a non-existent document."""
-        response = client.put(
-            "/api/documents/99999/reject",
-            headers=auth_headers_with_csrf
-        )
-        
-        assert response.status_code == 404
+        db_session.expire(sample_document)
+        assert sample_document.status == "rejected"
 
 
 class TestDocumentArchive:
     """Tests for document archive endpoint."""
     
-    def test_archive_pending_document(
-        self, 
-        client, 
-        auth_headers_with_csrf, 
-        sample_document
-    ):
-        """Test archiving a pending document."""
-        response = client.put(
-            f"/api/documents/{sample_document.id}/archive",
-            headers=auth_headers_with_csrf
-        )
-        
-        assert response.status_code == 200
-        assert response.json()["status"] == "success"
-        
-        # Verify status is rejected (archive = reject)
-        get_response = client.get(
-            f"/api/documents/{sample_document.id}",
-            headers=auth_headers_with_csrf
-        )
-        assert get_response.json()["status"] == "rejected"
-    
     def test_archive_post_method(
         self, 
         client, 
@@ -198,7 +203,8 @@ class TestDocumentReclassify:
         self, 
         client, 
         auth_headers_with_csrf, 
-        sample_document
+        sample_document,
+        db_session
     ):
         """Test reclassifying a document."""
         old_classification = sample_document.classification
@@ -215,15 +221,11 @@ class TestDocumentReclassify:
         assert data["classification"] == "exclusion"
         
         # Verify document updated
-        get_response = client.get(
-            f"/api/documents/{sample_document.id}",
-            headers=auth_headers_with_csrf
-        )
-        doc_data = get_response.json()
-        assert doc_data["classification"] == "exclusion"
-        assert doc_data["document_type"] == "exclusion"
-        assert doc_data["status"] == "validated"  # Auto-approved on reclassify
-        assert doc_data["confidence"] == 1.0
+        db_session.expire(sample_document)
+        assert sample_document.classification == "exclusion"
+        assert sample_document.document_type == "exclusion"
+        assert sample_document.status == "validated"  # Auto-approved on reclassify
+        assert sample_document.confidence == 1.0
     
     def test_reclassify_with_post_method(
         self, 
@@ -290,7 +292,6 @@ class TestDocumentDelete:
         assert str(doc_id) in response.json()["message"]
         
         # Verify document is deleted
-        from app.models import Document
         deleted_doc = db_session.query(Document).filter(Document.id == doc_id).first()
         assert deleted_doc is None
     
@@ -302,7 +303,6 @@ class TestDocumentDelete:
     ):
         """Test that deleting a document attempts file cleanup."""
         # Create document with file path
-        from app.models import Document
         doc = Document(
             source_url="https://example.com/to_delete.pdf",
             insurer="Test",
@@ -316,8 +316,7 @@ class TestDocumentDelete:
             status="pending"
         )
         db_session.add(doc)
-        db_session.commit()
-        db_session.refresh(doc)
+        db_session.flush()  # Assigns doc.id; the route shares this session
         
         response = client.delete(
             f"/api/documents/{doc.id}",
@@ -326,6 +325,52 @@ class TestDocumentDelete:
         
         assert response.status_code == 200
     
+    def test_delete_refreshes_cached_filter_options(
+        self, 
+        client, 
+        auth_headers_with_csrf,
+        db_session,
+        monkeypatch
+    ):
+        """Test a delete clears cached filter options so the next read drops its values."""
+        cache = {}
+        monkeypatch.setattr(documents_router, "get_cached_json", cache.get)
+        monkeypatch.setattr(
+            documents_router, "set_cached_json",
+            lambda key, value, ttl: cache.__setitem__(key, value),
+        )
+        monkeypatch.setattr(
+            documents_router, "invalidate_cache_prefix",
+            lambda prefix: [
+                cache.pop(key) for key in list(cache) if key.startswith(make_cache_key(prefix))
+            ],
+        )
+        doc = Document(
+            source_url="https://example.com/only_one.pdf",
+            insurer="Deleted Insurer",
+            local_file_path="/tmp/only_one.pdf",
+            country="NZ",
+            policy_type="Motor",
+            document_type="PDS",
+            classification="policy_document",
+            status="pending"
+        )
+        db_session.add(doc)
+        db_session.flush()
+        
+        options = client.get("/api/documents/filters/options", headers=auth_headers_with_csrf)
+        assert "Deleted Insurer" in options.json()["insurers"]
+        
+        response = client.delete(f"/api/documents/{doc.id}", headers=auth_headers_with_csrf)
+        assert response.status_code == 200
+        
+        refreshed = client.get(
+            "/api/documents/filters/options",
+            headers={**auth_headers_with_csrf, "If-None-Match": options.headers["etag"]}
+        )
+        assert refreshed.status_code == 200
+        assert "Deleted Insurer" not in refreshed.json()["insurers"]
+    
     def test_delete_nonexistent_document(self, client, auth_headers_with_csrf):
         """Test deleting a non-existent document."""
         response = client.delete(
@@ -335,14 +380,6 @@ class TestDocumentDelete:
         
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
-    
-    def test_delete_without_auth(self, client, sample_document):
-        """Test delete fails without authentication."""
-        response = client.delete(
-            f"/api/documents/{sample_document.id}"
-        )
-        
-        assert response.status_code == 403
 
 
 class TestDocumentDownload:
@@ -353,24 +390,17 @@ class TestDocumentDownload:
         client, 
         auth_headers_with_csrf, 
         sample_document,
-        tmp_path
+        served_pdf
     ):
         """Test downloading a document."""
-        # Create a temporary file for the document
-        import os
-        test_file = tmp_path / "test.pdf"
-        test_file.write_bytes(b"%PDF-1.4 test content")
-        
-        # Update document path to temp file
-        sample_document.local_file_path = str(test_file)
-        
         response = client.get(
             f"/api/documents/{sample_document.id}/download",
             headers=auth_headers_with_csrf
         )
         
-        # Should either succeed or return 404 if file doesn't exist in test env
-        assert response.status_code in [200, 404]
+        assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/pdf"
+        assert response.content == served_pdf.read_bytes()
     
     def test_download_nonexistent_document(self, client, auth_headers_with_csrf):
         """Test downloading a non-existent document."""
@@ -380,14 +410,6 @@ class TestDocumentDownload:
         )
         
         assert response.status_code == 404
-    
-    def test_download_without_auth(self, client, sample_document):
-        """Test download fails without authentication."""
-        response = client.get(
-            f"/api/documents/{sample_document.id}/download"
-        )
-        
-        assert response.status_code == 403
 
 
 class TestDocumentPreview:
@@ -398,50 +420,35 @@ class TestDocumentPreview:
         client, 
         auth_headers_with_csrf, 
         sample_document,
-        tmp_path
+        served_pdf
     ):
         """Test previewing a document (inline PDF)."""
-        import os
-        test_file = tmp_path / "preview.pdf"
-        test_file.write_bytes(b"%PDF-1.4 preview content")
-        
-        sample_document.local_file_path = str(test_file)
-        
         response = client.get(
             f"/api/documents/{sample_document.id}/preview",
             headers=auth_headers_with_csrf
         )
         
-        assert response.status_code in [200, 404]
-        if response.status_code == 200:
-            assert response.headers.get("content-type") == "application/pdf"
-            # Check inline disposition
-            assert "inline" in response.headers.get("content-disposition", "")
+        assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/pdf"
+        # Check inline disposition
+        assert "inline" in response.headers.get("content-disposition", "")
     
     def test_preview_with_token_param(
         self, 
         client, 
         auth_headers_with_csrf, 
         sample_document,
-        tmp_path
+        served_pdf,
+        testuser_access_token
     ):
         """Test preview with token query parameter."""
-        import os
-        test_file = tmp_path / "preview_token.pdf"
-        test_file.write_bytes(b"%PDF-1.4 content")
-        
-        sample_document.local_file_path = str(test_file)
-        
-        # Get token
-        from app.auth import create_access_token
-        token = create_access_token(data={"sub": "testuser"})
-        
         response = client.get(
-            f"/api/documents/{sample_document.id}/preview?token={token}",
+            f"/api/documents/{sample_document.id}/preview?token={testuser_access_token}",
             headers=auth_headers_with_csrf
         )
         
-        assert response.status_code in [200, 404]
+        assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/pdf"
 
 
 class TestBulkActions:
@@ -485,15 +492,11 @@ class TestBulkActions:
             assert response.status_code == 200
             deleted_ids.append(doc.id)
         
-        # Verify they're deleted
-        from app.models import Document
-        remaining = db_session.query(Document).filter(
-            Document.id.in_([d.id for d in multiple_sample_documents[:3]])
-        ).count()
-        assert remaining == 0
-        
-        # Verify others still exist
-        remaining_others = db_session.query(Document).filter(
-            Document.id.in_([d.id for d in multiple_sample_documents[3:]])
-        ).count()
-        assert remaining_others == 2
+        # One query for all ids: deleted ones are gone, the others still exist
+        surviving = set(db_session.scalars(
+            select(Document.id).where(
+                Document.id.in_([d.id for d in multiple_sample_documents])
+            )
+        ))
+        assert surviving.isdisjoint(deleted_ids)
+        assert surviving == {d.id for d in multiple_sample_documents[3:]}
@@ -12,7 +12,6 @@ Includes:
 import pytest
 from datetime import datetime, timezone
 from io import BytesIO
-from unittest.mock import patch, MagicMock
 
 from app.models import Document
 
@@ -25,28 +24,23 @@ class TestSingleFileUpload:
         client, 
         auth_headers_with_csrf, 
         sample_pdf_file,
-        db_session
+        db_session,
+        mock_classify
     ):
         """Test successful upload of a single PDF file."""
         filename, file_content, content_type = sample_pdf_file
         
         # Mock the classification service
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {"pages": 5, "extracted_text_sample": "Sample"},
-                "warnings": []
-            }
-            
-            response = client.post(
-                "/api/documents/upload",
-                headers=auth_headers_with_csrf,
-                files={"file": (filename, file_content, content_type)},
-                data={"policy_type": "Motor", "country": "NZ"}
-            )
+        mock_classify.return_value |= {
+            "metadata": {"pages": 5, "extracted_text_sample": "Sample"},
+        }
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, file_content, content_type)},
+            data={"policy_type": "Motor", "country": "NZ"}
+        )
         
         assert response.status_code == 201
         data = response.json()
@@ -100,33 +94,24 @@ class TestSingleFileUpload:
         client, 
         auth_headers_with_csrf, 
         sample_pdf_file,
-        db_session
+        db_session,
+        mock_classify
     ):
         """Test upload with different country codes."""
         filename, file_content, content_type = sample_pdf_file
+        pdf_bytes = file_content.getvalue()
         countries = ["NZ", "AU", "UK", "US"]
         
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
+        for country in countries:
+            response = client.post(
+                "/api/documents/upload",
+                headers=auth_headers_with_csrf,
+                files={"file": (f"test_{country}.pdf", BytesIO(pdf_bytes), content_type)},
+                data={"policy_type": "Motor", "country": country}
+            )
             
-            for country in countries:
-                file_content.seek(0)  # Reset file pointer
-                response = client.post(
-                    "/api/documents/upload",
-                    headers=auth_headers_with_csrf,
-                    files={"file": (f"test_{country}.pdf", file_content, content_type)},
-                    data={"policy_type": "Motor", "country": country}
-                )
-                
-                assert response.status_code == 201
-                assert response.json()["country"] == country
+            assert response.status_code == 201
+            assert response.json()["country"] == country
 
 
 class TestMultipleFileUpload:
@@ -136,83 +121,69 @@ class TestMultipleFileUpload:
         self, 
         client, 
         auth_headers_with_csrf, 
-        db_session
+        db_session,
+        multiple_sample_pdf_files,
+        mock_classify
     ):
         """Test uploading multiple PDF files at the same time."""
-        # Create multiple PDF files
-        files = []
-        for i in range(3):
-            pdf_content = f"%PDF-1.4\n%Test PDF {i}\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
-            files.append(("file", (f"batch_test_{i}.pdf", BytesIO(pdf_content), "application/pdf")))
+        files = [("file", pdf_file) for pdf_file in multiple_sample_pdf_files]
         
         # Note: The current API supports single file per request, but we can test
         # the behavior when multiple files are attempted
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
-            
-            # Current implementation only processes the first file
-            # This test documents current behavior
-            response = client.post(
-                "/api/documents/upload",
-                headers=auth_headers_with_csrf,
-                files=files  # Multiple files
-            )
-            
-            # The endpoint accepts files parameter but only processes one
-            # This is testing the actual behavior
-            assert response.status_code in [201, 422]
+        # Current implementation only processes the first file
+        # This test documents current behavior
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files=files  # Multiple files
+        )
+        
+        # The endpoint accepts files parameter but only processes one
+        # This is testing the actual behavior
+        assert response.status_code in [201, 422]
     
     def test_batch_upload_endpoint(
         self, 
         client, 
         auth_headers_with_csrf, 
-        db_session
+        db_session,
+        multiple_sample_pdf_files,
+        mock_classify
     ):
         """Test batch upload endpoint for multiple files."""
-        # Create multiple files for batch upload
-        files = []
-        for i in range(3):
-            pdf_content = f"%PDF-1.4\n%Batch test {i}\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
-            files.append(("files", (f"batch_{i}.pdf", BytesIO(pdf_content), "application/pdf")))
-        
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Home",
-                "classification": "policy_document",
-                "confidence": 0.92,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
-            
-            # Test batch endpoint if it exists, otherwise test sequential uploads
-            response = client.post(
-                "/api/documents/upload",
-                headers=auth_headers_with_csrf,
-                files=files,
-                data={"policy_type": "Home", "country": "AU"}
-            )
-            
-            # Document the current API behavior
-            # If batch is not supported, it should return appropriate error
-            assert response.status_code in [201, 400, 422]
+        files = [("files", pdf_file) for pdf_file in multiple_sample_pdf_files]
+        
+        mock_classify.return_value |= {"detected_policy_type": "Home", "confidence": 0.92}
+        
+        response = client.post(
+            "/api/documents/upload-batch",
+            headers=auth_headers_with_csrf,
+            files=files,
+            data={"policy_type": "Home", "country": "AU"}
+        )
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total_processed"] == 3
+        assert data["failed"] == []
+        assert len(data["successful"]) == 3
+        assert all(doc["country"] == "AU" for doc in data["successful"])
+        assert mock_classify.call_count == 3
+        
+        uploaded_ids = [doc["id"] for doc in data["successful"]]
+        assert db_session.query(Document).filter(Document.id.in_(uploaded_ids)).count() == 3
     
     def test_upload_multiple_with_mixed_validity(
         self,
         client,
         auth_headers_with_csrf,
-        db_session
+        db_session,
+        minimal_pdf_bytes,
+        mock_classify
     ):
         """Test upload with mix of valid PDFs and invalid files."""
         # Create one valid PDF and one invalid file
-        valid_pdf = BytesIO(b"%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF")
+        valid_pdf = BytesIO(minimal_pdf_bytes)
         invalid_file = BytesIO(b"This is not a PDF")
         
         files = [
@@ -221,46 +192,43 @@ class TestMultipleFileUpload:
         ]
         
         response = client.post(
-            "/api/documents/upload",
+            "/api/documents/upload-batch",
             headers=auth_headers_with_csrf,
             files=files,
             data={"policy_type": "Motor", "country": "NZ"}
         )
         
-        # API should reject if any file is invalid
-        assert response.status_code in [400, 422]
+        # Each file is judged on its own: the PDF is stored, the text file is reported
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total_processed"] == 2
+        assert len(data["successful"]) == 1
+        assert data["failed"] == [
+            {"filename": "invalid.txt", "error": "Only PDF files are accepted"}
+        ]
     
     def test_sequential_multiple_uploads(
         self,
         client,
         auth_headers_with_csrf,
-        db_session
+        db_session,
+        mock_classify
     ):
         """Test uploading multiple files sequentially."""
         uploaded_ids = []
         
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
+        for i in range(5):
+            pdf_content = f"%PDF-1.4\n%Sequential {i}\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
+            
+            response = client.post(
+                "/api/documents/upload",
+                headers=auth_headers_with_csrf,
+                files={"file": (f"seq_{i}.pdf", BytesIO(pdf_content), "application/pdf")},
+                data={"policy_type": "Motor", "country": "NZ"}
+            )
             
-            for i in range(5):
-                pdf_content = f"%PDF-1.4\n%Sequential {i}\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF".encode()
-                
-                response = client.post(
-                    "/api/documents/upload",
-                    headers=auth_headers_with_csrf,
-                    files={"file": (f"seq_{i}.pdf", BytesIO(pdf_content), "application/pdf")},
-                    data={"policy_type": "Motor", "country": "NZ"}
-                )
-                
-                assert response.status_code == 201
-                uploaded_ids.append(response.json()["id"])
+            assert response.status_code == 201
+            uploaded_ids.append(response.json()["id"])
         
         # Verify all uploads succeeded
         assert len(uploaded_ids) == 5
@@ -288,46 +256,87 @@ class TestUploadValidation:
         # Empty PDF should be handled (may succeed or fail depending on implementation)
         assert response.status_code in [201, 400, 500]
     
-    def test_upload_missing_filename(self, client, auth_headers_with_csrf):
-        """Test upload without filename."""
-        pdf_content = b"%PDF-1.4\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
+    def test_upload_exceeding_size_limit(
+        self, 
+        client, 
+        auth_headers_with_csrf, 
+        db_session, 
+        monkeypatch,
+        mock_classify
+    ):
+        """Test oversized uploads are rejected while streaming to disk."""
+        monkeypatch.setattr('app.routers.documents_router.UPLOAD_CHUNK_SIZE', 16)
+        monkeypatch.setattr('app.routers.documents_router.MAX_FILE_SIZE_BYTES', 64)
+        pdf_content = b"%PDF-1.4\n" + b"0" * 128 + b"\n%%EOF"
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": ("oversized.pdf", BytesIO(pdf_content), "application/pdf")},
+            data={"policy_type": "Motor", "country": "NZ"}
+        )
+        
+        assert response.status_code == 413
+        mock_classify.assert_not_called()
+        
+        assert db_session.query(Document).count() == 0
+    
+    def test_upload_rejects_before_full_read(
+        self, 
+        client, 
+        auth_headers_with_csrf, 
+        db_session,
+        mock_classify
+    ):
+        """Test a .pdf upload without the PDF magic number is rejected up front."""
+        fake_pdf = BytesIO(b"<html>" + b"0" * (256 * 1024))
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": ("disguised.pdf", fake_pdf, "application/pdf")},
+            data={"policy_type": "Motor", "country": "NZ"}
+        )
+        
+        assert response.status_code == 400
+        assert "PDF" in response.json()["detail"]
+        mock_classify.assert_not_called()
         
+        assert db_session.query(Document).count() == 0
+    
+    def test_upload_missing_filename(self, client, auth_headers_with_csrf, minimal_pdf_bytes):
+        """Test upload without filename."""
         response = client.post(
             "/api/documents/upload",
             headers=auth_headers_with_csrf,
-            files={"file": ("", BytesIO(pdf_content), "application/pdf")},
+            files={"file": ("", BytesIO(minimal_pdf_bytes), "application/pdf")},
             data={"policy_type": "Motor", "country": "NZ"}
         )
         
         # Should fail without filename
         assert response.status_code in [400, 422]
     
-    def test_upload_large_filename(self, client, auth_headers_with_csrf):
+    def test_upload_large_filename(self, client, auth_headers_with_csrf, minimal_pdf_bytes, mock_classify):
         """Test upload with very long filename."""
         long_name = "a" * 200 + ".pdf"
-        pdf_content = b"%PDF-1.4\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
-        
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
-            
-            response = client.post(
-                "/api/documents/upload",
-                headers=auth_headers_with_csrf,
-                files={"file": (long_name, BytesIO(pdf_content), "application/pdf")},
-                data={"policy_type": "Motor", "country": "NZ"}
-            )
-            
-            # Should handle long filenames gracefully
-            assert response.status_code in [201, 400]
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (long_name, BytesIO(minimal_pdf_bytes), "application/pdf")},
+            data={"policy_type": "Motor", "country": "NZ"}
+        )
+        
+        # Should handle long filenames gracefully
+        assert response.status_code in [201, 400]
     
-    def test_upload_special_chars_in_filename(self, client, auth_headers_with_csrf):
+    def test_upload_special_chars_in_filename(
+        self, 
+        client, 
+        auth_headers_with_csrf, 
+        minimal_pdf_bytes,
+        mock_classify
+    ):
         """Test upload with special characters in filename."""
         special_names = [
             "file with spaces.pdf",
@@ -337,28 +346,16 @@ class TestUploadValidation:
             "M%C3%A4rz.pdf",  # URL encoded
         ]
         
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Motor",
-                "classification": "policy_document",
-                "confidence": 0.95,
-                "status": "pending",
-                "metadata": {},
-                "warnings": []
-            }
+        for name in special_names:
+            response = client.post(
+                "/api/documents/upload",
+                headers=auth_headers_with_csrf,
+                files={"file": (name, BytesIO(minimal_pdf_bytes), "application/pdf")},
+                data={"policy_type": "Motor", "country": "NZ"}
+            )
             
-            for name in special_names:
-                pdf_content = b"%PDF-1.4\ntrailer\n<<\n/Root 1 0 R\n>>\n%%EOF"
-                
-                response = client.post(
-                    "/api/documents/upload",
-                    headers=auth_headers_with_csrf,
-                    files={"file": (name, BytesIO(pdf_content), "application/pdf")},
-                    data={"policy_type": "Motor", "country": "NZ"}
-                )
-                
-                # Should handle special characters
-                assert response.status_code in [201, 400]
+            # Should handle special characters
+            assert response.status_code in [201, 400]
 
 
 class TestUploadClassification:
@@ -369,53 +366,168 @@ class TestUploadClassification:
         client,
         auth_headers_with_csrf,
         sample_pdf_file,
-        db_session
+        db_session,
+        mock_classify
     ):
         """Test that upload triggers document classification."""
         filename, file_content, content_type = sample_pdf_file
+        pdf_bytes = file_content.getvalue()
         
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.return_value = {
-                "detected_policy_type": "Home",
-                "classification": "policy_wording",
-                "confidence": 0.88,
-                "status": "pending",
-                "metadata": {"test": True},
-                "warnings": ["Low confidence"]
-            }
-            
-            response = client.post(
+        mock_classify.return_value |= {
+            "detected_policy_type": "Home",
+            "classification": "policy_wording",
+            "confidence": 0.88,
+            "metadata": {"test": True},
+            "warnings": ["Low confidence"]
+        }
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, BytesIO(pdf_bytes), content_type)},
+            data={"policy_type": "General", "country": "NZ"}
+        )
+        
+        assert response.status_code == 201
+        data = response.json()
+        assert data["classification"] == "policy_wording"
+        assert data["confidence"] == 0.88
+        assert data["policy_type"] == "Home"
+        mock_classify.assert_called_once()
+        
+        # A byte-identical re-upload reuses the stored classification
+        duplicate = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, BytesIO(pdf_bytes), content_type)},
+            data={"policy_type": "General", "country": "NZ"}
+        )
+        
+        assert duplicate.status_code == 201
+        duplicate_data = duplicate.json()
+        assert duplicate_data["id"] != data["id"]
+        assert duplicate_data["file_hash"] == data["file_hash"]
+        assert duplicate_data["classification"] == "policy_wording"
+        assert duplicate_data["confidence"] == 0.88
+        assert mock_classify.call_count == 1
+    
+    def test_upload_reuses_cached_classification(
+        self,
+        client,
+        auth_headers_with_csrf,
+        sample_pdf_file,
+        db_session,
+        monkeypatch,
+        mock_classify
+    ):
+        """Test the content-hash cache survives deletion of the original document."""
+        filename, file_content, content_type = sample_pdf_file
+        pdf_bytes = file_content.getvalue()
+        cache = {}
+        monkeypatch.setattr(
+            'app.routers.documents_router.get_cached_json', cache.get
+        )
+        monkeypatch.setattr(
+            'app.routers.documents_router.set_cached_json',
+            lambda key, value, ttl_seconds: cache.__setitem__(key, value)
+        )
+        
+        mock_classify.return_value |= {
+            "detected_policy_type": "Home",
+            "classification": "policy_wording",
+            "confidence": 0.88,
+        }
+        
+        first = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, BytesIO(pdf_bytes), content_type)},
+            data={"policy_type": "General", "country": "NZ"}
+        )
+        assert first.status_code == 201
+        db_session.query(Document).filter(Document.id == first.json()["id"]).delete()
+        db_session.flush()
+        
+        second = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, BytesIO(pdf_bytes), content_type)},
+            data={"policy_type": "General", "country": "NZ"}
+        )
+        
+        assert second.status_code == 201
+        assert second.json()["classification"] == "policy_wording"
+        assert mock_classify.call_count == 1
+    
+    @pytest.mark.parametrize("changed", [
+        {"policy_type": "Home"},
+        {"filename": "renamed_policy.pdf"},
+    ], ids=["policy_type", "filename"])
+    def test_upload_reclassifies_when_inputs_differ(
+        self,
+        client,
+        auth_headers_with_csrf,
+        sample_pdf_file,
+        db_session,
+        monkeypatch,
+        mock_classify,
+        changed
+    ):
+        """Test identical bytes with a different hint or filename are classified afresh."""
+        filename, file_content, content_type = sample_pdf_file
+        pdf_bytes = file_content.getvalue()
+        cache = {}
+        monkeypatch.setattr(
+            'app.routers.documents_router.get_cached_json', cache.get
+        )
+        monkeypatch.setattr(
+            'app.routers.documents_router.set_cached_json',
+            lambda key, value, ttl_seconds: cache.__setitem__(key, value)
+        )
+        
+        def upload(filename="policy.pdf", policy_type="General"):
+            return client.post(
                 "/api/documents/upload",
                 headers=auth_headers_with_csrf,
-                files={"file": (filename, file_content, content_type)},
-                data={"policy_type": "General", "country": "NZ"}
+                files={"file": (filename, BytesIO(pdf_bytes), content_type)},
+                data={"policy_type": policy_type, "country": "NZ"}
             )
-            
-            assert response.status_code == 201
-            data = response.json()
-            assert data["classification"] == "policy_wording"
-            assert data["confidence"] == 0.88
-            assert data["policy_type"] == "Home"
-            mock_classify.assert_called_once()
+        
+        assert upload().status_code == 201
+        # A new dict, since the fake cache holds the first result by reference
+        mock_classify.return_value = {
+            **mock_classify.return_value, "detected_policy_type": "Home"
+        }
+        
+        response = upload(**changed)
+        
+        assert response.status_code == 201
+        assert response.json()["policy_type"] == "Home"
+        assert mock_classify.call_count == 2
+        assert mock_classify.call_args.kwargs["policy_type"] == changed.get("policy_type", "General")
+        # Both inputs now have an entry, so repeating either is a cache hit
+        assert upload().json()["policy_type"] == "Motor"
+        assert upload(**changed).json()["policy_type"] == "Home"
+        assert mock_classify.call_count == 2
     
     def test_upload_classification_error_handling(
         self,
         client,
         auth_headers_with_csrf,
-        sample_pdf_file
+        sample_pdf_file,
+        mock_classify
     ):
         """Test handling of classification service errors."""
         filename, file_content, content_type = sample_pdf_file
         
-        with patch('app.routers.documents_router.classify_document') as mock_classify:
-            mock_classify.side_effect = Exception("Classification service error")
-            
-            response = client.post(
-                "/api/documents/upload",
-                headers=auth_headers_with_csrf,
-                files={"file": (filename, file_content, content_type)},
-                data={"policy_type": "Motor", "country": "NZ"}
-            )
-            
-            assert response.status_code == 500
-            assert "Upload failed" in response.json()["detail"]
+        mock_classify.side_effect = Exception("Classification service error")
+        
+        response = client.post(
+            "/api/documents/upload",
+            headers=auth_headers_with_csrf,
+            files={"file": (filename, file_content, content_type)},
+            data={"policy_type": "Motor", "country": "NZ"}
+        )
+        
+        assert response.status_code == 500
+        assert "Upload failed" in response.json()["detail"]
@@ -8,11 +8,21 @@ Includes:
 - Export to CSV
 - Download validation
 """
+import csv
 import pytest
+import struct
+import tracemalloc
+import zipfile
 from datetime import datetime, timezone
-from io import BytesIO
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from sqlalchemy import insert
+
+from app.routers import documents_router
+from app.services import document_service
+
 
 class TestSingleDocumentDownload:
     """Tests for single document download."""
@@ -22,45 +32,175 @@ class TestSingleDocumentDownload:
         client, 
         auth_headers,
         sample_document,
-        tmp_path
+        tmp_path,
+        monkeypatch
     ):
         """Test downloading an existing document."""
         # Create a temporary file
         test_file = tmp_path / "download_test.pdf"
-        test_file.write_bytes(b"%PDF-1.4 test content for download")
+        content = b"%PDF-1.4 test content for download"
+        test_file.write_bytes(content)
         
         # Update document path
         sample_document.local_file_path = str(test_file)
+        # tmp_path lies outside the storage root, so bypass the path guard
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
         
         response = client.get(
             f"/api/documents/{sample_document.id}/download",
             headers=auth_headers
         )
         
-        # May succeed or fail depending on file existence
-        assert response.status_code in [200, 404]
+        assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/pdf"
+        assert response.content == content
+        # Served as a FileResponse straight from disk, not a buffered stream
+        assert response.headers.get("content-length") == str(len(content))
+        assert "etag" in response.headers
+        assert "last-modified" in response.headers
+        assert response.headers.get("accept-ranges") == "bytes"
+    
+    @pytest.mark.parametrize("range_header,start,end", [
+        ("bytes=0-7", 0, 7),
+        ("bytes=9-", 9, 33),
+        ("bytes=-7", 27, 33),
+        ("bytes=20-999", 20, 33),
+    ], ids=["bounded", "open-ended", "suffix", "past-end"])
+    def test_download_range_request(
+        self, 
+        client, 
+        auth_headers,
+        sample_document,
+        tmp_path,
+        monkeypatch,
+        range_header,
+        start,
+        end
+    ):
+        """Test a Range request returns 206 with just the requested slice."""
+        test_file = tmp_path / "range_test.pdf"
+        content = b"%PDF-1.4 test content for download"
+        test_file.write_bytes(content)
+        sample_document.local_file_path = str(test_file)
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
         
-        if response.status_code == 200:
-            assert response.headers.get("content-type") == "application/pdf"
+        response = client.get(
+            f"/api/documents/{sample_document.id}/download",
+            headers={**auth_headers, "Range": range_header}
+        )
+        
+        assert response.status_code == 206
+        assert response.content == content[start:end + 1]
+        assert response.headers.get("content-range") == f"bytes {start}-{end}/{len(content)}"
+        assert response.headers.get("content-length") == str(end - start + 1)
+        assert 'filename="range_test.pdf"' in response.headers.get("content-disposition", "")
+    
+    @pytest.mark.parametrize("validator,expected_status", [
+        ("etag", 206),
+        ("last-modified", 206),
+        ('"stale-etag"', 200),
+    ], ids=["etag", "last-modified", "changed"])
+    def test_download_if_range(
+        self, 
+        client, 
+        auth_headers,
+        sample_document,
+        tmp_path,
+        monkeypatch,
+        validator,
+        expected_status
+    ):
+        """Test If-Range only honours Range while the file is unchanged."""
+        test_file = tmp_path / "range_test.pdf"
+        content = b"%PDF-1.4 test content for download"
+        test_file.write_bytes(content)
+        sample_document.local_file_path = str(test_file)
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
+        url = f"/api/documents/{sample_document.id}/download"
+        full = client.get(url, headers=auth_headers)
+        if_range = full.headers.get(validator, validator)
+        
+        response = client.get(
+            url,
+            headers={**auth_headers, "Range": "bytes=9-", "If-Range": if_range}
+        )
+        
+        assert response.status_code == expected_status
+        assert response.content == (content[9:] if expected_status == 206 else content)
+    
+    def test_download_range_not_satisfiable(
+        self, 
+        client, 
+        auth_headers,
+        sample_document,
+        tmp_path,
+        monkeypatch
+    ):
+        """Test a Range starting past the end of the file is rejected with 416."""
+        test_file = tmp_path / "range_test.pdf"
+        test_file.write_bytes(b"%PDF-1.4")
+        sample_document.local_file_path = str(test_file)
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
+        
+        response = client.get(
+            f"/api/documents/{sample_document.id}/download",
+            headers={**auth_headers, "Range": "bytes=100-"}
+        )
+        
+        assert response.status_code == 416
+        assert response.headers.get("content-range") == "bytes */8"
+    
+    async def test_download_chunk_size(self, tmp_path):
+        """Test a 1 MB PDF is sent in a handful of body chunks."""
+        test_file = tmp_path / "large.pdf"
+        test_file.write_bytes(b"%PDF-1.4" + b"0" * (1024 * 1024))
+        messages = []
+        
+        async def receive():
+            return {"type": "http.disconnect"}
+        
+        async def send(message):
+            messages.append(message)
+        
+        response = documents_router.PDFFileResponse(
+            path=test_file, media_type="application/pdf"
+        )
+        await response({"type": "http", "method": "GET", "headers": []}, receive, send)
+        
+        body_chunks = [m for m in messages if m["type"] == "http.response.body"]
+        assert len(body_chunks) <= 8
+        assert sum(len(m["body"]) for m in body_chunks) == test_file.stat().st_size
     
     def test_download_with_token_param(
         self, 
         client, 
         sample_document,
-        test_user,
+        testuser_access_token,
         tmp_path
     ):
         """Test download with token query parameter."""
-        from app.auth import create_access_token
-        
-        token = create_access_token(data={"sub": test_user.username})
-        
         test_file = tmp_path / "token_test.pdf"
         test_file.write_bytes(b"%PDF-1.4 content")
         sample_document.local_file_path = str(test_file)
         
         response = client.get(
-            f"/api/documents/{sample_document.id}/download?token={token}",
+            f"/api/documents/{sample_document.id}/download?token={testuser_access_token}",
         )
         
         assert response.status_code in [200, 404]
@@ -101,7 +241,8 @@ class TestBulkDownloadZip:
         client, 
         auth_headers,
         multiple_sample_documents,
-        tmp_path
+        tmp_path,
+        monkeypatch
     ):
         """Test downloading all documents as ZIP."""
         # Create temporary files for documents
@@ -109,18 +250,39 @@ class TestBulkDownloadZip:
             test_file = tmp_path / f"bulk_{i}.pdf"
             test_file.write_bytes(f"%PDF-1.4 content {i}".encode())
             doc.local_file_path = str(test_file)
+        # tmp_path lies outside the storage root, so bypass the path guard
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
         
         response = client.get(
             "/api/documents/download-all/zip",
             headers=auth_headers
         )
         
-        # Should succeed or return 404 if no files
-        assert response.status_code in [200, 404]
-        
-        if response.status_code == 200:
-            assert response.headers.get("content-type") == "application/zip"
-            assert "attachment" in response.headers.get("content-disposition", "")
+        assert response.status_code == 200
+        assert response.headers.get("content-type") == "application/zip"
+        assert "attachment" in response.headers.get("content-disposition", "")
+        # Streamed as it is built, so the total size is not known up front
+        assert "content-length" not in response.headers
+        with zipfile.ZipFile(BytesIO(response.content)) as archive:
+            assert archive.testzip() is None
+            assert len(archive.namelist()) == len(multiple_sample_documents)
+            assert all(
+                info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()
+            )
+            # No data descriptors: streaming readers reject them on STORED entries
+            assert not any(info.flag_bits & 0x08 for info in archive.infolist())
+        
+        # Read front to back the way unzip-from-stdin does: each local header
+        # must carry the real CRC and size
+        content = response.content
+        for info in archive.infolist():
+            header = content[info.header_offset:info.header_offset + 30]
+            crc, compressed, size = struct.unpack("<III", header[14:26])
+            assert (crc, compressed, size) == (info.CRC, info.file_size, info.file_size)
     
     def test_download_zip_with_country_filter(
         self, 
@@ -194,12 +356,13 @@ class TestBulkDownloadZip:
         """Test ZIP download filtered by crawl session."""
         from app.models import Document
         
-        # Create documents for this crawl session
-        for i in range(3):
-            doc = Document(
+        # Create documents for this crawl session with one executemany INSERT
+        paths = [tmp_path / f"crawl_{i}.pdf" for i in range(3)]
+        db_session.execute(insert(Document), [
+            dict(
                 source_url=f"https://example.com/crawl{i}.pdf",
                 insurer="Crawl Insurer",
-                local_file_path=str(tmp_path / f"crawl_{i}.pdf"),
+                local_file_path=str(path),
                 country="NZ",
                 policy_type="Motor",
                 document_type="PDS",
@@ -208,10 +371,10 @@ class TestBulkDownloadZip:
                 status="pending",
                 crawl_session_id=sample_crawl_session.id
             )
-            db_session.add(doc)
-            # Create the file
-            (tmp_path / f"crawl_{i}.pdf").write_bytes(b"%PDF-1.4")
-        db_session.commit()
+            for i, path in enumerate(paths)
+        ])
+        for path in paths:
+            path.write_bytes(b"%PDF-1.4")
         
         response = client.get(
             f"/api/documents/download-all/zip?crawl_session_id={sample_crawl_session.id}",
@@ -234,6 +397,66 @@ class TestBulkDownloadZip:
         assert response.status_code == 404
         assert "no downloadable files" in response.json()["detail"].lower()
     
+    def test_download_zip_large_files(self, tmp_path, monkeypatch):
+        """Test ZIP streaming never holds a whole large file in Python memory."""
+        file_size = 8 * 1024 * 1024
+        documents = []
+        for i in range(2):
+            test_file = tmp_path / f"large_{i}.pdf"
+            test_file.write_bytes(b"%PDF-1.4" + b"0" * file_size)
+            documents.append(
+                MagicMock(id=i, policy_type="Motor", local_file_path=str(test_file))
+            )
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
+        
+        tracemalloc.start()
+        try:
+            streamed = sum(
+                len(chunk) for chunk in document_service.generate_zip_stream(documents)
+            )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert streamed > 2 * file_size
+        assert peak < file_size // 2
+    
+    @pytest.mark.parametrize("internals_available", [True, False], ids=["headers", "fallback"])
+    def test_zip_stream_is_valid(self, tmp_path, monkeypatch, internals_available):
+        """Test the streamed archive is valid, with or without the ZipFile internals it uses."""
+        contents = [b"%PDF-1.4 first", b"", b"%PDF-1.4 " + b"0" * 4096]
+        documents = []
+        for i, content in enumerate(contents):
+            test_file = tmp_path / f"entry_{i}.pdf"
+            test_file.write_bytes(content)
+            documents.append(
+                MagicMock(id=i, policy_type="Motor", local_file_path=str(test_file))
+            )
+        monkeypatch.setattr(
+            document_service,
+            "get_document_file_path",
+            lambda doc: Path(doc.local_file_path),
+        )
+        if not internals_available:
+            monkeypatch.setattr(
+                document_service, "_ZIPFILE_WRITE_INTERNALS", ("no_such_attribute",)
+            )
+        
+        archive_bytes = b"".join(document_service.generate_zip_stream(documents))
+        
+        with zipfile.ZipFile(BytesIO(archive_bytes)) as archive:
+            assert archive.testzip() is None
+            assert [archive.read(info) for info in archive.infolist()] == contents
+            # Only the fallback needs data descriptors
+            assert all(
+                bool(info.flag_bits & 0x08) != internals_available
+                for info in archive.infolist()
+            )
+    
     def test_download_zip_filename_format(
         self, 
         client, 
@@ -267,16 +490,43 @@ class TestCsvExport:
         auth_headers,
         multiple_sample_documents
     ):
-        """Test that CSV export endpoint exists."""
-        # Note: CSV export may be client-side only
-        # This test checks if a server-side endpoint exists
+        """Test the server-side CSV export streams every document."""
         response = client.get(
             "/api/documents/export/csv",
             headers=auth_headers
         )
         
-        # May be 404 if client-side only
-        assert response.status_code in [200, 404]
+        assert response.status_code == 200
+        assert response.headers.get("content-type").startswith("text/csv")
+        assert "attachment" in response.headers.get("content-disposition", "")
+        assert "content-length" not in response.headers
+        
+        rows = list(csv.reader(StringIO(response.text)))
+        assert rows[0] == list(document_service.CSV_EXPORT_COLUMNS)
+        assert sorted(int(row[0]) for row in rows[1:]) == sorted(
+            doc.id for doc in multiple_sample_documents
+        )
+    
+    def test_export_csv_with_filter(
+        self, 
+        client, 
+        auth_headers,
+        multiple_sample_documents
+    ):
+        """Test CSV export applies the same filters as the ZIP download."""
+        response = client.get(
+            "/api/documents/export/csv?country=NZ&policy_type=Motor",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        rows = list(csv.DictReader(StringIO(response.text)))
+        expected = [
+            doc for doc in multiple_sample_documents
+            if doc.country == "NZ" and doc.policy_type == "Motor"
+        ]
+        assert len(rows) == len(expected)
+        assert all(row["Country"] == "NZ" and row["Policy Type"] == "Motor" for row in rows)
     
     def test_document_listing_for_csv_export(
         self, 
@@ -307,17 +557,13 @@ class TestCsvExport:
 class TestDownloadValidation:
     """Tests for download validation and security."""
     
-    def test_download_without_auth(self, client, sample_document):
-        """Test download requires authentication."""
-        response = client.get(
-            f"/api/documents/{sample_document.id}/download"
-        )
-        
-        assert response.status_code == 403
-    
-    def test_bulk_download_without_auth(self, client):
-        """Test bulk download requires authentication."""
-        response = client.get("/api/documents/download-all/zip")
+    @pytest.mark.parametrize("url", [
+        "/api/documents/1/download",
+        "/api/documents/download-all/zip",
+    ], ids=["single", "bulk"])
+    def test_download_without_auth(self, client, url):
+        """Test single and bulk downloads require authentication."""
+        response = client.get(url)
         
         assert response.status_code == 403
     
@@ -343,8 +589,7 @@ class TestDownloadValidation:
             status="pending"
         )
         db_session.add(doc)
-        db_session.commit()
-        db_session.refresh(doc)
+        db_session.flush()  # Assigns doc.id; the route shares this session
         
         response = client.get(
             f"/api/documents/{doc.id}/download",
@@ -358,61 +603,27 @@ class TestDownloadValidation:
 class TestDownloadAllVariations:
     """Tests for various download all scenarios."""
     
-    def test_download_all_with_min_confidence(
-        self, 
-        client, 
-        auth_headers,
-        multiple_sample_documents,
-        tmp_path
-    ):
-        """Test download with minimum confidence filter."""
-        for i, doc in enumerate(multiple_sample_documents):
-            test_file = tmp_path / f"conf_{i}.pdf"
-            test_file.write_bytes(b"%PDF-1.4")
-            doc.local_file_path = str(test_file)
-        
-        response = client.get(
-            "/api/documents/download-all/zip?min_confidence=0.92",
-            headers=auth_headers
-        )
-        
-        assert response.status_code in [200, 404]
-    
-    def test_download_all_with_classification_filter(
+    @pytest.mark.parametrize("filter_qs", [
+        "min_confidence=0.92",
+        "classification=policy_document",
+        "search=Motor",
+    ])
+    def test_download_all_with_filter(
         self, 
         client, 
         auth_headers,
         multiple_sample_documents,
-        tmp_path
-    ):
-        """Test download with classification filter."""
-        for i, doc in enumerate(multiple_sample_documents):
-            test_file = tmp_path / f"class_{i}.pdf"
-            test_file.write_bytes(b"%PDF-1.4")
-            doc.local_file_path = str(test_file)
-        
-        response = client.get(
-            "/api/documents/download-all/zip?classification=policy_document",
-            headers=auth_headers
-        )
-        
-        assert response.status_code in [200, 404]
-    
-    def test_download_all_with_search_filter(
-        self, 
-        client, 
-        auth_headers,
-        multiple_sample_documents,
-        tmp_path
+        tmp_path,
+        filter_qs
     ):
-        """Test download with search filter."""
+        """Test download with confidence, classification and search filters."""
         for i, doc in enumerate(multiple_sample_documents):
-            test_file = tmp_path / f"search_{i}.pdf"
+            test_file = tmp_path / f"filter_{i}.pdf"
             test_file.write_bytes(b"%PDF-1.4")
             doc.local_file_path = str(test_file)
         
         response = client.get(
-            "/api/documents/download-all/zip?search=Motor",
+            f"/api/documents/download-all/zip?{filter_qs}",
             headers=auth_headers
         )
         
@@ -16,14 +16,14 @@ from datetime import datetime, timezone
 class TestFilterOptions:
     """Tests for filter options endpoint."""
     
-    def test_get_filter_options_success(
+    async def test_get_filter_options_success(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test getting filter options returns distinct values."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents/filters/options",
             headers=auth_headers
         )
@@ -43,14 +43,14 @@ class TestFilterOptions:
         assert isinstance(data["insurers"], list)
         assert isinstance(data["statuses"], list)
     
-    def test_filter_options_reflect_database(
+    async def test_filter_options_reflect_database(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test filter options reflect actual database values."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents/filters/options",
             headers=auth_headers
         )
@@ -66,23 +66,119 @@ class TestFilterOptions:
         # Should have pending, validated, rejected statuses
         assert any(s in data["statuses"] for s in ["pending", "validated", "rejected"])
     
-    def test_filter_options_without_auth(self, client):
+    async def test_filter_options_single_query(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents,
+        documents_queries
+    ):
+        """Test all five dropdowns come from one sorted, de-duplicated scan."""
+        response = await async_client.get(
+            "/api/documents/filters/options",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert len(documents_queries) == 1
+        data = response.json()
+        assert data["countries"] == ["AU", "NZ"]
+        assert data["insurers"] == [f"Test Insurer {i}" for i in range(5)]
+        assert data["policy_types"] == ["Home", "Motor"]
+        assert data["statuses"] == ["pending", "rejected", "validated"]
+        assert data["classifications"] == ["policy_document"]
+    
+    async def test_filter_options_sorted_case_insensitively(
+        self, 
+        async_client, 
+        auth_headers,
+        db_session
+    ):
+        """Test dropdown values sort alphabetically regardless of case."""
+        from app.models import Document
+        
+        for insurer in ("Zurich", "aXA", "AMP"):
+            db_session.add(Document(
+                source_url=f"https://example.com/{insurer}.pdf",
+                insurer=insurer,
+                local_file_path=f"/tmp/{insurer}.pdf",
+                country="NZ",
+                policy_type="Motor",
+                document_type="PDS",
+                classification="policy_document",
+                status="pending"
+            ))
+        db_session.flush()
+        
+        response = await async_client.get(
+            "/api/documents/filters/options",
+            headers=auth_headers
+        )
+        
+        assert response.json()["insurers"] == ["AMP", "aXA", "Zurich"]
+    
+    async def test_filter_options_not_modified(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents
+    ):
+        """Test revalidating with the returned ETag answers 304 with no body."""
+        response = await async_client.get(
+            "/api/documents/filters/options",
+            headers=auth_headers
+        )
+        etag = response.headers["etag"]
+        
+        response = await async_client.get(
+            "/api/documents/filters/options",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    
+    async def test_filter_options_served_from_cache(
+        self, 
+        async_client, 
+        auth_headers,
+        monkeypatch
+    ):
+        """Test a cached payload is returned without rebuilding it."""
+        cached = {
+            "countries": ["NZ"], "insurers": ["Cached"], "policy_types": [],
+            "statuses": [], "classifications": [],
+        }
+        monkeypatch.setattr(
+            "app.routers.documents_router.get_cached_json", lambda key: cached
+        )
+        
+        response = await async_client.get(
+            "/api/documents/filters/options",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == cached
+    
+    async def test_filter_options_without_auth(self, async_client):
         """Test filter options require authentication."""
-        response = client.get("/api/documents/filters/options")
+        response = await async_client.get("/api/documents/filters/options")
         assert response.status_code == 403
 
 
 class TestDocumentListing:
     """Tests for document listing endpoint."""
     
-    def test_list_documents_basic(
+    async def test_list_documents_basic(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test basic document listing."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents",
             headers=auth_headers
         )
@@ -101,14 +197,60 @@ class TestDocumentListing:
         assert len(data["documents"]) > 0
         assert data["total"] >= len(multiple_sample_documents)
     
-    def test_list_documents_default_limit(
+    async def test_list_documents_single_query(
         self, 
-        client, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents,
+        documents_queries
+    ):
+        """Test the page and its total come back from one query."""
+        response = await async_client.get(
+            "/api/documents?limit=2",
+            headers=auth_headers
+        )
+        
+        data = response.json()
+        assert len(documents_queries) == 1
+        assert data["total"] >= len(multiple_sample_documents)
+        assert data["has_more"] == True
+    
+    async def test_list_documents_without_total(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents,
+        documents_queries
+    ):
+        """Test include_total=false pages by cursor without ever counting."""
+        seen = []
+        params = {"limit": 2, "include_total": "false"}
+        while True:
+            response = await async_client.get(
+                "/api/documents",
+                params=params,
+                headers=auth_headers
+            )
+            data = response.json()
+            assert data["total"] is None
+            seen.extend(d["id"] for d in data["documents"])
+            if not data["has_more"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        
+        assert {doc.id for doc in multiple_sample_documents} <= set(seen)
+        # One query per page, none of them a COUNT
+        assert len(documents_queries) == -(-len(seen) // 2)
+        assert not any("count(" in sql.lower() for sql, _ in documents_queries)
+    
+    async def test_list_documents_default_limit(
+        self, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test default limit is applied."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents",
             headers=auth_headers
         )
@@ -116,14 +258,14 @@ class TestDocumentListing:
         data = response.json()
         assert data["limit"] == 50  # Default limit
     
-    def test_list_documents_custom_limit(
+    async def test_list_documents_custom_limit(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test custom limit parameter."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?limit=2",
             headers=auth_headers
         )
@@ -132,41 +274,137 @@ class TestDocumentListing:
         assert data["limit"] == 2
         assert len(data["documents"]) <= 2
     
-    def test_list_documents_pagination(
+    async def test_list_documents_pagination(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents
+    ):
+        """Test following next_cursor walks every document exactly once."""
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await async_client.get(
+                "/api/documents",
+                params=params,
+                headers=auth_headers
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["documents"]) <= 2
+            seen.extend(d["id"] for d in data["documents"])
+            
+            cursor = data["next_cursor"]
+            assert bool(cursor) == data["has_more"]
+            if not cursor:
+                break
+        
+        # Pages should not overlap, and together they cover everything
+        assert len(seen) == len(set(seen)), "Pages should not overlap"
+        assert len(seen) == data["total"]
+        assert {d.id for d in multiple_sample_documents} <= set(seen)
+
+    async def test_list_documents_prefetch(
+        self,
+        async_client,
+        auth_headers,
+        multiple_sample_documents,
+        documents_queries
+    ):
+        """Test prefetch=true returns the next page from the same query."""
+        params = {"limit": 2, "include_total": "false"}
+        plain = [(await async_client.get(
+            "/api/documents",
+            params=params,
+            headers=auth_headers
+        )).json()]
+        plain.append((await async_client.get(
+            "/api/documents",
+            params={**params, "cursor": plain[0]["next_cursor"]},
+            headers=auth_headers
+        )).json())
+        documents_queries.clear()
+
+        response = await async_client.get(
+            "/api/documents",
+            params={**params, "prefetch": "true"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(documents_queries) == 1
+        assert data["documents"] == plain[0]["documents"]
+        assert data["next_cursor"] == plain[0]["next_cursor"]
+        prefetched = data["prefetched_next"]
+        assert prefetched["documents"] == plain[1]["documents"]
+        assert prefetched["has_more"] == plain[1]["has_more"]
+        assert prefetched["next_cursor"] == plain[1]["next_cursor"]
+
+    async def test_list_documents_skip_pagination(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
-        """Test pagination with skip/limit."""
-        # Get first page
-        response1 = client.get(
+        """Test legacy skip/limit pagination still works but is flagged deprecated."""
+        response1 = await async_client.get(
             "/api/documents?limit=2&skip=0",
             headers=auth_headers
         )
         data1 = response1.json()
+        assert "deprecation" not in response1.headers
         
-        # Get second page
-        response2 = client.get(
+        response2 = await async_client.get(
             "/api/documents?limit=2&skip=2",
             headers=auth_headers
         )
         data2 = response2.json()
+        assert response2.headers.get("deprecation") == "true"
         
-        # Documents should be different
-        if len(data1["documents"]) > 0 and len(data2["documents"]) > 0:
-            ids1 = {d["id"] for d in data1["documents"]}
-            ids2 = {d["id"] for d in data2["documents"]}
-            assert not ids1.intersection(ids2), "Pages should not overlap"
+        ids1 = {d["id"] for d in data1["documents"]}
+        ids2 = {d["id"] for d in data2["documents"]}
+        assert not ids1.intersection(ids2), "Pages should not overlap"
     
-    def test_list_documents_page_parameter(
+    async def test_list_documents_invalid_cursor(self, async_client, auth_headers):
+        """Test a malformed cursor is rejected."""
+        response = await async_client.get(
+            "/api/documents?cursor=not-a-cursor",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+    
+    def test_document_created_at_not_null(self, db_session):
+        """Test a NULL created_at, which no cursor could seek past, cannot be stored."""
+        from sqlalchemy import insert
+        from sqlalchemy.exc import IntegrityError
+        from app.models import Document
+        
+        with pytest.raises(IntegrityError), db_session.begin_nested():
+            db_session.execute(insert(Document).values(
+                source_url="https://example.com/undated.pdf",
+                insurer="Undated Insurer",
+                local_file_path="/tmp/undated.pdf",
+                country="NZ",
+                policy_type="Motor",
+                document_type="PDS",
+                classification="policy_document",
+                status="pending",
+                created_at=None,
+            ))
+    
+    async def test_list_documents_page_parameter(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test page-based pagination."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?page=1&limit=3",
             headers=auth_headers
         )
@@ -176,7 +414,7 @@ class TestDocumentListing:
         assert len(data["documents"]) <= 3
         
         # Page 2
-        response2 = client.get(
+        response2 = await async_client.get(
             "/api/documents?page=2&limit=3",
             headers=auth_headers
         )
@@ -187,14 +425,14 @@ class TestDocumentListing:
 class TestDocumentFiltering:
     """Tests for document filtering."""
     
-    def test_filter_by_country(
+    async def test_filter_by_country(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test filtering documents by country."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?country=NZ",
             headers=auth_headers
         )
@@ -206,34 +444,35 @@ class TestDocumentFiltering:
         for doc in data["documents"]:
             assert doc["country"] == "NZ"
     
-    def test_filter_by_status(
+    @pytest.mark.parametrize("status", ["pending", "validated", "rejected"])
+    async def test_filter_by_status(
         self, 
-        client, 
+        async_client, 
         auth_headers,
-        multiple_sample_documents
+        multiple_sample_documents,
+        status
     ):
         """Test filtering documents by status."""
-        for status in ["pending", "validated", "rejected"]:
-            response = client.get(
-                f"/api/documents?status={status}",
-                headers=auth_headers
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            # All returned documents should have the requested status
-            for doc in data["documents"]:
-                assert doc["status"] == status
+        response = await async_client.get(
+            f"/api/documents?status={status}",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        # All returned documents should have the requested status
+        for doc in data["documents"]:
+            assert doc["status"] == status
     
-    def test_filter_by_policy_type(
+    async def test_filter_by_policy_type(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test filtering documents by policy type."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?policy_type=Motor",
             headers=auth_headers
         )
@@ -244,15 +483,15 @@ class TestDocumentFiltering:
         for doc in data["documents"]:
             assert doc["policy_type"] == "Motor"
     
-    def test_filter_by_insurer(
+    async def test_filter_by_insurer(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test filtering documents by insurer."""
         # Get list of insurers first
-        response = client.get(
+        response = await async_client.get(
             "/api/documents/filters/options",
             headers=auth_headers
         )
@@ -260,7 +499,7 @@ class TestDocumentFiltering:
         
         if insurers:
             insurer = insurers[0]
-            response = client.get(
+            response = await async_client.get(
                 f"/api/documents?insurer={insurer}",
                 headers=auth_headers
             )
@@ -271,14 +510,14 @@ class TestDocumentFiltering:
             for doc in data["documents"]:
                 assert doc["insurer"] == insurer
     
-    def test_combined_filters(
+    async def test_combined_filters(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test combining multiple filters."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?country=NZ&status=pending&policy_type=Motor",
             headers=auth_headers
         )
@@ -291,82 +530,115 @@ class TestDocumentFiltering:
             assert doc["status"] == "pending"
             assert doc["policy_type"] == "Motor"
     
-    def test_filter_no_matches(
+    async def test_filter_uses_index(
         self, 
-        client, 
+        async_client, 
         auth_headers,
-        multiple_sample_documents
+        db_session,
+        multiple_sample_documents,
+        documents_queries
+    ):
+        """Test the combined-filter list query is planned as an index search."""
+        response = await async_client.get(
+            "/api/documents?country=NZ&status=pending&policy_type=Motor",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        [(statement, parameters)] = documents_queries
+        
+        connection = db_session.connection()
+        dialect = connection.dialect.name
+        if dialect == "sqlite":
+            plan = [
+                row[3] for row in
+                connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            ]
+            assert any(
+                "USING INDEX ix_documents_country_status_policy_created" in step
+                for step in plan
+            ), plan
+            assert not any(step.startswith("SCAN documents") for step in plan), plan
+        elif dialect == "postgresql":
+            [(plan,)] = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            ).all()
+            node_types = set()
+            nodes = [plan[0]["Plan"]]
+            while nodes:
+                node = nodes.pop()
+                node_types.add(node["Node Type"])
+                nodes.extend(node.get("Plans", []))
+            assert node_types & {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}, node_types
+            assert "Seq Scan" not in node_types, node_types
+        else:
+            pytest.skip(f"No plan check for {dialect}")
+    
+    @pytest.mark.parametrize("include_total,expected_total", [
+        (None, 0),  # Default: counted
+        ("false", None),
+    ], ids=["default", "no-total"])
+    async def test_filter_no_matches(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents,
+        include_total,
+        expected_total
     ):
         """Test filter that returns no results."""
-        response = client.get(
-            "/api/documents?country=XYZ123",  # Non-existent country
+        params = {"country": "XYZ123"}  # Non-existent country
+        if include_total:
+            params["include_total"] = include_total
+        response = await async_client.get(
+            "/api/documents",
+            params=params,
             headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
         assert len(data["documents"]) == 0
-        assert data["total"] == 0
+        assert data["total"] == expected_total
         assert data["has_more"] == False
 
 
 class TestDocumentSearch:
     """Tests for document search functionality."""
     
-    def test_search_by_insurer(
+    @pytest.mark.parametrize("term", [
+        "Insurer",  # Should match "Test Insurer X"
+        "example.com",  # Source URL
+        "policy",  # Classification
+    ], ids=["insurer", "source_url", "classification"])
+    async def test_search_by_field(
         self, 
-        client, 
+        async_client, 
         auth_headers,
-        multiple_sample_documents
+        multiple_sample_documents,
+        term
     ):
-        """Test searching documents by insurer name."""
-        response = client.get(
-            "/api/documents?search=Insurer",  # Should match "Test Insurer X"
+        """Test searching matches insurer, source URL and classification."""
+        response = await async_client.get(
+            "/api/documents",
+            params={"search": term},
             headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
         
-        # Should find documents with "Insurer" in the name
-        # Note: Actual results depend on implementation
-    
-    def test_search_by_source_url(
-        self, 
-        client, 
-        auth_headers,
-        multiple_sample_documents
-    ):
-        """Test searching by source URL."""
-        response = client.get(
-            "/api/documents?search=example.com",
-            headers=auth_headers
-        )
-        
-        assert response.status_code == 200
-    
-    def test_search_by_classification(
-        self, 
-        client, 
-        auth_headers,
-        multiple_sample_documents
-    ):
-        """Test searching by classification."""
-        response = client.get(
-            "/api/documents?search=policy",
-            headers=auth_headers
-        )
-        
-        assert response.status_code == 200
+        # Every fixture document carries each term in one of the fields
+        found = {d["id"] for d in data["documents"]}
+        assert {doc.id for doc in multiple_sample_documents} <= found
     
-    def test_search_combined_with_filters(
+    async def test_search_combined_with_filters(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test search combined with other filters."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?country=NZ&search=Insurer",
             headers=auth_headers
         )
@@ -378,19 +650,19 @@ class TestDocumentSearch:
         for doc in data["documents"]:
             assert doc["country"] == "NZ"
     
-    def test_search_case_sensitivity(
+    async def test_search_case_sensitivity(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test search case sensitivity."""
-        response_lower = client.get(
+        response_lower = await async_client.get(
             "/api/documents?search=insurer",
             headers=auth_headers
         )
         
-        response_upper = client.get(
+        response_upper = await async_client.get(
             "/api/documents?search=INSURER",
             headers=auth_headers
         )
@@ -398,19 +670,23 @@ class TestDocumentSearch:
         # Both should return results (case-insensitive search)
         assert response_lower.status_code == 200
         assert response_upper.status_code == 200
+        ids_lower = [d["id"] for d in response_lower.json()["documents"]]
+        ids_upper = [d["id"] for d in response_upper.json()["documents"]]
+        assert ids_lower == ids_upper
+        assert {doc.id for doc in multiple_sample_documents} <= set(ids_lower)
 
 
 class TestDocumentSorting:
     """Tests for document sorting."""
     
-    def test_default_sort_order(
+    async def test_default_sort_order(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test default sort order (pending first, then by date)."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents",
             headers=auth_headers
         )
@@ -423,15 +699,25 @@ class TestDocumentSorting:
             statuses = [d["status"] for d in data["documents"]]
             # This is a simplified check - actual order depends on implementation
             assert "pending" in statuses or len(statuses) > 0
+        
+        # Same created_at throughout, so ties fall back to newest id first
+        fixture_ids = {doc.id for doc in multiple_sample_documents}
+        pending = sorted(
+            (doc.id for doc in multiple_sample_documents if doc.status == "pending"),
+            reverse=True,
+        )
+        others = sorted(fixture_ids.difference(pending), reverse=True)
+        listed = [d["id"] for d in data["documents"] if d["id"] in fixture_ids]
+        assert listed == pending + others
     
-    def test_sort_by_created_at(
+    async def test_sort_by_created_at(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test sorting by creation date."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents",
             headers=auth_headers
         )
@@ -445,17 +731,33 @@ class TestDocumentSorting:
             assert all(dates[i] is not None for i in range(len(dates)))
 
 
+    def test_startup_rejects_schema_without_status_rank(self, monkeypatch):
+        """Test a pre-status_rank database fails startup instead of 500ing on lists."""
+        from sqlalchemy import create_engine, text
+        from app import database
+
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE documents (id INTEGER PRIMARY KEY, source_url TEXT)"
+            ))
+        monkeypatch.setattr(database, "engine", engine)
+
+        with pytest.raises(RuntimeError, match="documents.status_rank.*alembic upgrade head"):
+            database.verify_schema()
+
+
 class TestPaginationEdgeCases:
     """Tests for pagination edge cases."""
     
-    def test_pagination_beyond_total(
+    async def test_pagination_beyond_total(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test requesting page beyond total results."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?skip=1000&limit=10",
             headers=auth_headers
         )
@@ -464,59 +766,86 @@ class TestPaginationEdgeCases:
         data = response.json()
         assert len(data["documents"]) == 0
         assert data["has_more"] == False
+        
+        # A cursor from the last row leads to an empty final page
+        last_page = (await async_client.get(
+            f"/api/documents?limit={data['total'] - 1}",
+            headers=auth_headers
+        )).json()
+        assert last_page["has_more"] == True
+        response = await async_client.get(
+            "/api/documents",
+            params={"limit": 10, "cursor": last_page["next_cursor"]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["documents"]) == 1
+        assert data["has_more"] == False
+        assert data["next_cursor"] is None
     
-    def test_negative_skip(
+    async def test_negative_skip(
         self, 
-        client, 
+        async_client, 
         auth_headers
     ):
         """Test negative skip value handling."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?skip=-1",
             headers=auth_headers
         )
         
-        # Should handle gracefully
-        assert response.status_code in [200, 422]
+        # Rejected by validation before any query runs
+        assert response.status_code == 422
     
-    def test_zero_limit(
+    async def test_zero_limit(
         self, 
-        client, 
+        async_client, 
         auth_headers
     ):
         """Test zero limit."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents?limit=0",
             headers=auth_headers
         )
         
-        assert response.status_code in [200, 422]
+        assert response.status_code == 422
     
-    def test_large_limit(
+    @pytest.mark.parametrize("extra,expected_limit", [
+        ("", 500),
+        ("&prefetch=true", 250),
+    ], ids=["plain", "prefetch"])
+    async def test_large_limit(
         self, 
-        client, 
-        auth_headers
+        async_client, 
+        auth_headers,
+        extra,
+        expected_limit
     ):
         """Test very large limit."""
-        response = client.get(
-            "/api/documents?limit=10000",
+        response = await async_client.get(
+            f"/api/documents?limit=10000{extra}",
             headers=auth_headers
         )
         
         assert response.status_code == 200
+        # Clamped rather than rejected; a prefetched pair together stays
+        # within the maximum page size
+        assert response.json()["limit"] == expected_limit
 
 
 class TestStatsSummary:
     """Tests for document stats endpoint."""
     
-    def test_get_document_stats(
+    async def test_get_document_stats(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test getting document statistics."""
-        response = client.get(
+        response = await async_client.get(
             "/api/documents/stats/summary",
             headers=auth_headers
         )
@@ -527,21 +856,21 @@ class TestStatsSummary:
         # Check expected fields
         assert "total" in data or "by_status" in data or "by_country" in data
     
-    def test_stats_reflect_documents(
+    async def test_stats_reflect_documents(
         self, 
-        client, 
+        async_client, 
         auth_headers,
         multiple_sample_documents
     ):
         """Test that stats reflect actual document counts."""
         # Get stats
-        stats_response = client.get(
+        stats_response = await async_client.get(
             "/api/documents/stats/summary",
             headers=auth_headers
         )
         
         # Get all documents
-        docs_response = client.get(
+        docs_response = await async_client.get(
             "/api/documents?limit=1000",
             headers=auth_headers
         )
@@ -552,3 +881,29 @@ class TestStatsSummary:
         # Stats total should match documents total
         if "total" in stats:
             assert stats["total"] == docs["total"]
+    
+    async def test_stats_not_modified(
+        self, 
+        async_client, 
+        auth_headers,
+        multiple_sample_documents
+    ):
+        """Test stats carry an ETag and a stale one gets the full body."""
+        response = await async_client.get(
+            "/api/documents/stats/summary",
+            headers=auth_headers
+        )
+        etag = response.headers["etag"]
+        
+        response = await async_client.get(
+            "/api/documents/stats/summary",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        
+        response = await async_client.get(
+            "/api/documents/stats/summary",
+            headers={**auth_headers, "If-None-Match": 'W/"stale"'}
+        )
+        assert response.status_code == 200
+        assert response.json()["total_documents"] >= len(multiple_sample_documents)